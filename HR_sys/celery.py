@@ -44,6 +44,50 @@ app.conf.beat_schedule = {
         'task': 'attendance.send_late_notifications',
         'schedule': crontab(hour=9, minute=30),
     },
+
+    # Snapshot previous month's end-of-service liability on the 1st at 2:00 AM
+    'snapshot-gratuity-liability-monthly': {
+        'task': 'payroll.snapshot_gratuity_liability',
+        'schedule': crontab(day_of_month=1, hour=2, minute=0),
+    },
+
+    # Hourly notification digests at five past the hour
+    'send-hourly-notification-digests': {
+        'task': 'core.send_notification_digests',
+        'schedule': crontab(minute=5),
+        'args': ('hourly',),
+    },
+
+    # Daily notification digests at 7:00 AM
+    'send-daily-notification-digests': {
+        'task': 'core.send_notification_digests',
+        'schedule': crontab(hour=7, minute=0),
+        'args': ('daily',),
+    },
+
+    # Archive old attendance logs, audit logs and notifications on Fridays at 3:00 AM
+    'archive-data-weekly': {
+        'task': 'core.archive_data',
+        'schedule': crontab(day_of_week=5, hour=3, minute=0),
+    },
+
+    # Prune old per-request query statistics daily at 4:00 AM
+    'prune-query-stats-daily': {
+        'task': 'core.prune_query_stats',
+        'schedule': crontab(hour=4, minute=0),
+    },
+
+    # Prune old profiles daily at 4:15 AM
+    'prune-profiles-daily': {
+        'task': 'core.prune_profiles',
+        'schedule': crontab(hour=4, minute=15),
+    },
+
+    # Prune old report execution statistics daily at 4:30 AM
+    'prune-report-execution-stats-daily': {
+        'task': 'reports.prune_execution_stats',
+        'schedule': crontab(hour=4, minute=30),
+    },
 }
 
 # Celery configuration
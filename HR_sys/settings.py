@@ -80,8 +80,12 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.AuditContextMiddleware',
+    'core.middleware.QueryStatsMiddleware',
+    'core.middleware.ReplicaStickyMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'HR_sys.urls'
@@ -97,6 +101,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.notifications',
             ],
         },
     },
@@ -126,6 +131,25 @@ if DB_ENGINE == 'mssql':
             'CONN_MAX_AGE': 60,
         }
     }
+
+    # Optional read replica (e.g. an Always On readable secondary) serving
+    # report views, exports and dashboard aggregates; see core.db_router
+    DB_REPLICA_HOST = config('DB_REPLICA_HOST', default='')
+    if DB_REPLICA_HOST:
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'NAME': config('DB_REPLICA_NAME', default=DATABASES['default']['NAME']),
+            'USER': config('DB_REPLICA_USER', default=DATABASES['default']['USER']),
+            'PASSWORD': config('DB_REPLICA_PASSWORD', default=DATABASES['default']['PASSWORD']),
+            'HOST': DB_REPLICA_HOST,
+            'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+            'OPTIONS': {
+                'driver': 'ODBC Driver 17 for SQL Server',
+                'extra_params': 'TrustServerCertificate=yes;MARS_Connection=yes;ApplicationIntent=ReadOnly;'
+            },
+            'TEST': {'MIRROR': 'default'},
+        }
+        DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
 else:
     DATABASES = {
         'default': {
@@ -136,6 +160,47 @@ else:
 
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# CACHE_BACKEND: locmem (per process), file (shared on one server) or redis
+
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHE_TIMEOUT = config('CACHE_TIMEOUT', default=300, cast=int)
+
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('CACHE_LOCATION', default='redis://localhost:6379/2'),
+            'TIMEOUT': CACHE_TIMEOUT,
+            'KEY_PREFIX': 'hr_sys',
+        }
+    }
+elif CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config('CACHE_LOCATION', default=str(BASE_DIR / 'cache')),
+            'TIMEOUT': CACHE_TIMEOUT,
+            'KEY_PREFIX': 'hr_sys',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'hr_sys',
+            'TIMEOUT': CACHE_TIMEOUT,
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# Lifetime of cached dashboard counters; signals invalidate them sooner in
+# the writing process, this bounds staleness across processes with locmem
+DASHBOARD_COUNTER_TIMEOUT = config('DASHBOARD_COUNTER_TIMEOUT', default=60, cast=int)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -204,6 +269,14 @@ LOGOUT_REDIRECT_URL = 'core:login'
 # Session settings
 SESSION_COOKIE_AGE = 86400  # 24 hours
 SESSION_SAVE_EVERY_REQUEST = True
+# Sessions are written only when changed or when their sliding expiry was
+# last extended more than SESSION_REFRESH_SECONDS ago. The cached_db store
+# needs a cache shared by all workers; with locmem the db store is used.
+SESSION_ENGINE = config(
+    'SESSION_ENGINE',
+    default='core.sessions.db' if CACHE_BACKEND == 'locmem' else 'core.sessions.cached_db'
+)
+SESSION_REFRESH_SECONDS = config('SESSION_REFRESH_SECONDS', default=300, cast=int)
 
 # Date and number formats for Arabic
 DATE_FORMAT = 'd/m/Y'
@@ -223,6 +296,27 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_ENABLE_UTC = True
 CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=True, cast=bool)
 
+# Audit log buffering: entries are written in batches of AUDIT_BUFFER_SIZE,
+# after AUDIT_FLUSH_SECONDS, and at the end of every request and task.
+# AUDIT_BACKEND: sync (bulk insert in-process) or celery
+AUDIT_BACKEND = config('AUDIT_BACKEND', default='sync')
+AUDIT_BUFFER_SIZE = config('AUDIT_BUFFER_SIZE', default=100, cast=int)
+AUDIT_FLUSH_SECONDS = config('AUDIT_FLUSH_SECONDS', default=5, cast=int)
+AUDIT_EXCLUDED_MODELS = ['attendance.Attendance', 'reports.GeneratedReport']
+
+# Per-request SQL statistics: fraction of requests measured (0 = off),
+# Server-Timing headers on measured responses, and days stats are kept
+QUERY_STATS_SAMPLE_RATE = config('QUERY_STATS_SAMPLE_RATE', default=0.0, cast=float)
+QUERY_STATS_SERVER_TIMING = config('QUERY_STATS_SERVER_TIMING', default=False, cast=bool)
+QUERY_STATS_RETENTION_DAYS = config('QUERY_STATS_RETENTION_DAYS', default=14, cast=int)
+
+# Days report execution statistics (timings and query counts) are kept
+REPORT_STATS_RETENTION_DAYS = config('REPORT_STATS_RETENTION_DAYS', default=30, cast=int)
+
+# Seconds a user's reads stay on the primary database after they submit a
+# change, when a read replica is configured
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=30, cast=int)
+
 # Email Configuration (for notifications)
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'  # Change to your SMTP server
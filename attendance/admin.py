@@ -1,8 +1,8 @@
 from django.contrib import admin
-from .models import Attendance, AttendanceLog, LeaveRequest, Overtime
+from .models import Attendance, AttendanceLog, LeaveRequest, Overtime, AttendanceMonthlySummary
 
 admin.site.register(Attendance)
 admin.site.register(AttendanceLog)
 admin.site.register(LeaveRequest)
 admin.site.register(Overtime)
-
+admin.site.register(AttendanceMonthlySummary)
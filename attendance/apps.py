@@ -6,3 +6,5 @@ class AttendanceConfig(AppConfig):
     name = 'attendance'
     verbose_name = 'الحضور والانصراف'  # Attendance in Arabic
 
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,55 @@
+"""
+Django management command to rebuild the monthly attendance summaries
+أمر إدارة Django لإعادة بناء ملخصات الحضور الشهرية
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from attendance.models import Attendance
+from attendance.summary import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = 'Rebuild monthly attendance summaries | إعادة بناء ملخصات الحضور الشهرية'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start',
+            type=str,
+            help='First month to rebuild (YYYY-MM, default: first attendance month)',
+        )
+        parser.add_argument(
+            '--end',
+            type=str,
+            help='Last month to rebuild (YYYY-MM, default: last attendance month)',
+        )
+        parser.add_argument(
+            '--employee',
+            type=int,
+            help='Rebuild a single employee (ID)',
+        )
+
+    def parse_month(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m').date()
+        except ValueError:
+            raise CommandError(f'Invalid month: {value} (expected YYYY-MM)')
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        bounds = Attendance.objects.aggregate(first=Min('date'), last=Max('date'))
+        start = self.parse_month(options['start']) if options['start'] else bounds['first']
+        end = self.parse_month(options['end']) if options['end'] else bounds['last']
+        if start is None or end is None:
+            self.stdout.write(self.style.WARNING('No attendance records found'))
+            return
+        if start > end:
+            raise CommandError('Start month must not be after end month')
+
+        employee_ids = [options['employee']] if options['employee'] else None
+        created = rebuild_summaries(start, end, employee_ids)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Rebuilt {created} summaries from {start:%Y-%m} to {end:%Y-%m}'
+        ))
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_initial'),
+        ('employees', '0007_salaryhistory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceMonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField(verbose_name='السنة')),
+                ('month', models.IntegerField(verbose_name='الشهر')),
+                ('total_days', models.IntegerField(default=0, verbose_name='أيام التسجيل')),
+                ('present_days', models.IntegerField(default=0, verbose_name='أيام الحضور')),
+                ('late_days', models.IntegerField(default=0, verbose_name='أيام التأخير')),
+                ('absent_days', models.IntegerField(default=0, verbose_name='أيام الغياب')),
+                ('half_days', models.IntegerField(default=0, verbose_name='أنصاف الأيام')),
+                ('leave_days', models.IntegerField(default=0, verbose_name='أيام الإجازة')),
+                ('work_hours', models.DecimalField(decimal_places=2, default=0, max_digits=8, verbose_name='ساعات العمل')),
+                ('late_minutes', models.IntegerField(default=0, verbose_name='دقائق التأخير')),
+                ('early_leave_minutes', models.IntegerField(default=0, verbose_name='دقائق المغادرة المبكرة')),
+                ('overtime_hours', models.DecimalField(decimal_places=2, default=0, max_digits=8, verbose_name='ساعات العمل الإضافي')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='employees.employee', verbose_name='الموظف')),
+            ],
+            options={
+                'verbose_name': 'ملخص حضور شهري',
+                'verbose_name_plural': 'ملخصات الحضور الشهرية',
+                'db_table': 'Tbl_Attendance_Monthly_Summary',
+                'ordering': ['-year', '-month', 'employee'],
+                'indexes': [models.Index(fields=['year', 'month'], name='att_summary_period_idx')],
+                'unique_together': {('employee', 'year', 'month')},
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_attendancemonthlysummary'),
+        ('employees', '0007_salaryhistory'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['status', 'start_date', 'end_date'], name='leave_status_period_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Backfill of AttendanceMonthlySummary for attendance recorded before the
+# summary table existed
+
+from django.db import migrations
+from django.db.models import Count, Max, Min, Q, Sum
+
+
+def backfill_summaries(apps, schema_editor):
+    # Same computation as attendance.summary.rebuild_summaries, with
+    # historical models: one grouped query per month
+    Attendance = apps.get_model('attendance', 'Attendance')
+    AttendanceMonthlySummary = apps.get_model('attendance', 'AttendanceMonthlySummary')
+
+    bounds = Attendance.objects.aggregate(first=Min('date'), last=Max('date'))
+    if bounds['first'] is None:
+        return
+
+    aggregates = {
+        'total_days': Count('id'),
+        'present_days': Count('id', filter=Q(status='present')),
+        'late_days': Count('id', filter=Q(status='late')),
+        'absent_days': Count('id', filter=Q(status='absent')),
+        'half_days': Count('id', filter=Q(status='half_day')),
+        'leave_days': Count('id', filter=Q(status='on_leave')),
+        'work_hours': Sum('work_hours'),
+        'late_minutes': Sum('late_minutes'),
+        'early_leave_minutes': Sum('early_leave_minutes'),
+        'overtime_hours': Sum('overtime_hours'),
+    }
+
+    year, month = bounds['first'].year, bounds['first'].month
+    last = (bounds['last'].year, bounds['last'].month)
+    while (year, month) <= last:
+        rows = Attendance.objects.filter(
+            date__year=year, date__month=month,
+        ).values('employee_id').annotate(**aggregates).order_by()
+        AttendanceMonthlySummary.objects.filter(year=year, month=month).delete()
+        AttendanceMonthlySummary.objects.bulk_create(
+            (
+                AttendanceMonthlySummary(
+                    employee_id=row.pop('employee_id'), year=year, month=month,
+                    **{name: value or 0 for name, value in row.items()}
+                )
+                for row in rows.iterator()
+            ),
+            batch_size=500,
+        )
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0005_leaverequest_status_period_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -227,6 +227,9 @@ class LeaveRequest(BaseModel):
         verbose_name = 'طلب إجازة'
         verbose_name_plural = 'طلبات الإجازات'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'start_date', 'end_date'], name='leave_status_period_idx'),
+        ]
     
     def __str__(self):
         return f"{self.employee.emp_code} - {self.get_leave_type_display()} ({self.start_date} to {self.end_date})"
@@ -291,3 +294,83 @@ class Overtime(BaseModel):
     def __str__(self):
         return f"{self.employee.emp_code} - {self.date} ({self.hours} hours)"
 
+
+
+class AttendanceMonthlySummary(models.Model):
+    """
+    Per employee monthly attendance totals, maintained from Attendance
+    ملخص الحضور الشهري لكل موظف
+    """
+    employee = models.ForeignKey(
+        'employees.Employee',
+        on_delete=models.CASCADE,
+        related_name='attendance_summaries',
+        verbose_name='الموظف'
+    )
+    year = models.IntegerField(
+        verbose_name='السنة'
+    )
+    month = models.IntegerField(
+        verbose_name='الشهر'
+    )
+    total_days = models.IntegerField(
+        default=0,
+        verbose_name='أيام التسجيل'
+    )
+    present_days = models.IntegerField(
+        default=0,
+        verbose_name='أيام الحضور'
+    )
+    late_days = models.IntegerField(
+        default=0,
+        verbose_name='أيام التأخير'
+    )
+    absent_days = models.IntegerField(
+        default=0,
+        verbose_name='أيام الغياب'
+    )
+    half_days = models.IntegerField(
+        default=0,
+        verbose_name='أنصاف الأيام'
+    )
+    leave_days = models.IntegerField(
+        default=0,
+        verbose_name='أيام الإجازة'
+    )
+    work_hours = models.DecimalField(
+        max_digits=8,
+        decimal_places=2,
+        default=0,
+        verbose_name='ساعات العمل'
+    )
+    late_minutes = models.IntegerField(
+        default=0,
+        verbose_name='دقائق التأخير'
+    )
+    early_leave_minutes = models.IntegerField(
+        default=0,
+        verbose_name='دقائق المغادرة المبكرة'
+    )
+    overtime_hours = models.DecimalField(
+        max_digits=8,
+        decimal_places=2,
+        default=0,
+        verbose_name='ساعات العمل الإضافي'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='تاريخ التحديث'
+    )
+    
+    class Meta:
+        db_table = 'Tbl_Attendance_Monthly_Summary'
+        verbose_name = 'ملخص حضور شهري'
+        verbose_name_plural = 'ملخصات الحضور الشهرية'
+        unique_together = ['employee', 'year', 'month']
+        ordering = ['-year', '-month', 'employee']
+        indexes = [
+            models.Index(fields=['year', 'month'], name='att_summary_period_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.employee_id} - {self.month}/{self.year}"
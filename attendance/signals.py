@@ -0,0 +1,31 @@
+"""
+Signals for attendance app
+إشارات تطبيق الحضور
+"""
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import Attendance
+from .summary import mark_changed
+
+
+@receiver(post_init, sender=Attendance)
+def remember_attendance_key(sender, instance, **kwargs):
+    """Keep the loaded employee/date so moves refresh the old month too"""
+    instance._summary_key = (instance.employee_id, instance.date)
+
+
+@receiver(post_save, sender=Attendance)
+def attendance_saved(sender, instance, **kwargs):
+    """Refresh the monthly summary of a saved attendance record"""
+    old_employee_id, old_date = instance._summary_key
+    if old_employee_id and old_date and (old_employee_id, old_date) != (instance.employee_id, instance.date):
+        mark_changed(old_employee_id, old_date)
+    mark_changed(instance.employee_id, instance.date)
+    instance._summary_key = (instance.employee_id, instance.date)
+
+
+@receiver(post_delete, sender=Attendance)
+def attendance_deleted(sender, instance, **kwargs):
+    """Refresh the monthly summary of a deleted attendance record"""
+    mark_changed(instance.employee_id, instance.date)
@@ -0,0 +1,240 @@
+"""
+Monthly attendance summary maintenance
+صيانة ملخص الحضور الشهري
+
+``AttendanceMonthlySummary`` holds one row per (employee, year, month) with
+the status counts and time totals of that month. Whenever attendance rows are
+written, the affected (employee, year, month) keys are recomputed from
+``Attendance`` with one grouped query per month and upserted, so the summary
+never drifts on status changes or deletes.
+
+Signals refresh keys immediately for single saves (forms, admin); batch
+writers wrap their work in ``deferred_refresh()`` so every touched key is
+recomputed once at the end. ``rebuild_summaries`` repairs a whole range.
+"""
+import calendar
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, Tuple
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .models import Attendance, AttendanceMonthlySummary
+
+# Ids per statement, below SQL Server's 2100 parameter limit
+ID_BATCH_SIZE = 1000
+
+BULK_BATCH_SIZE = 500
+
+SUMMARY_FIELDS = (
+    'total_days', 'present_days', 'late_days', 'absent_days', 'half_days',
+    'leave_days', 'work_hours', 'late_minutes', 'early_leave_minutes',
+    'overtime_hours',
+)
+
+SUMMARY_AGGREGATES = {
+    'total_days': Count('id'),
+    'present_days': Count('id', filter=Q(status='present')),
+    'late_days': Count('id', filter=Q(status='late')),
+    'absent_days': Count('id', filter=Q(status='absent')),
+    'half_days': Count('id', filter=Q(status='half_day')),
+    'leave_days': Count('id', filter=Q(status='on_leave')),
+    'work_hours': Sum('work_hours'),
+    'late_minutes': Sum('late_minutes'),
+    'early_leave_minutes': Sum('early_leave_minutes'),
+    'overtime_hours': Sum('overtime_hours'),
+}
+
+_state = threading.local()
+
+
+def _month_range(year: int, month: int) -> Tuple[date, date]:
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _summary_values(row: Dict) -> Dict:
+    return {name: row[name] or (Decimal('0') if name.endswith('hours') else 0) for name in SUMMARY_FIELDS}
+
+
+def refresh_summaries(keys: Iterable[Tuple[int, int, int]]) -> int:
+    """
+    Recompute the summaries for (employee_id, year, month) keys
+    إعادة حساب ملخصات الحضور لمفاتيح محددة
+
+    Returns:
+        Number of summary rows written or removed
+    """
+    by_month = defaultdict(set)
+    for employee_id, year, month in keys:
+        by_month[(year, month)].add(employee_id)
+
+    changed = 0
+    for (year, month), employee_ids in by_month.items():
+        start, end = _month_range(year, month)
+        employee_ids = sorted(employee_ids)
+        for offset in range(0, len(employee_ids), ID_BATCH_SIZE):
+            chunk = employee_ids[offset:offset + ID_BATCH_SIZE]
+            totals = {
+                row['employee_id']: _summary_values(row)
+                for row in Attendance.objects.filter(
+                    employee_id__in=chunk, date__gte=start, date__lte=end,
+                ).values('employee_id').annotate(**SUMMARY_AGGREGATES).order_by()
+            }
+
+            with transaction.atomic():
+                existing = {
+                    summary.employee_id: summary
+                    for summary in AttendanceMonthlySummary.objects.select_for_update().filter(
+                        employee_id__in=chunk, year=year, month=month,
+                    )
+                }
+                to_update, to_create = [], []
+                for employee_id, values in totals.items():
+                    summary = existing.pop(employee_id, None)
+                    if summary is None:
+                        to_create.append(AttendanceMonthlySummary(
+                            employee_id=employee_id, year=year, month=month, **values
+                        ))
+                    else:
+                        for name, value in values.items():
+                            setattr(summary, name, value)
+                        to_update.append(summary)
+
+                AttendanceMonthlySummary.objects.bulk_create(to_create, batch_size=BULK_BATCH_SIZE)
+                AttendanceMonthlySummary.objects.bulk_update(
+                    to_update, SUMMARY_FIELDS, batch_size=BULK_BATCH_SIZE
+                )
+                # Months left without attendance rows
+                if existing:
+                    AttendanceMonthlySummary.objects.filter(
+                        id__in=[summary.id for summary in existing.values()]
+                    ).delete()
+
+            changed += len(to_create) + len(to_update) + len(existing)
+    return changed
+
+
+def mark_changed(employee_id: int, day: date) -> None:
+    """
+    Register an attendance change; refreshed now or at the end of
+    ``deferred_refresh()``
+    """
+    key = (employee_id, day.year, day.month)
+    pending = getattr(_state, 'pending', None)
+    if pending is not None:
+        pending.add(key)
+    else:
+        refresh_summaries([key])
+
+
+@contextmanager
+def deferred_refresh():
+    """
+    Collect attendance changes and refresh each touched month once on exit
+    تأجيل تحديث الملخصات حتى نهاية المعالجة
+
+    Nested use joins the outermost block.
+    """
+    if getattr(_state, 'pending', None) is not None:
+        yield
+        return
+
+    _state.pending = set()
+    try:
+        yield
+    finally:
+        pending, _state.pending = _state.pending, None
+        if pending:
+            refresh_summaries(pending)
+
+
+def rebuild_summaries(start: date, end: date, employee_ids: Iterable[int] = None) -> int:
+    """
+    Rebuild all summaries of the months between ``start`` and ``end``
+    إعادة بناء ملخصات الحضور لفترة
+
+    Whole months are rebuilt with a single grouped query per month.
+
+    Returns:
+        Number of summary rows created
+    """
+    if employee_ids is not None:
+        employee_ids = list(employee_ids)
+
+    created = 0
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        month_start, month_end = _month_range(year, month)
+        attendance = Attendance.objects.filter(date__gte=month_start, date__lte=month_end)
+        summaries = AttendanceMonthlySummary.objects.filter(year=year, month=month)
+        if employee_ids is not None:
+            attendance = attendance.filter(employee_id__in=employee_ids)
+            summaries = summaries.filter(employee_id__in=employee_ids)
+
+        rows = attendance.values('employee_id').annotate(**SUMMARY_AGGREGATES).order_by()
+        with transaction.atomic():
+            summaries.delete()
+            created += len(AttendanceMonthlySummary.objects.bulk_create(
+                (
+                    AttendanceMonthlySummary(
+                        employee_id=row['employee_id'], year=year, month=month,
+                        **_summary_values(row)
+                    )
+                    for row in rows.iterator()
+                ),
+                batch_size=BULK_BATCH_SIZE,
+            ))
+
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return created
+
+
+def employee_totals(start: date, end: date, employees=None) -> Dict[int, Dict]:
+    """
+    Attendance totals per employee for a date range
+    إجماليات الحضور لكل موظف لفترة
+
+    Fully covered months are read from the summary table; only the partial
+    months at either end of the range are aggregated from ``Attendance``.
+
+    Args:
+        start, end: Inclusive date range
+        employees: Optional Employee queryset to restrict the result
+
+    Returns:
+        Dictionary of employee id to summary field totals
+    """
+    totals = defaultdict(lambda: {name: 0 for name in SUMMARY_FIELDS})
+
+    def add(rows):
+        for row in rows:
+            bucket = totals[row['employee_id']]
+            for name in SUMMARY_FIELDS:
+                bucket[name] += row[name] or 0
+
+    full_months = Q(pk__in=[])
+    partial = Q(pk__in=[])
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        month_start, month_end = _month_range(year, month)
+        if start <= month_start and month_end <= end:
+            full_months |= Q(year=year, month=month)
+        else:
+            partial |= Q(date__gte=max(start, month_start), date__lte=min(end, month_end))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    summaries = AttendanceMonthlySummary.objects.filter(full_months)
+    attendance = Attendance.objects.filter(partial)
+    if employees is not None:
+        summaries = summaries.filter(employee__in=employees)
+        attendance = attendance.filter(employee__in=employees)
+
+    add(summaries.values('employee_id').annotate(
+        **{name: Sum(name) for name in SUMMARY_FIELDS}
+    ).order_by())
+    add(attendance.values('employee_id').annotate(**SUMMARY_AGGREGATES).order_by())
+    return dict(totals)
@@ -7,6 +7,8 @@ from django.utils import timezone
 from datetime import timedelta
 import logging
 
+from attendance.summary import deferred_refresh
+
 logger = logging.getLogger(__name__)
 
 
@@ -84,6 +86,7 @@ def process_attendance_logs_task(employee_id=None, date=None):
 
 
 @shared_task(name='attendance.calculate_daily_attendance')
+@deferred_refresh()
 def calculate_daily_attendance_task(date=None):
     """
     Celery task to calculate daily attendance for all employees
@@ -189,7 +192,7 @@ def send_late_notifications_task(date=None):
         Number of notifications sent
     """
     from attendance.models import Attendance
-    from core.utils import create_notification
+    from core.notifications import create_notifications
     
     try:
         # Default to today if no date specified
@@ -203,32 +206,33 @@ def send_late_notifications_task(date=None):
             date=date,
             status='late',
             late_minutes__gt=0
-        ).select_related('employee')
+        ).select_related('employee__user_account', 'employee__manager__user_account')
         
-        notifications_sent = 0
+        entries = []
         
         for attendance in late_attendance:
             employee = attendance.employee
             
             # Create notification for employee
             if hasattr(employee, 'user_account') and employee.user_account:
-                create_notification(
-                    user=employee.user_account,
-                    title='تأخير في الحضور',
-                    message=f'تم تسجيل تأخير {attendance.late_minutes} دقيقة في تاريخ {date}',
-                    notification_type='warning'
-                )
-                notifications_sent += 1
+                entries.append({
+                    'user': employee.user_account,
+                    'title': 'تأخير في الحضور',
+                    'message': f'تم تسجيل تأخير {attendance.late_minutes} دقيقة في تاريخ {date}',
+                    'notification_type': 'warning',
+                })
             
             # Create notification for manager
             if employee.manager and hasattr(employee.manager, 'user_account') and employee.manager.user_account:
-                create_notification(
-                    user=employee.manager.user_account,
-                    title='تأخير موظف',
-                    message=f'الموظف {employee.get_full_name_ar()} تأخر {attendance.late_minutes} دقيقة',
-                    notification_type='info'
-                )
-                notifications_sent += 1
+                entries.append({
+                    'user': employee.manager.user_account,
+                    'title': 'تأخير موظف',
+                    'message': f'الموظف {employee.get_full_name_ar()} تأخر {attendance.late_minutes} دقيقة',
+                    'notification_type': 'info',
+                })
+        
+        # One bulk insert for all notifications
+        notifications_sent = len(create_notifications(entries))
         
         logger.info(f"Sent {notifications_sent} late notifications for {date}")
         
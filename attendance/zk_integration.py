@@ -15,8 +15,9 @@ from django.utils import timezone
 from django.db import transaction
 from django.core.cache import cache
 from .models import AttendanceLog, Attendance
+from .summary import deferred_refresh
 from employees.models import Employee
-from core.models import SystemSettings
+from core.app_settings import get_list
 import logging
 from datetime import datetime, timedelta
 from typing import List, Tuple, Optional, Dict
@@ -409,6 +410,7 @@ class ZKDeviceManager:
         else:
             return 'check_in'
 
+    @deferred_refresh()
     def process_attendance_logs(self, employee_id: int = None, date: datetime = None) -> Dict[str, int]:
         """
         Process unprocessed attendance logs and create/update attendance records
@@ -708,14 +710,12 @@ def get_configured_devices() -> List[Dict[str, any]]:
     try:
         # Get device configurations from settings
         # Format: "name1|ip1:port1,name2|ip2:port2,..."
-        devices_config = SystemSettings.objects.filter(key='zk_devices').first()
+        device_strings = get_list('zk_devices')
 
-        if not devices_config or not devices_config.value:
+        if not device_strings:
             logger.warning("No ZK devices configured in system settings")
             return devices
 
-        device_strings = devices_config.value.split(',')
-
         for device_str in device_strings:
             try:
                 device_str = device_str.strip()
@@ -3,7 +3,8 @@ Admin configuration for core app
 """
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, SystemSettings, AuditLog, Notification
+from django.utils.html import format_html, format_html_join
+from .models import User, SystemSettings, AuditLog, Notification, ArchiveSegment, RequestQueryStat, ProfileRecord
 
 
 @admin.register(User)
@@ -55,3 +56,72 @@ class NotificationAdmin(admin.ModelAdmin):
     ordering = ['-created_at']
     readonly_fields = ['created_at', 'read_at']
 
+
+@admin.register(ArchiveSegment)
+class ArchiveSegmentAdmin(admin.ModelAdmin):
+    """Archive Segment Admin"""
+    list_display = ['policy', 'year', 'month', 'row_count', 'min_pk', 'max_pk', 'archived_at']
+    list_filter = ['policy', 'year']
+    ordering = ['policy', '-year', '-month']
+    readonly_fields = ['policy', 'year', 'month', 'file', 'row_count', 'min_pk', 'max_pk', 'archived_at']
+    
+    def has_add_permission(self, request):
+        return False
+
+
+
+@admin.register(RequestQueryStat)
+class RequestQueryStatAdmin(admin.ModelAdmin):
+    """Request Query Statistics Admin"""
+    list_display = ['started_at', 'method', 'path', 'view_name', 'status_code', 'query_count',
+                    'duplicate_count', 'db_time_ms', 'duration_ms']
+    list_filter = ['method', 'status_code', 'started_at']
+    search_fields = ['path', 'view_name']
+    ordering = ['-started_at']
+    readonly_fields = ['path', 'view_name', 'method', 'status_code', 'user', 'started_at', 'duration_ms',
+                       'db_time_ms', 'query_count', 'duplicate_count', 'duplicates', 'slowest']
+    
+    def has_add_permission(self, request):
+        return False
+
+
+
+@admin.register(ProfileRecord)
+class ProfileRecordAdmin(admin.ModelAdmin):
+    """Profile Record Admin"""
+    list_display = ['started_at', 'kind', 'name', 'status', 'duration_ms', 'function_calls', 'top_function', 'user']
+    list_filter = ['kind', 'started_at']
+    search_fields = ['name', 'path']
+    ordering = ['-started_at']
+    fields = ['kind', 'name', 'path', 'user', 'status', 'started_at', 'duration_ms', 'function_calls',
+              'stats_file', 'top_functions_table']
+    readonly_fields = fields
+    
+    def has_add_permission(self, request):
+        return False
+    
+    @admin.display(description='أبطأ دالة')
+    def top_function(self, obj):
+        # The first entries are the view/task wrappers; show the first of
+        # the project's own code when there is one
+        for row in obj.top_functions:
+            if '/site-packages/' not in row['file'] and not row['file'].startswith('~'):
+                return f"{row['function']} ({row['cumtime_ms']} ms)"
+        return ''
+    
+    @admin.display(description='أعلى الدوال حسب الوقت التراكمي')
+    def top_functions_table(self, obj):
+        rows = format_html_join(
+            '',
+            '<tr><td>{}</td><td dir="ltr">{}:{}</td><td>{}</td><td>{}</td><td>{}</td></tr>',
+            (
+                (row['function'], row['file'], row['line'], row['calls'], row['tottime_ms'], row['cumtime_ms'])
+                for row in obj.top_functions
+            ),
+        )
+        return format_html(
+            '<table><thead><tr><th>الدالة</th><th>الملف</th><th>الاستدعاءات</th>'
+            '<th>الوقت الذاتي (مللي ثانية)</th><th>الوقت التراكمي (مللي ثانية)</th></tr></thead>'
+            '<tbody>{}</tbody></table>',
+            rows,
+        )
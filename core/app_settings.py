@@ -0,0 +1,151 @@
+"""
+Cached, typed access to SystemSettings and CompanySettings
+الوصول المخزن مؤقتاً إلى إعدادات النظام والشركة
+
+Both settings tables are loaded once per process and kept in memory. A
+version stamp lives in the shared cache; saving or deleting a setting
+replaces the stamp (on commit), and every process reloads its copy the next
+time it sees a different stamp. Reads therefore cost one cache lookup and no
+database query until settings change.
+
+With the local-memory cache backend the stamp is per process, so other
+workers only pick up changes made through them; use the file or Redis
+backend when running several workers.
+"""
+import json
+import threading
+import uuid
+from typing import Any, Dict, List
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'app_settings:version'
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+_lock = threading.Lock()
+_local = {'version': None, 'system': None, 'company': None}
+
+
+def _shared_version() -> str:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _cached(slot: str, load):
+    """
+    Local copy of one settings table, reloaded when the shared version changed
+
+    The copy is stored only if the version is still the one read before
+    loading, so a load that raced with a change is used once but never kept.
+    """
+    version = _shared_version()
+    with _lock:
+        if _local['version'] != version:
+            _local.update(version=version, system=None, company=None)
+        value = _local[slot]
+    if value is None:
+        value = load()
+        with _lock:
+            if _local['version'] == version:
+                _local[slot] = value
+    return value
+
+
+def invalidate() -> None:
+    """Make every process reload settings on its next read"""
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+    with _lock:
+        _local.update(version=None, system=None, company=None)
+
+
+def _load_system() -> Dict[str, str]:
+    from .models import SystemSettings
+
+    return dict(SystemSettings.objects.values_list('key', 'value'))
+
+
+def _load_company():
+    from .models import CompanySettings
+
+    return CompanySettings.load()
+
+
+def system_settings() -> Dict[str, str]:
+    """All SystemSettings as a key -> value dictionary"""
+    return _cached('system', _load_system)
+
+
+def company_settings():
+    """
+    The CompanySettings singleton (shared instance, do not modify)
+    إعدادات الشركة
+    """
+    return _cached('company', _load_company)
+
+
+def get_setting(key: str, default: str = None) -> str:
+    """Raw value of a system setting"""
+    value = system_settings().get(key)
+    return default if value is None else value
+
+
+def get_int(key: str, default: int = None) -> int:
+    """System setting as an integer"""
+    try:
+        return int(get_setting(key))
+    except (TypeError, ValueError):
+        return default
+
+
+def get_float(key: str, default: float = None) -> float:
+    """System setting as a float"""
+    try:
+        return float(get_setting(key))
+    except (TypeError, ValueError):
+        return default
+
+
+def get_bool(key: str, default: bool = False) -> bool:
+    """System setting as a boolean ('1', 'true', 'yes', 'on')"""
+    value = get_setting(key)
+    if value is None or value.strip() == '':
+        return default
+    return value.strip().lower() in TRUE_VALUES
+
+
+def get_json(key: str, default: Any = None) -> Any:
+    """System setting parsed as JSON"""
+    value = get_setting(key)
+    if not value:
+        return default
+    try:
+        return json.loads(value)
+    except ValueError:
+        return default
+
+
+def get_list(key: str, separator: str = ',', default: List[str] = None) -> List[str]:
+    """System setting split into a list of non-empty, stripped items"""
+    value = get_setting(key)
+    if not value:
+        return list(default or [])
+    return [item.strip() for item in value.split(separator) if item.strip()]
+
+
+def connect_signals() -> None:
+    """Invalidate cached settings when they change (called from AppConfig.ready)"""
+    from django.db.models.signals import post_delete, post_save
+
+    def handler(sender, **kwargs):
+        transaction.on_commit(invalidate)
+
+    for model_label in ('core.SystemSettings', 'core.CompanySettings'):
+        post_save.connect(handler, sender=model_label, weak=False,
+                          dispatch_uid=f'app_settings_save_{model_label}')
+        post_delete.connect(handler, sender=model_label, weak=False,
+                            dispatch_uid=f'app_settings_delete_{model_label}')
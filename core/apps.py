@@ -6,3 +6,10 @@ class CoreConfig(AppConfig):
     name = 'core'
     verbose_name = 'النواة'  # Core in Arabic
 
+
+    def ready(self):
+        from . import app_settings, audit, counters, profiling
+        app_settings.connect_signals()
+        audit.connect_signals()
+        counters.connect_signals()
+        profiling.connect_signals()
@@ -0,0 +1,298 @@
+"""
+Time-partitioned archival of high-volume tables
+أرشفة الجداول كبيرة الحجم حسب الفترة الزمنية
+
+Each ``ArchivePolicy`` names a model, its date field, the rows eligible for
+archival and a retention horizon. Rows older than the horizon are written,
+month by month, to gzip-compressed JSON-lines files in the default storage
+and recorded as ``ArchiveSegment`` rows (with their primary key range for
+point lookups). Only after the file is stored are the archived rows deleted
+from the hot table, in batches.
+
+If a run is interrupted while deleting, the next run archives the remaining
+rows again into a new segment; ``restore_month`` skips rows that already
+exist, so no row is lost or duplicated in the table.
+
+Horizons default to the policy values and can be changed per policy with
+the ``archive_horizon_days_<policy>`` system setting.
+"""
+import gzip
+import json
+import logging
+import os
+import tempfile
+from array import array
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional
+
+from django.apps import apps
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+
+from .app_settings import get_int
+from .models import ArchiveSegment
+
+logger = logging.getLogger(__name__)
+
+# Rows read per round trip while writing an archive file
+READ_CHUNK_SIZE = 2000
+
+# Ids per statement, below SQL Server's 2100 parameter limit
+ID_BATCH_SIZE = 1000
+
+BULK_BATCH_SIZE = 500
+
+
+class ArchivePolicy:
+    """
+    Which rows of a model are archived and when
+    سياسة أرشفة جدول
+
+    Attributes:
+        name: Policy key
+        model_label: 'app_label.ModelName'
+        date_field: DateTimeField the horizon and months apply to
+        horizon_days: Default age after which rows are archived
+        condition: Extra filter for eligible rows
+    """
+
+    def __init__(self, name: str, model_label: str, date_field: str, horizon_days: int,
+                 condition: Q = None):
+        self.name = name
+        self.model_label = model_label
+        self.date_field = date_field
+        self.default_horizon_days = horizon_days
+        self.condition = condition or Q()
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    @property
+    def horizon_days(self) -> int:
+        return get_int(f'archive_horizon_days_{self.name}', self.default_horizon_days)
+
+    def cutoff(self):
+        return timezone.now() - timedelta(days=self.horizon_days)
+
+    def eligible(self):
+        """Rows older than the horizon that may be archived"""
+        return self.model.objects.filter(self.condition).filter(
+            **{f'{self.date_field}__lt': self.cutoff()}
+        )
+
+
+POLICIES: Dict[str, ArchivePolicy] = {
+    policy.name: policy for policy in (
+        # Processed device punches older than 13 months
+        ArchivePolicy('attendance_logs', 'attendance.AttendanceLog', 'timestamp', 395,
+                      Q(is_processed=True)),
+        ArchivePolicy('audit_logs', 'core.AuditLog', 'timestamp', 730),
+        ArchivePolicy('notifications', 'core.Notification', 'created_at', 90,
+                      Q(is_read=True)),
+    )
+}
+
+
+def get_policy(name: str) -> ArchivePolicy:
+    if name not in POLICIES:
+        raise ValueError(f"Unknown archive policy: {name}")
+    return POLICIES[name]
+
+
+def _month_bounds(year: int, month: int):
+    start = timezone.make_aware(datetime(year, month, 1))
+    end_year, end_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return start, timezone.make_aware(datetime(end_year, end_month, 1))
+
+
+def _json_value(value):
+    # Full precision, unlike DjangoJSONEncoder which drops microseconds
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot archive value of type {type(value).__name__}")
+
+
+def _fields(model) -> List:
+    return list(model._meta.concrete_fields)
+
+
+def archive_month(policy: ArchivePolicy, year: int, month: int) -> Optional[ArchiveSegment]:
+    """
+    Move the eligible rows of one month into a new archive segment
+    أرشفة سجلات شهر واحد
+
+    Returns:
+        The created ArchiveSegment, or None when there was nothing to archive
+    """
+    model = policy.model
+    start, end = _month_bounds(year, month)
+    rows = policy.eligible().filter(**{
+        f'{policy.date_field}__gte': start,
+        f'{policy.date_field}__lt': end,
+    }).order_by('pk')
+    attnames = [field.attname for field in _fields(model)]
+
+    ids = array('q')
+    with tempfile.NamedTemporaryFile(suffix='.jsonl.gz', delete=False) as tmp:
+        path = tmp.name
+    try:
+        with gzip.open(path, 'wt', encoding='utf-8') as fileobj:
+            for values in rows.values(*attnames).iterator(chunk_size=READ_CHUNK_SIZE):
+                fileobj.write(json.dumps(values, default=_json_value, ensure_ascii=False))
+                fileobj.write('\n')
+                ids.append(values[model._meta.pk.attname])
+
+        if not ids:
+            return None
+
+        with open(path, 'rb') as fileobj:
+            segment = ArchiveSegment(
+                policy=policy.name, year=year, month=month,
+                row_count=len(ids), min_pk=min(ids), max_pk=max(ids),
+            )
+            segment.file.save(
+                f'{policy.name}/{year}-{month:02d}_{min(ids)}-{max(ids)}.jsonl.gz',
+                File(fileobj),
+                save=True,
+            )
+    finally:
+        os.remove(path)
+
+    # The file is stored; now remove the rows from the hot table
+    for offset in range(0, len(ids), ID_BATCH_SIZE):
+        with transaction.atomic():
+            model.objects.filter(pk__in=ids[offset:offset + ID_BATCH_SIZE].tolist()).delete()
+
+    logger.info(f"Archived {len(ids)} {policy.name} rows of {year}-{month:02d}")
+    return segment
+
+
+def archive_policy(policy: ArchivePolicy, dry_run: bool = False) -> Dict:
+    """
+    Archive all eligible rows of a policy, one month at a time
+    أرشفة جميع السجلات المؤهلة لسياسة
+
+    Returns:
+        Dictionary with months and rows archived (or eligible for dry runs)
+    """
+    eligible = policy.eligible()
+    if dry_run:
+        return {'months': 0, 'rows': eligible.count()}
+
+    bounds = eligible.aggregate(first=Min(policy.date_field), last=Max(policy.date_field))
+    stats = {'months': 0, 'rows': 0}
+    if bounds['first'] is None:
+        return stats
+
+    first = timezone.localtime(bounds['first'])
+    last = timezone.localtime(bounds['last'])
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        segment = archive_month(policy, year, month)
+        if segment is not None:
+            stats['months'] += 1
+            stats['rows'] += segment.row_count
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return stats
+
+
+def _read_segment(segment: ArchiveSegment) -> Iterator[Dict]:
+    with segment.file.open('rb') as raw:
+        with gzip.open(raw, 'rt', encoding='utf-8') as fileobj:
+            for line in fileobj:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _auto_date_fields(model) -> List:
+    return [
+        field for field in _fields(model)
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+
+
+def _to_instance(model, values: Dict):
+    return model(**{
+        field.attname: field.to_python(values[field.attname])
+        for field in _fields(model) if field.attname in values
+    })
+
+
+def find_archived(policy: ArchivePolicy, pk: int) -> Optional[Dict]:
+    """
+    Look up one archived row by primary key
+    البحث عن سجل مؤرشف بالمعرف
+    """
+    pk_name = policy.model._meta.pk.attname
+    segments = ArchiveSegment.objects.filter(policy=policy.name, min_pk__lte=pk, max_pk__gte=pk)
+    for segment in segments:
+        for values in _read_segment(segment):
+            if values[pk_name] == pk:
+                return values
+    return None
+
+
+def restore_month(policy: ArchivePolicy, year: int, month: int) -> int:
+    """
+    Move the archived rows of a month back into the hot table
+    استعادة سجلات شهر من الأرشيف
+
+    Rows that already exist are skipped. Restored segments and their files
+    are removed; the rows are archived again by the next run unless the
+    policy horizon is raised.
+
+    Returns:
+        Number of rows inserted
+    """
+    model = policy.model
+    pk_name = model._meta.pk.attname
+    auto_dates = _auto_date_fields(model)
+    restored = 0
+
+    for segment in ArchiveSegment.objects.filter(policy=policy.name, year=year, month=month):
+        batch = []
+
+        def insert(batch):
+            existing = set(model.objects.filter(
+                pk__in=[values[pk_name] for values in batch]
+            ).values_list('pk', flat=True))
+            instances = [_to_instance(model, values) for values in batch if values[pk_name] not in existing]
+            # bulk_create stamps auto_now/auto_now_add fields with the
+            # current time; put the archived timestamps back afterwards
+            archived = [
+                {field.attname: getattr(instance, field.attname) for field in auto_dates}
+                for instance in instances
+            ]
+            model.objects.bulk_create(instances, batch_size=BULK_BATCH_SIZE)
+            if auto_dates and instances:
+                for instance, dates in zip(instances, archived):
+                    for attname, value in dates.items():
+                        setattr(instance, attname, value)
+                # Two parameters per field and row plus the id, below
+                # SQL Server's 2100 parameter limit
+                model.objects.bulk_update(
+                    instances, [field.name for field in auto_dates],
+                    batch_size=ID_BATCH_SIZE // (2 * len(auto_dates) + 1),
+                )
+            return len(instances)
+
+        with transaction.atomic():
+            for values in _read_segment(segment):
+                batch.append(values)
+                if len(batch) == ID_BATCH_SIZE:
+                    restored += insert(batch)
+                    batch = []
+            if batch:
+                restored += insert(batch)
+            segment.delete()
+        # Only after the rows are committed
+        segment.file.delete(save=False)
+
+    logger.info(f"Restored {restored} {policy.name} rows of {year}-{month:02d}")
+    return restored
@@ -0,0 +1,247 @@
+"""
+Buffered audit log writer
+كاتب سجل التدقيق المؤجل
+
+Audit entries (from ``log_action`` and from automatic model-change auditing)
+are collected in an in-process buffer once the surrounding transaction
+commits, and written with one ``bulk_create`` when the buffer reaches
+``AUDIT_BUFFER_SIZE`` entries, when the oldest entry is older than
+``AUDIT_FLUSH_SECONDS``, at the end of each request (after the response is
+sent), after each Celery task and at process exit. With
+``AUDIT_BACKEND = 'celery'`` the batch is handed to a Celery task instead.
+
+Saves and deletes of ``BaseModel`` subclasses are audited automatically with
+a compact diff of the changed fields against the values the instance was
+loaded with (kept by ``BaseModel.from_db``, so loading rows costs nothing
+extra). The acting user and IP address come
+from ``AuditContextMiddleware``, falling back to ``updated_by``/``created_by``.
+"""
+import atexit
+import functools
+import json
+import logging
+import threading
+import time
+from typing import Dict, List
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_SIZE = 100
+DEFAULT_FLUSH_SECONDS = 5
+
+# Fields left out of change diffs
+IGNORED_FIELDS = {'created_at', 'updated_at', 'created_by', 'updated_by'}
+
+# Longest value kept in a diff
+MAX_VALUE_LENGTH = 200
+
+# Models not audited automatically (machine generated, high volume)
+DEFAULT_EXCLUDED_MODELS = ('attendance.Attendance', 'reports.GeneratedReport')
+
+_context = threading.local()
+
+
+def set_context(user=None, ip_address=None) -> None:
+    """Acting user and IP address for audit entries of this thread"""
+    _context.user_id = getattr(user, 'pk', None) if user is not None and user.is_authenticated else None
+    _context.ip_address = ip_address
+
+
+def clear_context() -> None:
+    _context.user_id = None
+    _context.ip_address = None
+
+
+class AuditBuffer:
+    """
+    Thread-safe buffer of pending audit entries
+    مخزن مؤقت لسجلات التدقيق
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: List[Dict] = []
+        self._oldest = None
+
+    def add(self, entry: Dict) -> None:
+        with self._lock:
+            if not self._entries:
+                self._oldest = time.monotonic()
+            self._entries.append(entry)
+            due = (
+                len(self._entries) >= getattr(settings, 'AUDIT_BUFFER_SIZE', DEFAULT_BUFFER_SIZE) or
+                time.monotonic() - self._oldest >= getattr(settings, 'AUDIT_FLUSH_SECONDS', DEFAULT_FLUSH_SECONDS)
+            )
+        if due:
+            self.flush()
+
+    def drain(self) -> List[Dict]:
+        with self._lock:
+            entries, self._entries = self._entries, []
+            self._oldest = None
+        return entries
+
+    def flush(self) -> int:
+        """Write or ship all buffered entries; returns the number of entries"""
+        entries = self.drain()
+        if not entries:
+            return 0
+        try:
+            if getattr(settings, 'AUDIT_BACKEND', 'sync') == 'celery':
+                from .tasks import write_audit_entries_task
+                write_audit_entries_task.delay(entries)
+            else:
+                write_entries(entries)
+        except Exception as e:
+            logger.error(f"Error writing {len(entries)} audit entries: {e}")
+        return len(entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+buffer = AuditBuffer()
+
+
+def write_entries(entries: List[Dict]) -> int:
+    """Insert serialized audit entries with one bulk_create"""
+    from .models import AuditLog
+
+    logs = [
+        AuditLog(
+            user_id=entry.get('user_id'),
+            action=entry['action'],
+            model_name=entry['model_name'],
+            object_id=entry.get('object_id'),
+            description=entry.get('description') or '',
+            ip_address=entry.get('ip_address'),
+            timestamp=entry.get('timestamp') or timezone.now(),
+        )
+        for entry in entries
+    ]
+    AuditLog.objects.bulk_create(logs, batch_size=500)
+    return len(logs)
+
+
+def record(action: str, model_name: str, object_id=None, description: str = '',
+           user_id=None, ip_address=None) -> None:
+    """
+    Queue an audit entry once the current transaction commits
+    إضافة سجل تدقيق إلى قائمة الانتظار
+    """
+    entry = {
+        'user_id': user_id if user_id is not None else getattr(_context, 'user_id', None),
+        'action': action,
+        'model_name': model_name,
+        'object_id': object_id,
+        'description': description,
+        'ip_address': ip_address or getattr(_context, 'ip_address', None),
+        'timestamp': timezone.now().isoformat(),
+    }
+    transaction.on_commit(lambda: buffer.add(entry))
+
+
+def flush(**kwargs) -> int:
+    """Flush the buffer (usable as a signal receiver)"""
+    return buffer.flush()
+
+
+def _flush_request(**kwargs):
+    from django.db import close_old_connections
+
+    if buffer.flush():
+        # The request's connection may already have been released
+        close_old_connections()
+
+
+# Model change auditing
+
+def _compact(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    value = str(value)
+    return value if len(value) <= MAX_VALUE_LENGTH else value[:MAX_VALUE_LENGTH] + '…'
+
+
+@functools.lru_cache(maxsize=None)
+def _audited_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key and field.name not in IGNORED_FIELDS
+    ]
+
+
+def _remember(sender, instance) -> None:
+    """Keep the saved values, so later saves of the instance diff against them"""
+    # Deferred fields are not loaded and not compared
+    attnames = [field.attname for field in _audited_fields(sender) if field.attname in instance.__dict__]
+    instance._loaded_values = (attnames, [instance.__dict__[attname] for attname in attnames])
+
+
+def _diff(sender, instance) -> Dict:
+    loaded = getattr(instance, '_loaded_values', None)
+    if loaded is None:
+        return {}
+    before = dict(zip(*loaded))
+    changes = {}
+    for field in _audited_fields(sender):
+        if field.attname not in before:
+            continue
+        old, new = before[field.attname], getattr(instance, field.attname)
+        if old != new:
+            changes[field.name] = [_compact(old), _compact(new)]
+    return changes
+
+
+def _actor(instance):
+    user_id = getattr(_context, 'user_id', None)
+    if user_id is None:
+        user_id = getattr(instance, 'updated_by_id', None) or getattr(instance, 'created_by_id', None)
+    return user_id
+
+
+def _after_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        record('create', sender.__name__, instance.pk, '', _actor(instance))
+    else:
+        changes = _diff(sender, instance)
+        if changes:
+            record('update', sender.__name__, instance.pk,
+                   json.dumps(changes, ensure_ascii=False, default=str), _actor(instance))
+    _remember(sender, instance)
+
+
+def _after_delete(sender, instance, **kwargs):
+    record('delete', sender.__name__, instance.pk, '', _actor(instance))
+
+
+def connect_signals() -> None:
+    """
+    Audit BaseModel subclasses and flush at request/task end
+    (called from AppConfig.ready)
+    """
+    from celery.signals import task_postrun
+    from django.apps import apps
+    from django.core.signals import request_finished
+    from django.db.models.signals import post_delete, post_save
+
+    from .models import BaseModel
+
+    excluded = set(getattr(settings, 'AUDIT_EXCLUDED_MODELS', DEFAULT_EXCLUDED_MODELS))
+    for model in apps.get_models():
+        if not issubclass(model, BaseModel) or model._meta.label in excluded:
+            continue
+        uid = model._meta.label_lower
+        post_save.connect(_after_save, sender=model, dispatch_uid=f'audit_save_{uid}')
+        post_delete.connect(_after_delete, sender=model, dispatch_uid=f'audit_delete_{uid}')
+
+    # request_finished fires when the response is closed, after it was sent
+    request_finished.connect(_flush_request, dispatch_uid='audit_flush_request')
+    task_postrun.connect(flush, weak=False, dispatch_uid='audit_flush_task')
+    atexit.register(buffer.flush)
@@ -0,0 +1,22 @@
+"""
+Template context processors for core app
+معالجات سياق القوالب لتطبيق النواة
+"""
+from django.utils.functional import SimpleLazyObject
+
+
+def notifications(request):
+    """
+    Unread notification count for the header badge, read from the cache
+    only when a template uses it
+    عدد الإشعارات غير المقروءة
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+
+    def count():
+        from .notifications import unread_count
+        return unread_count(user.pk)
+
+    return {'unread_notification_count': SimpleLazyObject(count)}
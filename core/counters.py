@@ -0,0 +1,106 @@
+"""
+Cached dashboard counters
+عدادات لوحة التحكم المخزنة مؤقتاً
+
+The landing dashboard shows a few headcount figures that every user loads
+after login. Each counter is cached under its own key; saving or deleting a
+row of the model it depends on deletes that key once the transaction
+commits, so the next request recomputes it. ``DASHBOARD_COUNTER_TIMEOUT``
+bounds staleness for processes that did not see the write (local-memory
+cache) and for writes that bypass signals (``update()``, ``bulk_create``).
+"""
+import logging
+from typing import Callable, Dict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 60
+
+
+def _active_employees():
+    from employees.models import Employee
+    return Employee.objects.filter(is_active=True).count()
+
+
+def _present_today():
+    from attendance.models import Attendance
+    return Attendance.objects.filter(
+        date=timezone.localdate(),
+        status__in=['present', 'late']
+    ).count()
+
+
+def _pending_leaves():
+    from attendance.models import LeaveRequest
+    return LeaveRequest.objects.filter(status='pending').count()
+
+
+def _active_departments():
+    from organization.models import Department
+    return Department.objects.filter(is_active=True).count()
+
+
+# Counter name -> (compute function, model it depends on)
+COUNTERS: Dict[str, tuple] = {
+    'total_employees': (_active_employees, 'employees.Employee'),
+    'present_today': (_present_today, 'attendance.Attendance'),
+    'pending_leaves': (_pending_leaves, 'attendance.LeaveRequest'),
+    'total_departments': (_active_departments, 'organization.Department'),
+}
+
+
+def _cache_key(name: str) -> str:
+    if name == 'present_today':
+        return f'dashboard_counter:{name}:{timezone.localdate().isoformat()}'
+    return f'dashboard_counter:{name}'
+
+
+def get_counters() -> Dict[str, int]:
+    """
+    Dashboard counters, computing only the ones missing from the cache
+    عدادات لوحة التحكم
+    """
+    keys = {_cache_key(name): name for name in COUNTERS}
+    cached = cache.get_many(list(keys))
+
+    values = {}
+    missing = {}
+    for key, name in keys.items():
+        if key in cached:
+            values[name] = cached[key]
+            continue
+        compute: Callable = COUNTERS[name][0]
+        try:
+            values[name] = missing[key] = compute()
+        except Exception as e:
+            logger.error(f"Error computing dashboard counter {name}: {str(e)}")
+            values[name] = 0
+
+    if missing:
+        cache.set_many(missing, getattr(settings, 'DASHBOARD_COUNTER_TIMEOUT', DEFAULT_TIMEOUT))
+    return values
+
+
+def invalidate_counters(*names: str) -> None:
+    """Drop cached counters (all of them when no name is given)"""
+    cache.delete_many([_cache_key(name) for name in (names or COUNTERS)])
+
+
+def connect_signals() -> None:
+    """Invalidate counters when their models change (called from AppConfig.ready)"""
+    from django.db.models.signals import post_delete, post_save
+
+    for name, (compute, model_label) in COUNTERS.items():
+        def handler(sender, counter=name, **kwargs):
+            # After commit, so a concurrent read cannot re-cache the old value
+            transaction.on_commit(lambda: invalidate_counters(counter))
+
+        post_save.connect(handler, sender=model_label, weak=False,
+                          dispatch_uid=f'dashboard_counter_save_{name}')
+        post_delete.connect(handler, sender=model_label, weak=False,
+                            dispatch_uid=f'dashboard_counter_delete_{name}')
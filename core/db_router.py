@@ -0,0 +1,112 @@
+"""
+Read-replica routing for reporting workloads
+توجيه استعلامات التقارير إلى النسخة المقروءة من قاعدة البيانات
+
+When a ``replica`` database is configured, reads made inside
+``replica_reads()`` (report views decorated with ``@use_replica`` and
+background report generation) go to the replica, so month-end reporting
+does not compete with attendance ingestion on the primary. Everything else,
+all writes, and reads inside a transaction stay on the primary.
+
+After a user submits a form (any non-GET request), their reads stay on the
+primary for ``REPLICA_STICKY_SECONDS`` so they see their own changes while
+the replica catches up.
+"""
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_ALIAS = 'replica'
+
+DEFAULT_STICKY_SECONDS = 30
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_configured() -> bool:
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def sticky_seconds() -> int:
+    """How long the replica may lag behind a write"""
+    return getattr(settings, 'REPLICA_STICKY_SECONDS', DEFAULT_STICKY_SECONDS)
+
+
+def _sticky_key(user_id: int) -> str:
+    return f'db_router:sticky:{user_id}'
+
+
+def mark_sticky(user_id: int) -> None:
+    """Keep a user's reads on the primary for the sticky window"""
+    cache.set(_sticky_key(user_id), 1, sticky_seconds())
+
+
+def is_sticky(user_id: int) -> bool:
+    return cache.get(_sticky_key(user_id)) is not None
+
+
+@contextmanager
+def replica_reads():
+    """Send reads to the replica (when configured) inside this block"""
+    token = _replica_reads.set(replica_configured())
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Keep reads on the primary inside this block, even within replica_reads()"""
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def use_replica(view):
+    """
+    Run a read-only view against the replica
+    تنفيذ العرض على النسخة المقروءة
+
+    Only GET/HEAD requests of users without a recent write are routed.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (not replica_configured() or request.method not in SAFE_METHODS or
+                (request.user.is_authenticated and is_sticky(request.user.pk))):
+            return view(request, *args, **kwargs)
+        with replica_reads():
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    """
+    Database router sending reporting reads to the replica
+    موجه قاعدة البيانات بين الخادم الرئيسي والنسخة المقروءة
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return REPLICA_ALIAS
+        # Explicit, so rows loaded from the replica do not pull their
+        # related objects from it outside replica_reads()
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
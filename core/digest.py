@@ -0,0 +1,133 @@
+"""
+Notification digest emails
+ملخصات الإشعارات بالبريد الإلكتروني
+
+Notifications are not emailed one by one. Users choose an hourly or daily
+digest (``User.email_digest``); a scheduled task collects each user's
+notifications not yet emailed, renders one message per user, and sends all
+messages over a single SMTP connection in batches. Sent notifications are
+stamped with ``emailed_at`` so they are never included twice.
+"""
+import logging
+from itertools import groupby
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+DIGEST_PERIODS = ('hourly', 'daily')
+
+# Messages handed to the connection at a time
+SEND_BATCH_SIZE = 100
+
+# Ids per statement, below SQL Server's 2100 parameter limit
+ID_BATCH_SIZE = 1000
+
+# Notifications listed in one digest; the rest are summarized
+MAX_ITEMS_PER_DIGEST = 50
+
+PERIOD_TITLES = {
+    'hourly': 'ملخص الإشعارات خلال الساعة الماضية',
+    'daily': 'ملخص الإشعارات اليومي',
+}
+
+
+def _render(name: str, items: List[Dict]) -> str:
+    lines = [f'مرحباً {name}،', '', f'لديك {len(items)} إشعار جديد:', '']
+    for item in items[:MAX_ITEMS_PER_DIGEST]:
+        created = timezone.localtime(item['created_at']).strftime('%Y-%m-%d %H:%M')
+        lines.append(f"- [{created}] {item['title']}")
+        lines.append(f"  {item['message']}")
+        if item['link']:
+            lines.append(f"  {item['link']}")
+    if len(items) > MAX_ITEMS_PER_DIGEST:
+        lines.append('')
+        lines.append(f'و {len(items) - MAX_ITEMS_PER_DIGEST} إشعار آخر في النظام.')
+    return '\n'.join(lines)
+
+
+def _mark_emailed(ids: List[int], when) -> None:
+    for offset in range(0, len(ids), ID_BATCH_SIZE):
+        Notification.objects.filter(id__in=ids[offset:offset + ID_BATCH_SIZE]).update(emailed_at=when)
+
+
+def send_notification_digests(period: str) -> Dict[str, int]:
+    """
+    Email one digest per user for all pending notifications of a period
+    إرسال ملخص واحد لكل مستخدم
+
+    Notifications already read in the system, and those of users without an
+    email address, are marked as handled without being emailed.
+
+    Returns:
+        Dictionary with emails sent, notifications included and skipped
+    """
+    if period not in DIGEST_PERIODS:
+        raise ValueError(f"Unknown digest period: {period}")
+
+    now = timezone.now()
+    pending = Notification.objects.filter(
+        emailed_at__isnull=True,
+        created_at__lte=now,
+        user__email_digest=period,
+        user__is_active=True,
+    ).order_by('user_id', 'created_at').values(
+        'id', 'user_id', 'user__email', 'user__first_name', 'user__username',
+        'title', 'message', 'link', 'is_read', 'created_at',
+    )
+
+    messages = []
+    skipped = []
+    for user_id, rows in groupby(pending.iterator(chunk_size=2000), key=lambda row: row['user_id']):
+        rows = list(rows)
+        unread = [row for row in rows if not row['is_read']]
+        email = rows[0]['user__email']
+        if not email or not unread:
+            skipped.extend(row['id'] for row in rows)
+            continue
+        name = rows[0]['user__first_name'] or rows[0]['user__username']
+        messages.append((
+            EmailMessage(
+                subject=PERIOD_TITLES[period],
+                body=_render(name, unread),
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[email],
+            ),
+            [row['id'] for row in rows],
+        ))
+
+    _mark_emailed(skipped, now)
+
+    stats = {'emails': 0, 'notifications': 0, 'skipped': len(skipped)}
+    if not messages:
+        return stats
+
+    # One SMTP connection for all batches
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        for offset in range(0, len(messages), SEND_BATCH_SIZE):
+            batch = messages[offset:offset + SEND_BATCH_SIZE]
+            try:
+                sent = connection.send_messages([message for message, ids in batch]) or 0
+            except Exception as e:
+                # Left unmarked, so they are retried with the next digest
+                logger.error(f"Error sending notification digests: {e}")
+                connection.close()
+                continue
+            ids = [notification_id for message, notification_ids in batch for notification_id in notification_ids]
+            _mark_emailed(ids, now)
+            stats['emails'] += sent
+            stats['notifications'] += len(ids)
+    finally:
+        connection.close()
+
+    logger.info(
+        f"Sent {stats['emails']} {period} digests covering {stats['notifications']} notifications"
+    )
+    return stats
@@ -99,13 +99,14 @@ class UserProfileForm(forms.ModelForm):
     """
     class Meta:
         model = User
-        fields = ['first_name', 'last_name', 'email', 'phone', 'avatar']
+        fields = ['first_name', 'last_name', 'email', 'phone', 'avatar', 'email_digest']
         labels = {
             'first_name': 'الاسم الأول',
             'last_name': 'اسم العائلة',
             'email': 'البريد الإلكتروني',
             'phone': 'رقم الهاتف',
             'avatar': 'الصورة الشخصية',
+            'email_digest': 'ملخص الإشعارات بالبريد',
         }
         widgets = {
             'first_name': forms.TextInput(attrs={'class': 'form-control'}),
@@ -113,6 +114,7 @@ class UserProfileForm(forms.ModelForm):
             'email': forms.EmailInput(attrs={'class': 'form-control'}),
             'phone': forms.TextInput(attrs={'class': 'form-control'}),
             'avatar': forms.FileInput(attrs={'class': 'form-control'}),
+            'email_digest': forms.Select(attrs={'class': 'form-control'}),
         }
     
     def __init__(self, *args, **kwargs):
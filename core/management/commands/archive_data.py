@@ -0,0 +1,55 @@
+"""
+Django management command to archive or restore high-volume tables
+أمر إدارة Django لأرشفة الجداول كبيرة الحجم أو استعادتها
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from core.archive import POLICIES, archive_policy, get_policy, restore_month
+
+
+class Command(BaseCommand):
+    help = 'Archive old rows into monthly files, or restore a month | أرشفة السجلات القديمة أو استعادة شهر'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--policy',
+            type=str,
+            choices=sorted(POLICIES),
+            help='Archive policy (default: all policies)',
+        )
+        parser.add_argument(
+            '--restore',
+            type=str,
+            help='Restore a month (YYYY-MM) of the given policy instead of archiving',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the rows that would be archived',
+        )
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        if options['restore']:
+            if not options['policy']:
+                raise CommandError('--restore requires --policy')
+            try:
+                month = datetime.strptime(options['restore'], '%Y-%m')
+            except ValueError:
+                raise CommandError(f"Invalid month: {options['restore']} (expected YYYY-MM)")
+            restored = restore_month(get_policy(options['policy']), month.year, month.month)
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ Restored {restored} rows of {options['policy']} for {month:%Y-%m}"
+            ))
+            return
+
+        names = [options['policy']] if options['policy'] else sorted(POLICIES)
+        for name in names:
+            stats = archive_policy(get_policy(name), dry_run=options['dry_run'])
+            if options['dry_run']:
+                self.stdout.write(f"{name}: {stats['rows']} rows eligible for archival")
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"✓ {name}: archived {stats['rows']} rows in {stats['months']} months"
+                ))
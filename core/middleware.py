@@ -0,0 +1,121 @@
+"""
+Middleware for core app
+البرمجيات الوسيطة لتطبيق النواة
+"""
+import random
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+
+from . import audit, db_router, profiling, query_stats
+from .utils import get_client_ip
+
+
+class AuditContextMiddleware:
+    """
+    Make the acting user and IP address available to audit entries
+    تمرير المستخدم وعنوان IP لسجل التدقيق
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        audit.set_context(getattr(request, 'user', None), get_client_ip(request))
+        try:
+            return self.get_response(request)
+        finally:
+            audit.clear_context()
+
+
+class QueryStatsMiddleware:
+    """
+    Record SQL query statistics of a sample of requests
+    تسجيل إحصائيات الاستعلامات لعينة من الطلبات
+
+    Settings:
+        QUERY_STATS_SAMPLE_RATE: Fraction of requests measured (0 disables)
+        QUERY_STATS_SERVER_TIMING: Add a Server-Timing header to measured
+            responses
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'QUERY_STATS_SAMPLE_RATE', 0.0)
+        self.server_timing = getattr(settings, 'QUERY_STATS_SERVER_TIMING', False)
+
+    def __call__(self, request):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        recorder = query_stats.QueryRecorder()
+        started_at = timezone.now()
+        started = time.perf_counter()
+        with recorder.record():
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        if self.server_timing:
+            response['Server-Timing'] = query_stats.server_timing(recorder, duration)
+        query_stats.save(request, response, started_at, duration, recorder)
+        return response
+
+
+class ReplicaStickyMiddleware:
+    """
+    Keep a user's reads on the primary database for a short time after they
+    submit a change (see core.db_router)
+    إبقاء قراءات المستخدم على الخادم الرئيسي بعد التعديل
+
+    Not used unless a replica database is configured.
+    """
+
+    def __init__(self, get_response):
+        if not db_router.replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, 'user', None)
+        if request.method not in db_router.SAFE_METHODS and user is not None and user.is_authenticated:
+            db_router.mark_sticky(user.pk)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profile sampled requests, or any request of a superuser sending
+    ``X-Profile: 1`` (see core.profiling)
+    تحليل أداء عينة من الطلبات
+
+    Placed last, so the profile covers the view and not the other middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profiling.should_profile_request(request):
+            return self.get_response(request)
+
+        profiler = profiling.start()
+        if profiler is None:
+            return self.get_response(request)
+
+        started_at = timezone.now()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiling.stop(profiler)
+        duration = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        profiling.save(
+            profiler, 'view', (match.view_name if match else '') or request.path, duration, started_at,
+            path=request.path, user=getattr(request, 'user', None), status=str(response.status_code),
+        )
+        return response
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_auditlog_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('policy', models.CharField(max_length=50, verbose_name='سياسة الأرشفة')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='السنة')),
+                ('month', models.PositiveSmallIntegerField(verbose_name='الشهر')),
+                ('file', models.FileField(upload_to='archives/', verbose_name='الملف')),
+                ('row_count', models.PositiveIntegerField(default=0, verbose_name='عدد السجلات')),
+                ('min_pk', models.BigIntegerField(verbose_name='أصغر معرف')),
+                ('max_pk', models.BigIntegerField(verbose_name='أكبر معرف')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الأرشفة')),
+            ],
+            options={
+                'verbose_name': 'ملف أرشيف',
+                'verbose_name_plural': 'ملفات الأرشيف',
+                'db_table': 'Tbl_Archive_Segments',
+                'ordering': ['policy', '-year', '-month'],
+                'indexes': [models.Index(fields=['policy', 'year', 'month'], name='archive_policy_month_idx'), models.Index(fields=['policy', 'min_pk', 'max_pk'], name='archive_policy_pk_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:41
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_existing_emailed(apps, schema_editor):
+    # Notifications created before digests existed are not emailed
+    Notification = apps.get_model('core', 'Notification')
+    Notification.objects.filter(emailed_at__isnull=True).update(emailed_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_archivesegment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='emailed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='تاريخ الإرسال بالبريد'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='email_digest',
+            field=models.CharField(choices=[('none', 'بدون بريد إلكتروني'), ('hourly', 'ملخص كل ساعة'), ('daily', 'ملخص يومي')], default='daily', max_length=10, verbose_name='ملخص الإشعارات بالبريد'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['emailed_at', 'user'], name='notification_emailed_idx'),
+        ),
+        migrations.RunPython(mark_existing_emailed, migrations.RunPython.noop),
+    ]
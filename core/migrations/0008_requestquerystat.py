@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_notification_unread_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestQueryStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=255, verbose_name='المسار')),
+                ('view_name', models.CharField(blank=True, max_length=150, verbose_name='اسم العرض')),
+                ('method', models.CharField(max_length=10, verbose_name='الطريقة')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='رمز الاستجابة')),
+                ('started_at', models.DateTimeField(verbose_name='وقت البدء')),
+                ('duration_ms', models.PositiveIntegerField(verbose_name='المدة (مللي ثانية)')),
+                ('db_time_ms', models.PositiveIntegerField(verbose_name='وقت قاعدة البيانات (مللي ثانية)')),
+                ('query_count', models.PositiveIntegerField(verbose_name='عدد الاستعلامات')),
+                ('duplicate_count', models.PositiveIntegerField(default=0, verbose_name='الاستعلامات المكررة')),
+                ('duplicates', models.JSONField(blank=True, default=list, verbose_name='الاستعلامات المتكررة')),
+                ('slowest', models.JSONField(blank=True, default=list, verbose_name='أبطأ الاستعلامات')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='request_query_stats', to=settings.AUTH_USER_MODEL, verbose_name='المستخدم')),
+            ],
+            options={
+                'verbose_name': 'إحصائية استعلامات طلب',
+                'verbose_name_plural': 'إحصائيات استعلامات الطلبات',
+                'db_table': 'Tbl_Request_Query_Stats',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['started_at'], name='query_stat_started_idx'), models.Index(fields=['view_name', 'started_at'], name='query_stat_view_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_requestquerystat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('view', 'عرض'), ('task', 'مهمة')], max_length=10, verbose_name='النوع')),
+                ('name', models.CharField(max_length=200, verbose_name='الاسم')),
+                ('path', models.CharField(blank=True, max_length=255, verbose_name='المسار')),
+                ('status', models.CharField(blank=True, max_length=20, verbose_name='الحالة')),
+                ('started_at', models.DateTimeField(verbose_name='وقت البدء')),
+                ('duration_ms', models.PositiveIntegerField(verbose_name='المدة (مللي ثانية)')),
+                ('function_calls', models.PositiveIntegerField(default=0, verbose_name='عدد استدعاءات الدوال')),
+                ('top_functions', models.JSONField(blank=True, default=list, verbose_name='أعلى الدوال')),
+                ('stats_file', models.FileField(upload_to='profiles/', verbose_name='ملف التحليل')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='profile_records', to=settings.AUTH_USER_MODEL, verbose_name='المستخدم')),
+            ],
+            options={
+                'verbose_name': 'تحليل أداء',
+                'verbose_name_plural': 'تحليلات الأداء',
+                'db_table': 'Tbl_Profile_Records',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['kind', 'name', 'started_at'], name='profile_kind_name_idx'), models.Index(fields=['started_at'], name='profile_started_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+def opt_out_defaulted_users(apps, schema_editor):
+    # 0006 gave every existing user the daily digest without asking; digests
+    # are opt-in, so only users who picked the hourly digest keep it
+    User = apps.get_model('core', 'User')
+    User.objects.filter(email_digest='daily').update(email_digest='none')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_profilerecord'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='email_digest',
+            field=models.CharField(choices=[('none', 'بدون بريد إلكتروني'), ('hourly', 'ملخص كل ساعة'), ('daily', 'ملخص يومي')], default='none', max_length=10, verbose_name='ملخص الإشعارات بالبريد'),
+        ),
+        migrations.RunPython(opt_out_defaulted_users, migrations.RunPython.noop),
+    ]
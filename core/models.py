@@ -55,6 +55,16 @@ class User(AbstractUser):
         null=True,
         verbose_name='آخر IP للدخول'
     )
+    email_digest = models.CharField(
+        max_length=10,
+        choices=[
+            ('none', 'بدون بريد إلكتروني'),
+            ('hourly', 'ملخص كل ساعة'),
+            ('daily', 'ملخص يومي'),
+        ],
+        default='none',
+        verbose_name='ملخص الإشعارات بالبريد'
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='تاريخ الإنشاء'
@@ -123,6 +133,13 @@ class BaseModel(models.Model):
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Loaded values, kept by reference for the audit diff on save
+        instance._loaded_values = (field_names, values)
+        return instance
+
 
 class SystemSettings(models.Model):
     """
@@ -444,7 +461,8 @@ class AuditLog(models.Model):
         verbose_name='عنوان IP'
     )
     timestamp = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         verbose_name='الوقت'
     )
     
@@ -508,19 +526,219 @@ class Notification(models.Model):
         blank=True,
         verbose_name='تاريخ القراءة'
     )
+    emailed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='تاريخ الإرسال بالبريد'
+    )
     
     class Meta:
         db_table = 'Tbl_Notifications'
         verbose_name = 'إشعار'
         verbose_name_plural = 'الإشعارات'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['emailed_at', 'user'], name='notification_emailed_idx'),
+            models.Index(fields=['user', 'is_read'], name='notification_unread_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.user.username}"
     
     def mark_as_read(self):
         """Mark notification as read"""
-        self.is_read = True
-        self.read_at = timezone.now()
-        self.save()
+        from .notifications import mark_read
+        if not self.is_read:
+            mark_read(self.user, [self.pk])
+            self.is_read = True
+            self.read_at = timezone.now()
+
+
+
+class ArchiveSegment(models.Model):
+    """
+    Compressed monthly archive file of rows moved out of a hot table
+    ملف أرشيف شهري مضغوط للسجلات القديمة
+    """
+    policy = models.CharField(
+        max_length=50,
+        verbose_name='سياسة الأرشفة'
+    )
+    year = models.PositiveSmallIntegerField(
+        verbose_name='السنة'
+    )
+    month = models.PositiveSmallIntegerField(
+        verbose_name='الشهر'
+    )
+    file = models.FileField(
+        upload_to='archives/',
+        verbose_name='الملف'
+    )
+    row_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='عدد السجلات'
+    )
+    min_pk = models.BigIntegerField(
+        verbose_name='أصغر معرف'
+    )
+    max_pk = models.BigIntegerField(
+        verbose_name='أكبر معرف'
+    )
+    archived_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='تاريخ الأرشفة'
+    )
+    
+    class Meta:
+        db_table = 'Tbl_Archive_Segments'
+        verbose_name = 'ملف أرشيف'
+        verbose_name_plural = 'ملفات الأرشيف'
+        ordering = ['policy', '-year', '-month']
+        indexes = [
+            models.Index(fields=['policy', 'year', 'month'], name='archive_policy_month_idx'),
+            models.Index(fields=['policy', 'min_pk', 'max_pk'], name='archive_policy_pk_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.policy} {self.year}-{self.month:02d} ({self.row_count})"
+
+
+class RequestQueryStat(models.Model):
+    """
+    SQL query statistics of one sampled request
+    إحصائيات استعلامات طلب واحد
+    """
+    path = models.CharField(
+        max_length=255,
+        verbose_name='المسار'
+    )
+    view_name = models.CharField(
+        max_length=150,
+        blank=True,
+        verbose_name='اسم العرض'
+    )
+    method = models.CharField(
+        max_length=10,
+        verbose_name='الطريقة'
+    )
+    status_code = models.PositiveSmallIntegerField(
+        verbose_name='رمز الاستجابة'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='request_query_stats',
+        verbose_name='المستخدم'
+    )
+    started_at = models.DateTimeField(
+        verbose_name='وقت البدء'
+    )
+    duration_ms = models.PositiveIntegerField(
+        verbose_name='المدة (مللي ثانية)'
+    )
+    db_time_ms = models.PositiveIntegerField(
+        verbose_name='وقت قاعدة البيانات (مللي ثانية)'
+    )
+    query_count = models.PositiveIntegerField(
+        verbose_name='عدد الاستعلامات'
+    )
+    duplicate_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='الاستعلامات المكررة'
+    )
+    duplicates = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='الاستعلامات المتكررة'
+    )
+    slowest = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='أبطأ الاستعلامات'
+    )
+    
+    class Meta:
+        db_table = 'Tbl_Request_Query_Stats'
+        verbose_name = 'إحصائية استعلامات طلب'
+        verbose_name_plural = 'إحصائيات استعلامات الطلبات'
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['started_at'], name='query_stat_started_idx'),
+            models.Index(fields=['view_name', 'started_at'], name='query_stat_view_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.query_count})"
+
 
+class ProfileRecord(models.Model):
+    """
+    cProfile result of one profiled request or task run
+    نتيجة تحليل أداء طلب أو مهمة
+    """
+    KIND_CHOICES = [
+        ('view', 'عرض'),
+        ('task', 'مهمة'),
+    ]
+    
+    kind = models.CharField(
+        max_length=10,
+        choices=KIND_CHOICES,
+        verbose_name='النوع'
+    )
+    name = models.CharField(
+        max_length=200,
+        verbose_name='الاسم'
+    )
+    path = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name='المسار'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='profile_records',
+        verbose_name='المستخدم'
+    )
+    status = models.CharField(
+        max_length=20,
+        blank=True,
+        verbose_name='الحالة'
+    )
+    started_at = models.DateTimeField(
+        verbose_name='وقت البدء'
+    )
+    duration_ms = models.PositiveIntegerField(
+        verbose_name='المدة (مللي ثانية)'
+    )
+    function_calls = models.PositiveIntegerField(
+        default=0,
+        verbose_name='عدد استدعاءات الدوال'
+    )
+    top_functions = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='أعلى الدوال'
+    )
+    stats_file = models.FileField(
+        upload_to='profiles/',
+        verbose_name='ملف التحليل'
+    )
+    
+    class Meta:
+        db_table = 'Tbl_Profile_Records'
+        verbose_name = 'تحليل أداء'
+        verbose_name_plural = 'تحليلات الأداء'
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['kind', 'name', 'started_at'], name='profile_kind_name_idx'),
+            models.Index(fields=['started_at'], name='profile_started_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.duration_ms} ms)"
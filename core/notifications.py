@@ -0,0 +1,136 @@
+"""
+Notification writes, unread counters and the keyset-paginated inbox
+كتابة الإشعارات وعداد غير المقروء وصندوق الوارد
+
+The unread count of each user is kept in the cache. Notifications are
+created with ``bulk_create`` and marked read with a single ``update()``, and
+both adjust the cached counter directly, so the badge shown on every page
+costs one cache lookup. A missing counter is recomputed with one COUNT, and
+the timeout bounds drift from writes that bypass these helpers (admin).
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Notification
+
+COUNTER_TIMEOUT = 600
+
+INBOX_PAGE_SIZE = 25
+
+BULK_BATCH_SIZE = 500
+
+# Ids per statement, below SQL Server's 2100 parameter limit
+ID_BATCH_SIZE = 1000
+
+
+def _counter_key(user_id: int) -> str:
+    return f'notifications:unread:{user_id}'
+
+
+def unread_count(user_id: int) -> int:
+    """Unread notifications of a user, from the cache when possible"""
+    key = _counter_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        cache.set(key, count, COUNTER_TIMEOUT)
+    return count
+
+
+def _adjust(user_id: int, delta: int) -> None:
+    key = _counter_key(user_id)
+    try:
+        value = cache.incr(key, delta)
+    except ValueError:
+        # Not cached; recomputed on next read
+        return
+    if value < 0:
+        cache.delete(key)
+
+
+def create_notifications(entries: Iterable[Dict]) -> List[Notification]:
+    """
+    Create many notifications with one bulk insert
+    إنشاء عدة إشعارات دفعة واحدة
+
+    Args:
+        entries: Dictionaries with user, title, message and optional
+            notification_type and link
+    """
+    notifications = [
+        Notification(
+            user=entry['user'],
+            title=entry['title'],
+            message=entry['message'],
+            notification_type=entry.get('notification_type', 'info'),
+            link=entry.get('link'),
+        )
+        for entry in entries
+    ]
+    Notification.objects.bulk_create(notifications, batch_size=BULK_BATCH_SIZE)
+
+    added: Dict[int, int] = {}
+    for notification in notifications:
+        added[notification.user_id] = added.get(notification.user_id, 0) + 1
+
+    def bump():
+        for user_id, count in added.items():
+            _adjust(user_id, count)
+
+    transaction.on_commit(bump)
+    return notifications
+
+
+def mark_read(user, ids: Optional[List[int]] = None) -> int:
+    """
+    Mark a user's notifications (or only ``ids``) as read with one update
+    تحديد الإشعارات كمقروءة
+
+    Returns:
+        Number of notifications marked
+    """
+    unread = Notification.objects.filter(user=user, is_read=False)
+    now = timezone.now()
+    if ids is None:
+        marked = unread.update(is_read=True, read_at=now)
+        transaction.on_commit(lambda: cache.set(_counter_key(user.pk), 0, COUNTER_TIMEOUT))
+        return marked
+
+    marked = 0
+    for offset in range(0, len(ids), ID_BATCH_SIZE):
+        marked += unread.filter(id__in=ids[offset:offset + ID_BATCH_SIZE]).update(is_read=True, read_at=now)
+    if marked:
+        transaction.on_commit(lambda: _adjust(user.pk, -marked))
+    return marked
+
+
+def delete_notification(notification: Notification) -> None:
+    """Delete a notification, keeping the unread counter in step"""
+    was_unread = not notification.is_read
+    user_id = notification.user_id
+    notification.delete()
+    if was_unread:
+        transaction.on_commit(lambda: _adjust(user_id, -1))
+
+
+def inbox_page(user, before: Optional[int] = None, unread_only: bool = False,
+               page_size: int = INBOX_PAGE_SIZE) -> Tuple[List[Notification], Optional[int]]:
+    """
+    One page of a user's notifications, newest first, by keyset on id
+    صفحة من صندوق الإشعارات
+
+    Returns:
+        (notifications, id to pass as ``before`` for the next page or None)
+    """
+    notifications = Notification.objects.filter(user=user)
+    if unread_only:
+        notifications = notifications.filter(is_read=False)
+    if before:
+        notifications = notifications.filter(id__lt=before)
+
+    page = list(notifications.order_by('-id')[:page_size + 1])
+    next_before = page[page_size - 1].id if len(page) > page_size else None
+    return page[:page_size], next_before
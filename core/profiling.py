@@ -0,0 +1,217 @@
+"""
+On-demand cProfile profiling of views and Celery tasks
+تحليل أداء العروض ومهام Celery عند الطلب
+
+Profiling is controlled by system settings, so it can be switched on and off
+from the settings screen without a redeploy:
+
+- ``profiling_enabled``: master switch for sampling
+- ``profiling_sample_rate``: fraction of requests and matching task runs
+  profiled (e.g. 0.01)
+- ``profiling_tasks``: comma separated task name patterns eligible for
+  profiling (default ``attendance.*``)
+- ``profiling_retention_days``: days profiles are kept (default 7)
+
+A superuser can also profile a single request by sending the
+``X-Profile: 1`` header, and a task run can be profiled by sending it with
+``apply_async(headers={'profile': True})``; both work even when sampling is
+off.
+
+Each profile is stored as a ``ProfileRecord`` with its metadata, the top
+functions by cumulative time, and the raw pstats file for tools such as
+snakeviz.
+"""
+import cProfile
+import fnmatch
+import io
+import logging
+import os
+import pstats
+import random
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, List
+
+from django.core.files import File
+from django.utils import timezone
+
+from .app_settings import get_bool, get_float, get_int, get_list
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+
+DEFAULT_TASK_PATTERNS = ['attendance.*']
+
+DEFAULT_RETENTION_DAYS = 7
+
+# Functions kept in the stored summary
+TOP_FUNCTIONS = 30
+
+# Ids per statement, below SQL Server's 2100 parameter limit
+ID_BATCH_SIZE = 1000
+
+# Only one profiler can run per thread; eager tasks inside a profiled
+# request are not profiled separately
+_active = threading.local()
+
+# Running task profiles by task id
+_task_profiles: Dict[str, Dict] = {}
+
+
+def _sampled() -> bool:
+    if not get_bool('profiling_enabled'):
+        return False
+    return random.random() < (get_float('profiling_sample_rate', 0.0) or 0.0)
+
+
+def should_profile_request(request) -> bool:
+    """Whether to profile this request (header for superusers, or sampling)"""
+    user = getattr(request, 'user', None)
+    if request.headers.get(PROFILE_HEADER) == '1' and user is not None and user.is_superuser:
+        return True
+    return _sampled()
+
+
+def should_profile_task(task) -> bool:
+    """Whether to profile this task run (profile header, or sampling of matching tasks)"""
+    # Custom headers are request attributes on workers, and only in
+    # request.headers for eager runs
+    if getattr(task.request, 'profile', False) or (getattr(task.request, 'headers', None) or {}).get('profile'):
+        return True
+    patterns = get_list('profiling_tasks', default=DEFAULT_TASK_PATTERNS)
+    if not any(fnmatch.fnmatchcase(task.name, pattern) for pattern in patterns):
+        return False
+    return _sampled()
+
+
+def start():
+    """Start a profiler on this thread; None when one is already running"""
+    if getattr(_active, 'profiler', None) is not None:
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+ allows one profiling tool per process; another thread
+        # or a debugger already holds it, so run unprofiled
+        return None
+    _active.profiler = profiler
+    return profiler
+
+
+def stop(profiler) -> None:
+    profiler.disable()
+    _active.profiler = None
+
+
+def top_functions(stats: pstats.Stats, limit: int = TOP_FUNCTIONS) -> List[Dict]:
+    """Functions with the highest cumulative time"""
+    rows = []
+    for (filename, line, name), (primitive, calls, tottime, cumtime, callers) in stats.stats.items():
+        rows.append({
+            'function': name,
+            'file': filename,
+            'line': line,
+            'calls': calls,
+            'tottime_ms': round(tottime * 1000, 2),
+            'cumtime_ms': round(cumtime * 1000, 2),
+        })
+    rows.sort(key=lambda row: -row['cumtime_ms'])
+    return rows[:limit]
+
+
+def save(profiler, kind: str, name: str, duration: float, started_at, path: str = '',
+         user=None, status: str = '') -> None:
+    """
+    Store a finished profile
+    حفظ نتيجة التحليل
+    """
+    from .models import ProfileRecord
+
+    try:
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        with tempfile.NamedTemporaryFile(suffix='.prof', delete=False) as tmp:
+            filename = tmp.name
+        try:
+            stats.dump_stats(filename)
+            record = ProfileRecord(
+                kind=kind,
+                name=name[:200],
+                path=path[:255],
+                user=user if user is not None and user.is_authenticated else None,
+                status=status[:20],
+                started_at=started_at,
+                duration_ms=int(duration * 1000),
+                function_calls=stats.total_calls,
+                top_functions=top_functions(stats),
+            )
+            with open(filename, 'rb') as fileobj:
+                record.stats_file.save(
+                    f"{kind}/{started_at:%Y%m%d_%H%M%S}_{name.replace(':', '_').replace('.', '_')[:80]}.prof",
+                    File(fileobj),
+                    save=True,
+                )
+        finally:
+            os.remove(filename)
+        logger.info(f"Profiled {kind} {name}: {int(duration * 1000)} ms, {stats.total_calls} calls")
+    except Exception as e:
+        logger.error(f"Error saving profile of {kind} {name}: {str(e)}")
+
+
+# Celery hooks
+
+def _task_prerun(task_id=None, task=None, **kwargs):
+    if task is None or not should_profile_task(task):
+        return
+    profiler = start()
+    if profiler is not None:
+        _task_profiles[task_id] = {
+            'profiler': profiler,
+            'started_at': timezone.now(),
+            'started': time.perf_counter(),
+        }
+
+
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    entry = _task_profiles.pop(task_id, None)
+    if entry is None:
+        return
+    stop(entry['profiler'])
+    save(entry['profiler'], 'task', task.name, time.perf_counter() - entry['started'],
+         entry['started_at'], status=state or '')
+
+
+def connect_signals() -> None:
+    """Profile sampled Celery tasks (called from AppConfig.ready)"""
+    from celery.signals import task_postrun, task_prerun
+
+    task_prerun.connect(_task_prerun, weak=False, dispatch_uid='profiling_task_prerun')
+    task_postrun.connect(_task_postrun, weak=False, dispatch_uid='profiling_task_postrun')
+
+
+def prune(days: int = None) -> int:
+    """
+    Delete profiles older than the retention period with their files
+    حذف ملفات التحليل القديمة
+
+    Returns:
+        Number of profiles deleted
+    """
+    from .models import ProfileRecord
+
+    if days is None:
+        days = get_int('profiling_retention_days', DEFAULT_RETENTION_DAYS)
+    old = ProfileRecord.objects.filter(started_at__lt=timezone.now() - timedelta(days=days))
+    deleted = 0
+    while True:
+        batch = list(old.values_list('id', 'stats_file')[:ID_BATCH_SIZE])
+        if not batch:
+            return deleted
+        ProfileRecord.objects.filter(id__in=[row[0] for row in batch]).delete()
+        for _, name in batch:
+            if name:
+                ProfileRecord.stats_file.field.storage.delete(name)
+        deleted += len(batch)
@@ -0,0 +1,199 @@
+"""
+Per-request SQL query statistics
+إحصائيات استعلامات قاعدة البيانات لكل طلب
+
+``QueryStatsMiddleware`` samples a fraction of requests
+(``QUERY_STATS_SAMPLE_RATE``). For a sampled request every statement run on
+any database connection is timed and fingerprinted; the middleware then
+stores the query count, database time, repeated statements (N+1 patterns)
+and the slowest statements in ``RequestQueryStat`` and logs a summary line.
+With ``QUERY_STATS_SERVER_TIMING`` the totals are also sent in a
+``Server-Timing`` response header.
+
+Requests that are not sampled only pay for one random number. Stored rows
+are pruned after ``QUERY_STATS_RETENTION_DAYS`` by a daily task.
+"""
+import hashlib
+import heapq
+import logging
+import re
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+from typing import Dict, List
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Slowest statements kept per request
+SLOWEST_COUNT = 5
+
+# Repeated statements kept per request
+DUPLICATES_COUNT = 10
+
+# Longest SQL text kept per statement
+MAX_SQL_LENGTH = 1000
+
+# A request with this many repeats of one statement is logged as a warning
+DUPLICATE_WARNING_THRESHOLD = 10
+
+# Ids per statement, below SQL Server's 2100 parameter limit
+ID_BATCH_SIZE = 1000
+
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*%s\s*,?)+\)', re.IGNORECASE)
+_VALUES_LIST = re.compile(r'\bVALUES\s*(?:\((?:\s*%s\s*,?)+\)\s*,?\s*)+', re.IGNORECASE)
+_NUMBER = re.compile(r'\b\d+\b')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_sql(sql: str) -> str:
+    """SQL with literals and placeholder lists collapsed, for grouping"""
+    sql = _STRING.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _VALUES_LIST.sub('VALUES (...) ', sql)
+    sql = _NUMBER.sub('?', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def fingerprint(sql: str) -> str:
+    return hashlib.md5(normalize_sql(sql).encode('utf-8')).hexdigest()[:12]
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper timing and fingerprinting each statement
+    مسجل الاستعلامات ووقت تنفيذها
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Dict[str, Dict] = {}
+        self._slowest: List = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            self._add(sql, elapsed)
+
+    def _add(self, sql: str, elapsed: float) -> None:
+        key = fingerprint(sql)
+        statement = self.statements.get(key)
+        if statement is None:
+            statement = self.statements[key] = {'sql': sql[:MAX_SQL_LENGTH], 'count': 0, 'seconds': 0.0}
+        statement['count'] += 1
+        statement['seconds'] += elapsed
+
+        # Min-heap of the slowest statements seen so far
+        item = (elapsed, self.count, sql[:MAX_SQL_LENGTH])
+        if len(self._slowest) < SLOWEST_COUNT:
+            heapq.heappush(self._slowest, item)
+        elif elapsed > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, item)
+
+    def duplicates(self) -> List[Dict]:
+        """Statements run more than once, most repeated first"""
+        repeated = [
+            {'fingerprint': key, 'count': item['count'],
+             'ms': round(item['seconds'] * 1000, 2), 'sql': item['sql']}
+            for key, item in self.statements.items() if item['count'] > 1
+        ]
+        repeated.sort(key=lambda item: (-item['count'], -item['ms']))
+        return repeated[:DUPLICATES_COUNT]
+
+    def duplicate_count(self) -> int:
+        """Statements that repeated an earlier one"""
+        return sum(item['count'] - 1 for item in self.statements.values())
+
+    def slowest(self) -> List[Dict]:
+        return [
+            {'ms': round(elapsed * 1000, 2), 'sql': sql}
+            for elapsed, _, sql in sorted(self._slowest, reverse=True)
+        ]
+
+    def record(self):
+        """Start recording on every database connection (context manager)"""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+
+def server_timing(recorder: QueryRecorder, duration: float) -> str:
+    """Server-Timing header value for a measured request"""
+    db_ms = recorder.seconds * 1000
+    return (
+        f'db;dur={db_ms:.1f};desc="{recorder.count} queries", '
+        f'app;dur={max(duration * 1000 - db_ms, 0):.1f}, '
+        f'total;dur={duration * 1000:.1f}'
+    )
+
+
+def save(request, response, started_at, duration: float, recorder: QueryRecorder) -> None:
+    """Store and log the statistics of a sampled request"""
+    from .models import RequestQueryStat
+
+    match = getattr(request, 'resolver_match', None)
+    view_name = (match.view_name if match else '') or ''
+    duplicate_count = recorder.duplicate_count()
+    duplicates = recorder.duplicates()
+    duration_ms = int(duration * 1000)
+    db_time_ms = int(recorder.seconds * 1000)
+
+    summary = (
+        f"{request.method} {request.path} [{view_name}] {response.status_code}: "
+        f"{recorder.count} queries ({duplicate_count} repeated) in {db_time_ms} ms, "
+        f"total {duration_ms} ms"
+    )
+    if duplicates and duplicates[0]['count'] >= DUPLICATE_WARNING_THRESHOLD:
+        logger.warning(f"{summary}; {duplicates[0]['count']}x {duplicates[0]['sql'][:200]}")
+    else:
+        logger.info(summary)
+
+    user = getattr(request, 'user', None)
+    try:
+        RequestQueryStat.objects.create(
+            path=request.path[:255],
+            view_name=view_name[:150],
+            method=request.method,
+            status_code=response.status_code,
+            user=user if user is not None and user.is_authenticated else None,
+            started_at=started_at,
+            duration_ms=duration_ms,
+            db_time_ms=db_time_ms,
+            query_count=recorder.count,
+            duplicate_count=duplicate_count,
+            duplicates=duplicates,
+            slowest=recorder.slowest(),
+        )
+    except Exception as e:
+        logger.error(f"Error saving query statistics for {request.path}: {str(e)}")
+
+
+def prune(days: int = None) -> int:
+    """
+    Delete statistics older than the retention period, in batches
+    حذف الإحصائيات القديمة
+
+    Returns:
+        Number of rows deleted
+    """
+    from .models import RequestQueryStat
+
+    days = days if days is not None else getattr(settings, 'QUERY_STATS_RETENTION_DAYS', 14)
+    old = RequestQueryStat.objects.filter(started_at__lt=timezone.now() - timedelta(days=days))
+    deleted = 0
+    while True:
+        ids = list(old.values_list('id', flat=True)[:ID_BATCH_SIZE])
+        if not ids:
+            return deleted
+        deleted += RequestQueryStat.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,4 @@
+"""
+Session engines that avoid a database write on every request
+محركات الجلسات التي تتجنب الكتابة في قاعدة البيانات مع كل طلب
+"""
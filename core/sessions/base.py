@@ -0,0 +1,38 @@
+"""
+Write-avoiding session persistence
+حفظ الجلسات مع تجنب الكتابة غير الضرورية
+
+With ``SESSION_SAVE_EVERY_REQUEST`` Django saves the session after every
+request to slide its expiry forward. These stores skip that write unless
+the session data changed or the stored expiry was last pushed forward more
+than ``SESSION_REFRESH_SECONDS`` ago. The cookie is still refreshed on every
+response, and the server-side expiry trails the sliding
+``SESSION_COOKIE_AGE`` by at most ``SESSION_REFRESH_SECONDS``.
+"""
+import time
+
+from django.conf import settings
+
+DEFAULT_REFRESH_SECONDS = 300
+
+# Session data key holding when the session was last written
+PERSISTED_AT_KEY = '_persisted_at'
+
+
+class WriteAvoidingSessionMixin:
+    """
+    Skip saves of unchanged sessions whose expiry is still fresh
+    تخطي حفظ الجلسات غير المعدلة
+    """
+
+    def _refresh_due(self) -> bool:
+        persisted_at = self._get_session().get(PERSISTED_AT_KEY)
+        refresh_seconds = getattr(settings, 'SESSION_REFRESH_SECONDS', DEFAULT_REFRESH_SECONDS)
+        return persisted_at is None or time.time() - persisted_at >= refresh_seconds
+
+    def save(self, must_create=False):
+        if self.session_key is not None and not must_create and not self.modified and not self._refresh_due():
+            return
+        # Set directly so the stamp alone does not mark the session modified
+        self._get_session()[PERSISTED_AT_KEY] = int(time.time())
+        super().save(must_create)
@@ -0,0 +1,14 @@
+"""
+Cached database session store without per-request writes
+مخزن الجلسات في الذاكرة المؤقتة وقاعدة البيانات
+
+Reads are served from the cache, so the cache must be shared by all
+workers (file or Redis backend).
+"""
+from django.contrib.sessions.backends import cached_db
+
+from .base import WriteAvoidingSessionMixin
+
+
+class SessionStore(WriteAvoidingSessionMixin, cached_db.SessionStore):
+    pass
@@ -0,0 +1,11 @@
+"""
+Database session store without per-request writes
+مخزن الجلسات في قاعدة البيانات
+"""
+from django.contrib.sessions.backends import db
+
+from .base import WriteAvoidingSessionMixin
+
+
+class SessionStore(WriteAvoidingSessionMixin, db.SessionStore):
+    pass
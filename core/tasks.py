@@ -0,0 +1,122 @@
+"""
+Celery tasks for core app
+مهام Celery لتطبيق النواة
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='core.write_audit_entries')
+def write_audit_entries_task(entries):
+    """
+    Celery task to insert a batch of audit entries
+    مهمة Celery لحفظ دفعة من سجلات التدقيق
+
+    Args:
+        entries: Serialized entries queued by core.audit
+
+    Returns:
+        Number of entries written
+    """
+    from core.audit import write_entries
+
+    try:
+        return write_entries(entries)
+    except Exception as e:
+        logger.error(f"Error writing audit entries: {str(e)}")
+        raise
+
+
+@shared_task(name='core.archive_data')
+def archive_data_task(policy=None):
+    """
+    Celery task to archive rows older than their policy horizon
+    مهمة Celery لأرشفة السجلات القديمة
+
+    Args:
+        policy: Policy name (default: all policies)
+
+    Returns:
+        Dictionary of policy name to archive statistics
+    """
+    from core.archive import POLICIES, archive_policy, get_policy
+
+    try:
+        names = [policy] if policy else sorted(POLICIES)
+        results = {}
+        for name in names:
+            results[name] = archive_policy(get_policy(name))
+            logger.info(f"Archived {results[name]['rows']} {name} rows")
+        return results
+    except Exception as e:
+        logger.error(f"Error archiving data: {str(e)}")
+        raise
+
+
+@shared_task(name='core.send_notification_digests')
+def send_notification_digests_task(period='daily'):
+    """
+    Celery task to email notification digests
+    مهمة Celery لإرسال ملخصات الإشعارات بالبريد
+
+    Args:
+        period: 'hourly' or 'daily'
+
+    Returns:
+        Dictionary with sending statistics
+    """
+    from core.digest import send_notification_digests
+
+    try:
+        return send_notification_digests(period)
+    except Exception as e:
+        logger.error(f"Error sending {period} notification digests: {str(e)}")
+        raise
+
+
+@shared_task(name='core.prune_query_stats')
+def prune_query_stats_task(days=None):
+    """
+    Celery task to delete request query statistics past their retention
+    مهمة Celery لحذف إحصائيات الاستعلامات القديمة
+
+    Args:
+        days: Days to keep (default: QUERY_STATS_RETENTION_DAYS)
+
+    Returns:
+        Number of rows deleted
+    """
+    from core.query_stats import prune
+
+    try:
+        deleted = prune(days)
+        logger.info(f"Pruned {deleted} request query statistics")
+        return deleted
+    except Exception as e:
+        logger.error(f"Error pruning query statistics: {str(e)}")
+        raise
+
+
+@shared_task(name='core.prune_profiles')
+def prune_profiles_task(days=None):
+    """
+    Celery task to delete profiles past their retention
+    مهمة Celery لحذف ملفات التحليل القديمة
+
+    Args:
+        days: Days to keep (default: profiling_retention_days setting)
+
+    Returns:
+        Number of profiles deleted
+    """
+    from core.profiling import prune
+
+    try:
+        deleted = prune(days)
+        logger.info(f"Pruned {deleted} profiles")
+        return deleted
+    except Exception as e:
+        logger.error(f"Error pruning profiles: {str(e)}")
+        raise
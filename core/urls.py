@@ -19,6 +19,7 @@ urlpatterns = [
 
     # Notifications
     path('notifications/', views.notifications_list, name='notifications'),
+    path('notifications/mark-read/', views.mark_notifications_read, name='mark_notifications_read'),
     path('notifications/<int:pk>/', views.notification_detail, name='notification_detail'),
     path('notifications/<int:pk>/mark-read/', views.mark_notification_read, name='mark_notification_read'),
     path('notifications/<int:pk>/delete/', views.delete_notification, name='delete_notification'),
@@ -24,12 +24,14 @@ def log_action(user, action, model_name, object_id=None, description='', ip_addr
         ip_address: IP address of the user
     """
     try:
-        AuditLog.objects.create(
-            user=user,
-            action=action,
-            model_name=model_name,
+        from .audit import record
+        # Written in batches by the audit buffer once the transaction commits
+        record(
+            action,
+            model_name,
             object_id=object_id,
             description=description,
+            user_id=getattr(user, 'pk', None),
             ip_address=ip_address
         )
     except Exception as e:
@@ -49,13 +51,14 @@ def create_notification(user, title, message, notification_type='info', link=Non
         link: Optional link
     """
     try:
-        Notification.objects.create(
-            user=user,
-            title=title,
-            message=message,
-            notification_type=notification_type,
-            link=link
-        )
+        from .notifications import create_notifications
+        create_notifications([{
+            'user': user,
+            'title': title,
+            'message': message,
+            'notification_type': notification_type,
+            'link': link,
+        }])
     except Exception as e:
         logger.error(f"Error creating notification: {e}")
 
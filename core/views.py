@@ -5,15 +5,15 @@ Views for core app
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
 from django.contrib import messages
 from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import timedelta
+from .counters import get_counters
+from . import notifications as notification_store
 from .models import User, Notification, SystemSettings
 from .forms import LoginForm, UserProfileForm, CustomPasswordChangeForm, SystemSettingsForm
-from employees.models import Employee
-from attendance.models import Attendance, LeaveRequest
-from organization.models import Department
 
 
 def login_view(request):
@@ -61,43 +61,8 @@ def dashboard(request):
     Dashboard view
     عرض لوحة التحكم
     """
-    try:
-        today = timezone.now().date()
-
-        # Statistics
-        total_employees = Employee.objects.filter(is_active=True).count()
-
-        try:
-            present_today = Attendance.objects.filter(
-                date=today,
-                status__in=['present', 'late']
-            ).count()
-        except:
-            present_today = 0
-
-        try:
-            pending_leaves = LeaveRequest.objects.filter(status='pending').count()
-        except:
-            pending_leaves = 0
-
-        try:
-            total_departments = Department.objects.filter(is_active=True).count()
-        except:
-            total_departments = 0
-
-        context = {
-            'total_employees': total_employees,
-            'present_today': present_today,
-            'pending_leaves': pending_leaves,
-            'total_departments': total_departments,
-        }
-    except Exception as e:
-        context = {
-            'total_employees': 0,
-            'present_today': 0,
-            'pending_leaves': 0,
-            'total_departments': 0,
-        }
+    # Cached, invalidated when employees, attendance, leaves or departments change
+    context = get_counters()
 
     return render(request, 'core/dashboard_simple.html', context)
 
@@ -144,19 +109,22 @@ def notifications_list(request):
     Notifications list view
     عرض قائمة الإشعارات
     """
-    notifications = Notification.objects.filter(
-        user=request.user
-    ).order_by('-created_at')[:50]
+    try:
+        before = int(request.GET.get('before') or 0) or None
+    except ValueError:
+        before = None
+    unread_only = request.GET.get('unread') == '1'
     
-    # Mark as read
-    if request.GET.get('mark_read'):
-        notifications.filter(is_read=False).update(is_read=True)
-        messages.success(request, 'تم تحديد جميع الإشعارات كمقروءة.')
-        return redirect('core:notifications_list')
+    # Keyset pagination: newest first, continuing below the last id shown
+    notifications, next_before = notification_store.inbox_page(
+        request.user, before=before, unread_only=unread_only
+    )
     
     context = {
         'notifications': notifications,
-        'unread_count': notifications.filter(is_read=False).count(),
+        'next_before': next_before,
+        'unread_only': unread_only,
+        'unread_count': notification_store.unread_count(request.user.pk),
     }
     
     return render(request, 'core/notifications_list.html', context)
@@ -172,8 +140,7 @@ def notification_detail(request, pk):
     
     # Mark as read
     if not notification.is_read:
-        notification.is_read = True
-        notification.save()
+        notification.mark_as_read()
     
     return render(request, 'core/notification_detail.html', {'notification': notification})
 
@@ -227,11 +194,23 @@ def mark_notification_read(request, pk):
     Mark notification as read
     تحديد الإشعار كمقروء
     """
-    notification = get_object_or_404(Notification, pk=pk, user=request.user)
-    notification.is_read = True
-    notification.save()
+    notification_store.mark_read(request.user, [pk])
+    
+    return redirect('core:notifications')
+
+
+@login_required
+@require_POST
+def mark_notifications_read(request):
+    """
+    Mark the selected notifications, or all of them, as read
+    تحديد الإشعارات المختارة أو جميعها كمقروءة
+    """
+    ids = [int(value) for value in request.POST.getlist('ids') if value.isdigit()]
+    marked = notification_store.mark_read(request.user, ids or None)
+    messages.success(request, f'تم تحديد {marked} إشعار كمقروء.')
     
-    return redirect('core:notifications_list')
+    return redirect('core:notifications')
 
 
 @login_required
@@ -241,8 +220,8 @@ def delete_notification(request, pk):
     حذف الإشعار
     """
     notification = get_object_or_404(Notification, pk=pk, user=request.user)
-    notification.delete()
+    notification_store.delete_notification(notification)
     messages.success(request, 'تم حذف الإشعار بنجاح.')
     
-    return redirect('core:notifications_list')
+    return redirect('core:notifications')
 
@@ -4,7 +4,7 @@ Admin configuration for employees app
 from django.contrib import admin
 from .models import (
     Employee, EmployeeDocument, EmployeeContract,
-    EmergencyContact, EmployeeEducation, EmployeeExperience
+    EmergencyContact, EmployeeEducation, EmployeeExperience, SalaryHistory
 )
 
 
@@ -160,3 +160,12 @@ class EmployeeExperienceAdmin(admin.ModelAdmin):
     search_fields = ['employee__emp_code', 'company_name', 'position']
     ordering = ['-start_date']
 
+
+
+@admin.register(SalaryHistory)
+class SalaryHistoryAdmin(admin.ModelAdmin):
+    """Salary History Admin"""
+    list_display = ['employee', 'effective_date', 'basic_salary', 'housing_allowance', 'transport_allowance', 'other_allowances']
+    list_filter = ['effective_date']
+    search_fields = ['employee__emp_code', 'reason']
+    ordering = ['-effective_date']
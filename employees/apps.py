@@ -6,3 +6,7 @@ class EmployeesConfig(AppConfig):
     name = 'employees'
     verbose_name = 'الموظفون'  # Employees in Arabic
 
+
+    def ready(self):
+        from . import signals
+        signals.connect_signals()
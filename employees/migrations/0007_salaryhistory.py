@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0006_alter_employee_email'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalaryHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الإنشاء')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')),
+                ('is_active', models.BooleanField(default=True, verbose_name='نشط')),
+                ('notes', models.TextField(blank=True, null=True, verbose_name='ملاحظات')),
+                ('effective_date', models.DateField(verbose_name='تاريخ السريان')),
+                ('basic_salary', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='الراتب الأساسي')),
+                ('housing_allowance', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='بدل السكن')),
+                ('transport_allowance', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='بدل النقل')),
+                ('other_allowances', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='بدلات أخرى')),
+                ('reason', models.CharField(blank=True, max_length=200, null=True, verbose_name='سبب التغيير')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='أنشئ بواسطة')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='salary_history', to='employees.employee', verbose_name='الموظف')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='حُدث بواسطة')),
+            ],
+            options={
+                'verbose_name': 'سجل راتب',
+                'verbose_name_plural': 'سجل الرواتب',
+                'db_table': 'Tbl_Employee_Salary_History',
+                'ordering': ['employee', '-effective_date'],
+                'indexes': [models.Index(fields=['employee', 'effective_date'], name='salary_hist_emp_eff_idx')],
+                'unique_together': {('employee', 'effective_date')},
+            },
+        ),
+    ]
@@ -2,8 +2,10 @@
 Employee models for comprehensive employee management
 """
 from django.db import models
+from django.db.models import OuterRef, Subquery
 from core.models import BaseModel
 from django.core.validators import FileExtensionValidator
+from decimal import Decimal
 
 
 class Employee(BaseModel):
@@ -758,7 +760,7 @@ class Employee(BaseModel):
     def get_calculated_basic_salary(self):
         """Calculate basic salary from total (Total / 1.30)"""
         if self.total_salary:
-            return round(self.total_salary / 1.30, 2)
+            return round(self.total_salary / Decimal('1.30'), 2)
         return self.basic_salary or 0
 
     def get_calculated_allowances(self):
@@ -1350,3 +1352,96 @@ class EmployeeQualification(BaseModel):
 
     def __str__(self):
         return f"{self.employee.emp_code} - {self.get_education_level_display()}"
+
+
+class SalaryHistoryQuerySet(models.QuerySet):
+    """QuerySet with effective-dated lookups"""
+
+    def as_of(self, as_of_date):
+        """
+        Salary row in effect on ``as_of_date`` for every employee
+
+        Resolved in a single query through a correlated subquery on the
+        (employee, effective_date) index.
+        """
+        latest = SalaryHistory.objects.filter(
+            employee_id=OuterRef('employee_id'),
+            effective_date__lte=as_of_date,
+        ).order_by('-effective_date').values('effective_date')[:1]
+        return self.filter(
+            effective_date__lte=as_of_date,
+            effective_date=Subquery(latest),
+        )
+
+
+class SalaryHistory(BaseModel):
+    """
+    Effective-dated compensation history
+    سجل الرواتب حسب تاريخ السريان
+    """
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name='salary_history',
+        verbose_name='الموظف'
+    )
+    effective_date = models.DateField(
+        verbose_name='تاريخ السريان'
+    )
+    basic_salary = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name='الراتب الأساسي'
+    )
+    housing_allowance = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        verbose_name='بدل السكن'
+    )
+    transport_allowance = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        verbose_name='بدل النقل'
+    )
+    other_allowances = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        verbose_name='بدلات أخرى'
+    )
+    reason = models.CharField(
+        max_length=200,
+        blank=True,
+        null=True,
+        verbose_name='سبب التغيير'
+    )
+
+    objects = SalaryHistoryQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'Tbl_Employee_Salary_History'
+        verbose_name = 'سجل راتب'
+        verbose_name_plural = 'سجل الرواتب'
+        unique_together = ['employee', 'effective_date']
+        ordering = ['employee', '-effective_date']
+        indexes = [
+            models.Index(fields=['employee', 'effective_date'], name='salary_hist_emp_eff_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee.emp_code} - {self.effective_date}"
+
+    @classmethod
+    def from_employee(cls, employee, effective_date, reason=None):
+        """Build an (unsaved) history row from the employee's current salary"""
+        return cls(
+            employee=employee,
+            effective_date=effective_date,
+            basic_salary=employee.get_calculated_basic_salary(),
+            housing_allowance=employee.housing_allowance,
+            transport_allowance=employee.transport_allowance,
+            other_allowances=employee.other_allowances,
+            reason=reason,
+        )
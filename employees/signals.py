@@ -0,0 +1,52 @@
+"""
+Signal handlers for employees app
+معالجات الإشارات لتطبيق الموظفين
+"""
+from django.db.models.signals import post_save, pre_save
+from django.utils import timezone
+
+# Employee fields that make up the salary recorded in SalaryHistory
+SALARY_FIELDS = ('basic_salary', 'total_salary', 'housing_allowance', 'transport_allowance', 'other_allowances')
+
+
+def _check_salary_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.pk is None:
+        instance._salary_changed = True
+        return
+    previous = sender.objects.filter(pk=instance.pk).values_list(*SALARY_FIELDS).first()
+    instance._salary_changed = previous != tuple(getattr(instance, field) for field in SALARY_FIELDS)
+
+
+def _record_salary_history(sender, instance, raw=False, **kwargs):
+    """Record the salary in effect from today when it changed"""
+    from .models import SalaryHistory
+
+    if raw or not getattr(instance, '_salary_changed', False):
+        return
+    instance._salary_changed = False
+    if not instance.basic_salary and not instance.total_salary:
+        return
+
+    row = SalaryHistory.from_employee(instance, timezone.localdate(), reason='تعديل بيانات الموظف')
+    SalaryHistory.objects.update_or_create(
+        employee=instance,
+        effective_date=row.effective_date,
+        defaults={
+            'basic_salary': row.basic_salary,
+            'housing_allowance': row.housing_allowance,
+            'transport_allowance': row.transport_allowance,
+            'other_allowances': row.other_allowances,
+            'reason': row.reason,
+            'updated_by': instance.updated_by,
+        },
+    )
+
+
+def connect_signals() -> None:
+    """Record salary history on salary edits (called from AppConfig.ready)"""
+    pre_save.connect(_check_salary_change, sender='employees.Employee', weak=False,
+                     dispatch_uid='employee_salary_check')
+    post_save.connect(_record_salary_history, sender='employees.Employee', weak=False,
+                      dispatch_uid='employee_salary_history')
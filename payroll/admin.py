@@ -1,8 +1,29 @@
 from django.contrib import admin
-from .models import Payroll, Payslip, Loan, Bonus
+from .models import (
+    Payroll, Payslip, Loan, Bonus, DeductionRule, PayrollAdjustment,
+    PayrollPeriodSnapshot, GratuityLiabilitySnapshot,
+)
 
 admin.site.register(Payroll)
 admin.site.register(Payslip)
 admin.site.register(Loan)
 admin.site.register(Bonus)
+admin.site.register(DeductionRule)
+admin.site.register(PayrollAdjustment)
+admin.site.register(GratuityLiabilitySnapshot)
 
+
+@admin.register(PayrollPeriodSnapshot)
+class PayrollPeriodSnapshotAdmin(admin.ModelAdmin):
+    """Payroll Period Snapshot Admin"""
+    list_display = ['month', 'year', 'row_count', 'gross_total', 'net_total', 'closed_at', 'closed_by']
+    list_filter = ['year']
+    ordering = ['-year', '-month']
+    exclude = ['data']
+    readonly_fields = ['month', 'year', 'row_count', 'gross_total', 'deductions_total', 'net_total', 'summary', 'closed_at', 'closed_by']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
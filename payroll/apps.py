@@ -6,3 +6,7 @@ class PayrollConfig(AppConfig):
     name = 'payroll'
     verbose_name = 'الرواتب'
 
+
+    def ready(self):
+        from . import retro
+        retro.connect_signals()
@@ -0,0 +1,290 @@
+"""
+Streaming bank transfer / WPS salary file export
+تصدير ملفات تحويل الرواتب للبنوك ونظام حماية الأجور
+
+Approved payroll rows are read with ``iterator(chunk_size=...)`` over a
+``values_list`` queryset and written line by line, so a file for tens of
+thousands of employees is produced in constant memory, either into a
+``StreamingHttpResponse`` or a file on disk. Every format ends with a
+control-total trailer (record count and total net amount).
+"""
+import calendar
+import csv
+import io
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterator, Optional
+
+from django.utils import timezone
+
+from core.app_settings import get_setting
+from .models import Payroll
+
+DEFAULT_CHUNK_SIZE = 2000
+
+ROW_FIELDS = (
+    'id',
+    'employee__emp_code',
+    'employee__national_id',
+    'employee__full_name_ar',
+    'employee__first_name_ar',
+    'employee__last_name_ar',
+    'employee__bank_name',
+    'employee__bank_account_number',
+    'employee__iban',
+    'basic_salary',
+    'housing_allowance',
+    'transport_allowance',
+    'other_allowances',
+    'overtime_amount',
+    'bonus',
+    'total_deductions',
+    'net_salary',
+)
+
+
+def iter_payroll_rows(month: int, year: int, status: str = 'approved',
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict]:
+    """
+    Iterate payroll rows for a month as plain dictionaries
+    المرور على سجلات الرواتب لشهر معين
+
+    Uses a server-side cursor (``iterator``) so only ``chunk_size`` rows are
+    held in memory at a time.
+    """
+    queryset = Payroll.objects.filter(
+        month=month,
+        year=year,
+        status=status,
+    ).order_by('employee__emp_code').values_list(*ROW_FIELDS)
+
+    for values in queryset.iterator(chunk_size=chunk_size):
+        row = dict(zip(ROW_FIELDS, values))
+        row['employee_name'] = row['employee__full_name_ar'] or ' '.join(
+            filter(None, [row['employee__first_name_ar'], row['employee__last_name_ar']])
+        )
+        row['other_earnings'] = (
+            row['transport_allowance'] + row['other_allowances'] +
+            row['overtime_amount'] + row['bonus']
+        )
+        yield row
+
+
+def _minor(amount: Decimal) -> int:
+    """Amount in integer minor units (halalas)"""
+    return int((amount or Decimal('0')) * 100)
+
+
+class BankFileFormat:
+    """
+    Base class for bank file layouts
+    الصيغة الأساسية لملفات البنك
+
+    Subclasses implement ``header``, ``record`` and ``trailer``; each
+    returns a complete line (or an empty string to skip).
+    """
+    name = None
+    content_type = 'text/plain'
+    extension = 'txt'
+
+    def __init__(self, month: int, year: int, options: Optional[Dict] = None):
+        self.month = month
+        self.year = year
+        self.options = options or {}
+        self.created_at = timezone.localtime()
+
+    def header(self) -> str:
+        return ''
+
+    def record(self, row: Dict) -> str:
+        raise NotImplementedError
+
+    def trailer(self, count: int, total_minor: int) -> str:
+        raise NotImplementedError
+
+    def filename(self) -> str:
+        return f"salaries_{self.year}_{self.month:02d}_{self.name}.{self.extension}"
+
+
+class CSVBankFormat(BankFileFormat):
+    """
+    Generic CSV transfer file
+    ملف تحويل CSV عام
+    """
+    name = 'csv'
+    content_type = 'text/csv; charset=utf-8'
+    extension = 'csv'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _line(self, values) -> str:
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer.writerow(values)
+        return self._buffer.getvalue()
+
+    def header(self) -> str:
+        # BOM so Excel opens the Arabic names correctly
+        return '\ufeff' + self._line([
+            'emp_code', 'employee_name', 'national_id', 'bank_name',
+            'account_number', 'iban', 'net_salary',
+        ])
+
+    def record(self, row: Dict) -> str:
+        return self._line([
+            row['employee__emp_code'],
+            row['employee_name'],
+            row['employee__national_id'],
+            row['employee__bank_name'] or '',
+            row['employee__bank_account_number'] or '',
+            row['employee__iban'] or '',
+            row['net_salary'],
+        ])
+
+    def trailer(self, count: int, total_minor: int) -> str:
+        return self._line(['TOTAL', count, '', '', '', '', f"{Decimal(total_minor) / 100:.2f}"])
+
+
+class FixedWidthBankFormat(BankFileFormat):
+    """
+    Fixed-width transfer file (amounts in halalas, zero padded)
+    ملف تحويل بعرض ثابت
+    """
+    name = 'fixed'
+    extension = 'txt'
+
+    def header(self) -> str:
+        return (
+            'H'
+            + str(self.options.get('employer_id', '')).ljust(15)[:15]
+            + self.created_at.strftime('%Y%m%d')
+            + f"{self.year:04d}{self.month:02d}"
+            + '\r\n'
+        )
+
+    def record(self, row: Dict) -> str:
+        return (
+            'D'
+            + str(row['employee__emp_code']).ljust(20)[:20]
+            + str(row['employee__national_id'] or '').ljust(15)[:15]
+            + str(row['employee__iban'] or '').replace(' ', '').ljust(34)[:34]
+            + str(_minor(row['net_salary'])).rjust(15, '0')
+            + '\r\n'
+        )
+
+    def trailer(self, count: int, total_minor: int) -> str:
+        return 'T' + str(count).rjust(8, '0') + str(total_minor).rjust(18, '0') + '\r\n'
+
+
+class WPSSifFormat(BankFileFormat):
+    """
+    Saudi WPS salary information file (SIF)
+    ملف معلومات الرواتب لنظام حماية الأجور
+
+    One ``EDR`` (employee detail record) per employee followed by a single
+    ``SCR`` (salary control record) carrying the record count and total.
+    Employer id and bank code come from the ``wps_employer_id`` and
+    ``wps_bank_code`` system settings unless passed in ``options``.
+    """
+    name = 'wps'
+    extension = 'sif'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.days_in_period = calendar.monthrange(self.year, self.month)[1]
+        self.period_start = date(self.year, self.month, 1)
+        self.period_end = date(self.year, self.month, self.days_in_period)
+
+    @staticmethod
+    def _amount(value: Decimal) -> str:
+        return f"{value or Decimal('0'):.2f}"
+
+    def record(self, row: Dict) -> str:
+        return ','.join([
+            'EDR',
+            str(row['employee__national_id'] or ''),
+            str(row['employee__iban'] or '').replace(' ', ''),
+            self.period_start.strftime('%Y-%m-%d'),
+            self.period_end.strftime('%Y-%m-%d'),
+            str(self.days_in_period),
+            self._amount(row['net_salary']),
+            self._amount(row['basic_salary']),
+            self._amount(row['housing_allowance']),
+            self._amount(row['other_earnings']),
+            self._amount(row['total_deductions']),
+        ]) + '\r\n'
+
+    def trailer(self, count: int, total_minor: int) -> str:
+        return ','.join([
+            'SCR',
+            str(self.options.get('employer_id', '')),
+            str(self.options.get('bank_code', '')),
+            self.created_at.strftime('%Y-%m-%d'),
+            self.created_at.strftime('%H%M'),
+            f"{self.month:02d}{self.year:04d}",
+            str(count),
+            f"{Decimal(total_minor) / 100:.2f}",
+            self.options.get('currency', 'SAR'),
+            str(self.options.get('employer_reference', '')),
+        ]) + '\r\n'
+
+
+BANK_FILE_FORMATS = {
+    fmt.name: fmt
+    for fmt in (CSVBankFormat, FixedWidthBankFormat, WPSSifFormat)
+}
+
+
+def get_wps_options() -> Dict[str, str]:
+    """
+    Read WPS employer settings from the cached system settings
+    قراءة إعدادات صاحب العمل لنظام حماية الأجور
+    """
+    return {
+        'employer_id': get_setting('wps_employer_id', ''),
+        'bank_code': get_setting('wps_bank_code', ''),
+        'employer_reference': get_setting('wps_employer_reference', ''),
+    }
+
+
+def get_bank_file_format(name: str, month: int, year: int,
+                         options: Optional[Dict] = None) -> BankFileFormat:
+    """Instantiate a bank file format by name"""
+    if name not in BANK_FILE_FORMATS:
+        raise ValueError(f"Unknown bank file format: {name}")
+    if not 1 <= month <= 12:
+        raise ValueError(f"Invalid payroll month: {month}")
+    if options is None:
+        options = get_wps_options()
+    return BANK_FILE_FORMATS[name](month, year, options)
+
+
+def generate_bank_file(fmt: BankFileFormat, status: str = 'approved',
+                       chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Yield the lines of a bank file, ending with the control trailer
+    إنشاء أسطر ملف البنك مع سطر المجاميع
+    """
+    count = 0
+    total_minor = 0
+
+    header = fmt.header()
+    if header:
+        yield header
+
+    for row in iter_payroll_rows(fmt.month, fmt.year, status, chunk_size):
+        count += 1
+        total_minor += _minor(row['net_salary'])
+        yield fmt.record(row)
+
+    yield fmt.trailer(count, total_minor)
+
+
+def write_bank_file(fileobj, fmt: BankFileFormat, status: str = 'approved',
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """Write a bank file to an open text file object"""
+    for line in generate_bank_file(fmt, status, chunk_size):
+        fileobj.write(line)
@@ -0,0 +1,161 @@
+"""
+End-of-service gratuity liability engine
+محرك التزامات مكافأة نهاية الخدمة
+
+Computes the accrued end-of-service award for all active employees at once
+with NumPy, following the Saudi Labor Law tiers:
+
+* Termination / contract end (Art. 84): half a month's wage for each of the
+  first five years of service and a full month's wage for each year after,
+  with partial years prorated by days.
+* Resignation (Art. 85): nothing below two completed years, one third of
+  the award for 2-5 years, two thirds for 5-10 years and the full award
+  from ten years.
+
+Monthly liabilities are stored per department in
+``GratuityLiabilitySnapshot`` so the liability report never recomputes.
+"""
+import calendar
+from datetime import date
+from typing import Dict, Sequence
+
+import numpy as np
+from django.db import transaction
+
+from organization.models import Department
+from .models import GratuityLiabilitySnapshot
+from .simulation import SalaryArrays, from_minor
+
+# Components making up the monthly wage used for the award
+WAGE_COMPONENTS = ('basic_salary', 'housing_allowance')
+
+DAYS_PER_YEAR = 365
+FIVE_YEARS_DAYS = 5 * DAYS_PER_YEAR
+
+
+class GratuityArrays(SalaryArrays):
+    """Salary arrays plus hire date columns"""
+
+    FIELDS = SalaryArrays.FIELDS + ('hire_date',)
+
+    def __init__(self, rows):
+        super().__init__(rows)
+        hire_dates = [row[-1] for row in rows]
+        self.has_hire_date = np.fromiter((d is not None for d in hire_dates), dtype=bool, count=len(rows))
+        self.hire_ordinal = np.fromiter(
+            (d.toordinal() if d else 0 for d in hire_dates), dtype=np.int64, count=len(rows)
+        )
+        self.hire_year = np.fromiter((d.year if d else 0 for d in hire_dates), dtype=np.int64, count=len(rows))
+        self.hire_month_day = np.fromiter(
+            (d.month * 100 + d.day if d else 0 for d in hire_dates), dtype=np.int64, count=len(rows)
+        )
+
+
+def compute_gratuity(arrays: GratuityArrays, as_of: date,
+                     wage_components: Sequence[str] = WAGE_COMPONENTS) -> Dict[str, np.ndarray]:
+    """
+    Vectorized end-of-service award for every employee in ``arrays``
+    حساب مكافأة نهاية الخدمة لجميع الموظفين
+
+    Returns:
+        Dictionary of int64 arrays: service_days, completed_years, wage,
+        termination_award and resignation_award (amounts in minor units)
+    """
+    components = arrays.baseline_components()
+    wage = sum(components[name] for name in wage_components)
+
+    service_days = np.where(
+        arrays.has_hire_date,
+        np.maximum(as_of.toordinal() - arrays.hire_ordinal, 0),
+        0,
+    )
+    # Same rule as Employee.get_years_of_service
+    completed_years = np.where(
+        arrays.has_hire_date,
+        np.maximum(
+            as_of.year - arrays.hire_year
+            - ((as_of.month * 100 + as_of.day) < arrays.hire_month_day),
+            0,
+        ),
+        0,
+    )
+
+    # Half month per year for the first five years, a full month afterwards:
+    # wage * (min(d, 5y) / 2 + max(d - 5y, 0)) / 365, kept in integers
+    weighted_days = np.minimum(service_days, FIVE_YEARS_DAYS) + 2 * np.maximum(service_days - FIVE_YEARS_DAYS, 0)
+    denominator = 2 * DAYS_PER_YEAR
+    termination = (wage * weighted_days * 2 + denominator) // (2 * denominator)
+
+    thirds = np.select(
+        [completed_years < 2, completed_years < 5, completed_years < 10],
+        [0, 1, 2],
+        default=3,
+    )
+    resignation = (termination * thirds * 2 + 3) // 6
+
+    return {
+        'service_days': service_days,
+        'completed_years': completed_years,
+        'wage': wage,
+        'termination_award': termination,
+        'resignation_award': resignation,
+    }
+
+
+def _month_end(year: int, month: int) -> date:
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+
+def snapshot_gratuity_liability(month: int, year: int) -> Dict[str, int]:
+    """
+    Compute and store the department liabilities for a month
+    حفظ التزامات نهاية الخدمة لشهر معين
+
+    Any existing snapshot for the month is replaced.
+
+    Returns:
+        Dictionary with processing statistics
+    """
+    as_of = _month_end(year, month)
+    arrays = GratuityArrays.load()
+    result = compute_gratuity(arrays, as_of)
+
+    keys, inverse = np.unique(arrays.department_ids, return_inverse=True)
+    size = len(keys)
+
+    def group_sum(values):
+        totals = np.zeros(size, dtype=np.int64)
+        np.add.at(totals, inverse, values)
+        return totals
+
+    headcount = np.bincount(inverse, minlength=size)
+    wages = group_sum(result['wage'])
+    termination = group_sum(result['termination_award'])
+    resignation = group_sum(result['resignation_award'])
+
+    names = dict(Department.objects.filter(
+        id__in=[int(k) for k in keys if k >= 0]
+    ).values_list('id', 'dept_name_ar'))
+
+    snapshots = []
+    for index, key in enumerate(keys):
+        key = int(key)
+        snapshots.append(GratuityLiabilitySnapshot(
+            month=month,
+            year=year,
+            department_id=key if key >= 0 else None,
+            department_name=names.get(key),
+            headcount=int(headcount[index]),
+            monthly_wage_total=from_minor(wages[index]),
+            termination_liability=from_minor(termination[index]),
+            resignation_liability=from_minor(resignation[index]),
+        ))
+
+    with transaction.atomic():
+        GratuityLiabilitySnapshot.objects.filter(month=month, year=year).delete()
+        GratuityLiabilitySnapshot.objects.bulk_create(snapshots)
+
+    return {
+        'departments': len(snapshots),
+        'employees': len(arrays),
+    }
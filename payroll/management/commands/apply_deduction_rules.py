@@ -0,0 +1,25 @@
+"""
+Django management command to apply deduction rules to a payroll month
+أمر إدارة Django لتطبيق قواعد الخصومات على رواتب شهر
+"""
+from django.core.management.base import BaseCommand, CommandError
+from payroll.deduction_rules import apply_deduction_rules
+
+
+class Command(BaseCommand):
+    help = 'Apply configured deduction rules to a payroll month | تطبيق قواعد الخصومات'
+
+    def add_arguments(self, parser):
+        parser.add_argument('month', type=int, help='Payroll month (1-12)')
+        parser.add_argument('year', type=int, help='Payroll year')
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        if not 1 <= options['month'] <= 12:
+            raise CommandError('Month must be between 1 and 12')
+
+        stats = apply_deduction_rules(options['month'], options['year'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Applied {stats['rules']} rules to {stats['updated_payrolls']} payrolls"
+        ))
@@ -0,0 +1,29 @@
+"""
+Django management command to close a paid payroll month
+أمر إدارة Django لإغلاق شهر رواتب مدفوع
+"""
+from django.core.management.base import BaseCommand, CommandError
+from payroll.snapshots import PeriodNotClosable, close_period
+
+
+class Command(BaseCommand):
+    help = 'Close a paid payroll month into an immutable snapshot | إغلاق شهر الرواتب'
+
+    def add_arguments(self, parser):
+        parser.add_argument('month', type=int, help='Payroll month (1-12)')
+        parser.add_argument('year', type=int, help='Payroll year')
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        if not 1 <= options['month'] <= 12:
+            raise CommandError('Month must be between 1 and 12')
+
+        try:
+            snapshot = close_period(options['month'], options['year'])
+        except PeriodNotClosable as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Closed {snapshot} with {snapshot.row_count} payrolls, "
+            f"net total {snapshot.net_total}"
+        ))
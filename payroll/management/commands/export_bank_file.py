@@ -0,0 +1,58 @@
+"""
+Django management command to export the monthly bank transfer file
+أمر إدارة Django لتصدير ملف تحويل الرواتب للبنك
+"""
+from django.core.management.base import BaseCommand, CommandError
+from payroll.bank_export import (
+    BANK_FILE_FORMATS,
+    DEFAULT_CHUNK_SIZE,
+    get_bank_file_format,
+    write_bank_file,
+)
+
+
+class Command(BaseCommand):
+    help = 'Export bank transfer / WPS salary file | تصدير ملف تحويل الرواتب'
+
+    def add_arguments(self, parser):
+        parser.add_argument('month', type=int, help='Payroll month (1-12)')
+        parser.add_argument('year', type=int, help='Payroll year')
+        parser.add_argument(
+            '--format',
+            choices=sorted(BANK_FILE_FORMATS),
+            default='wps',
+            help='Bank file layout (default: wps)',
+        )
+        parser.add_argument(
+            '--status',
+            default='approved',
+            help='Payroll status to export (default: approved)',
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Output file path (default: generated file name)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Rows fetched per database round trip',
+        )
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        if not 1 <= options['month'] <= 12:
+            raise CommandError('Month must be between 1 and 12')
+
+        fmt = get_bank_file_format(options['format'], options['month'], options['year'])
+        path = options['output'] or fmt.filename()
+
+        encoding = 'utf-8' if fmt.name == 'csv' else 'ascii'
+        try:
+            with open(path, 'w', encoding=encoding, errors='replace', newline='') as fileobj:
+                write_bank_file(fileobj, fmt, options['status'], options['chunk_size'])
+        except OSError as e:
+            raise CommandError(f'Error writing bank file: {str(e)}')
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Bank file written to {path}'))
@@ -0,0 +1,47 @@
+"""
+Django management command to compute retroactive payroll adjustments
+أمر إدارة Django لحساب فروقات الرواتب بأثر رجعي
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from payroll.retro import apply_pending_adjustments, create_retro_adjustments
+
+
+class Command(BaseCommand):
+    help = 'Compute retro payroll adjustments and carry them into a month | حساب الفروقات بأثر رجعي'
+
+    def add_arguments(self, parser):
+        parser.add_argument('since', type=str, help='First paid month to compare (YYYY-MM-DD)')
+        parser.add_argument(
+            '--employee',
+            type=int,
+            action='append',
+            help='Limit to an employee id (repeatable)',
+        )
+        parser.add_argument(
+            '--apply',
+            type=int,
+            nargs=2,
+            metavar=('MONTH', 'YEAR'),
+            help='Carry pending adjustments into the draft payrolls of a month',
+        )
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        try:
+            since = date.fromisoformat(options['since'])
+        except ValueError:
+            raise CommandError('Date must be in YYYY-MM-DD format')
+        if options['apply'] and not 1 <= options['apply'][0] <= 12:
+            raise CommandError('Month must be between 1 and 12')
+
+        created = create_retro_adjustments(since, options['employee'])
+        self.stdout.write(self.style.SUCCESS(f"✓ Created {created} adjustment lines"))
+
+        if options['apply']:
+            month, year = options['apply']
+            stats = apply_pending_adjustments(month, year, options['employee'])
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ Applied {stats['adjustments']} adjustments to {stats['payrolls']} payrolls"
+            ))
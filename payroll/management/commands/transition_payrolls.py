@@ -0,0 +1,41 @@
+"""
+Django management command to move a payroll month to the next status
+أمر إدارة Django لتغيير حالة رواتب شهر بشكل جماعي
+"""
+from django.core.management.base import BaseCommand, CommandError
+from payroll.transitions import TRANSITIONS, TransitionError, transition_month
+
+
+class Command(BaseCommand):
+    help = 'Bulk payroll status transition | تغيير حالة الرواتب بشكل جماعي'
+
+    def add_arguments(self, parser):
+        parser.add_argument('month', type=int, help='Payroll month (1-12)')
+        parser.add_argument('year', type=int, help='Payroll year')
+        parser.add_argument('status', choices=sorted(TRANSITIONS), help='Target status')
+        parser.add_argument(
+            '--payment-method',
+            type=str,
+            help='Payment method recorded when marking as paid',
+        )
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        if not 1 <= options['month'] <= 12:
+            raise CommandError('Month must be between 1 and 12')
+
+        try:
+            updated = transition_month(
+                options['month'],
+                options['year'],
+                options['status'],
+                payment_method=options['payment_method'],
+            )
+        except TransitionError as e:
+            for payroll_id, reason in e.conflicts[:20]:
+                self.stderr.write(f'  Payroll {payroll_id}: {reason}')
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Moved {updated} payrolls to {options['status']}"
+        ))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeductionRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الإنشاء')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')),
+                ('is_active', models.BooleanField(default=True, verbose_name='نشط')),
+                ('notes', models.TextField(blank=True, null=True, verbose_name='ملاحظات')),
+                ('name', models.CharField(max_length=200, verbose_name='اسم القاعدة')),
+                ('rule_type', models.CharField(choices=[('percentage', 'نسبة من الراتب'), ('late_brackets', 'شرائح التأخير'), ('absence_days', 'أجر أيام الغياب')], max_length=20, verbose_name='نوع القاعدة')),
+                ('target_field', models.CharField(choices=[('insurance_deduction', 'خصم التأمين'), ('tax_deduction', 'خصم الضريبة'), ('late_deduction', 'خصم التأخير'), ('absence_deduction', 'خصم الغياب'), ('other_deductions', 'خصومات أخرى')], max_length=30, verbose_name='حقل الخصم')),
+                ('base_components', models.JSONField(blank=True, default=list, help_text='مثال: ["basic_salary", "housing_allowance"]', verbose_name='مكونات الأساس')),
+                ('parameters', models.JSONField(blank=True, default=dict, verbose_name='المعاملات')),
+                ('day_divisor', models.IntegerField(default=30, verbose_name='عدد أيام الشهر للأجر اليومي')),
+                ('priority', models.IntegerField(default=0, verbose_name='الأولوية')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='أنشئ بواسطة')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='حُدث بواسطة')),
+            ],
+            options={
+                'verbose_name': 'قاعدة خصم',
+                'verbose_name_plural': 'قواعد الخصومات',
+                'db_table': 'Tbl_Deduction_Rules',
+                'ordering': ['priority', 'id'],
+            },
+        ),
+    ]
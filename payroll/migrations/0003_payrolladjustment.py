@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0007_salaryhistory'),
+        ('payroll', '0002_deductionrule'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollAdjustment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الإنشاء')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')),
+                ('is_active', models.BooleanField(default=True, verbose_name='نشط')),
+                ('notes', models.TextField(blank=True, null=True, verbose_name='ملاحظات')),
+                ('source_month', models.IntegerField(verbose_name='شهر الاستحقاق')),
+                ('source_year', models.IntegerField(verbose_name='سنة الاستحقاق')),
+                ('component', models.CharField(max_length=30, verbose_name='المكون')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='المبلغ')),
+                ('reason', models.CharField(blank=True, max_length=200, null=True, verbose_name='السبب')),
+                ('status', models.CharField(choices=[('pending', 'قيد الانتظار'), ('applied', 'مطبقة')], default='pending', max_length=20, verbose_name='الحالة')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='أنشئ بواسطة')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payroll_adjustments', to='employees.employee', verbose_name='الموظف')),
+                ('payroll', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='adjustments', to='payroll.payroll', verbose_name='مسير التطبيق')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='حُدث بواسطة')),
+            ],
+            options={
+                'verbose_name': 'تسوية راتب',
+                'verbose_name_plural': 'تسويات الرواتب',
+                'db_table': 'Tbl_Payroll_Adjustments',
+                'ordering': ['-source_year', '-source_month'],
+                'indexes': [models.Index(fields=['employee', 'source_year', 'source_month'], name='payroll_adj_emp_src_idx'), models.Index(fields=['status'], name='payroll_adj_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0003_payrolladjustment'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollPeriodSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.IntegerField(verbose_name='الشهر')),
+                ('year', models.IntegerField(verbose_name='السنة')),
+                ('row_count', models.IntegerField(default=0, verbose_name='عدد السجلات')),
+                ('gross_total', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='إجمالي الرواتب')),
+                ('deductions_total', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='إجمالي الخصومات')),
+                ('net_total', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='صافي الرواتب')),
+                ('summary', models.JSONField(default=dict, verbose_name='الملخص')),
+                ('data', models.BinaryField(verbose_name='البيانات المضغوطة')),
+                ('closed_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الإغلاق')),
+                ('closed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='أغلق بواسطة')),
+            ],
+            options={
+                'verbose_name': 'لقطة شهر رواتب',
+                'verbose_name_plural': 'لقطات أشهر الرواتب',
+                'db_table': 'Tbl_Payroll_Period_Snapshots',
+                'ordering': ['-year', '-month'],
+                'unique_together': {('month', 'year')},
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0001_initial'),
+        ('payroll', '0004_payrollperiodsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GratuityLiabilitySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.IntegerField(verbose_name='الشهر')),
+                ('year', models.IntegerField(verbose_name='السنة')),
+                ('department_name', models.CharField(blank=True, max_length=200, null=True, verbose_name='اسم القسم')),
+                ('headcount', models.IntegerField(default=0, verbose_name='عدد الموظفين')),
+                ('monthly_wage_total', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='إجمالي الأجر الشهري')),
+                ('termination_liability', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='الالتزام عند إنهاء الخدمة')),
+                ('resignation_liability', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='الالتزام عند الاستقالة')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الإنشاء')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='gratuity_snapshots', to='organization.department', verbose_name='القسم')),
+            ],
+            options={
+                'verbose_name': 'لقطة التزام نهاية الخدمة',
+                'verbose_name_plural': 'لقطات التزامات نهاية الخدمة',
+                'db_table': 'Tbl_Gratuity_Liability_Snapshots',
+                'ordering': ['-year', '-month', 'department_name'],
+                'indexes': [models.Index(fields=['year', 'month'], name='gratuity_snap_period_idx')],
+            },
+        ),
+    ]
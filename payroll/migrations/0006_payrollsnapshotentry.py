@@ -0,0 +1,55 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:14
+
+import json
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def index_existing_snapshots(apps, schema_editor):
+    # One snapshot decompressed at a time
+    PayrollPeriodSnapshot = apps.get_model('payroll', 'PayrollPeriodSnapshot')
+    PayrollSnapshotEntry = apps.get_model('payroll', 'PayrollSnapshotEntry')
+    for snapshot in PayrollPeriodSnapshot.objects.order_by('year', 'month').iterator(chunk_size=1):
+        payload = json.loads(zlib.decompress(bytes(snapshot.data)).decode('utf-8'))
+        columns = payload['columns']
+        PayrollSnapshotEntry.objects.bulk_create([
+            PayrollSnapshotEntry(
+                snapshot_id=snapshot.pk,
+                month=snapshot.month,
+                year=snapshot.year,
+                emp_code=row['emp_code'],
+                data=row,
+            )
+            for row in (dict(zip(columns, values)) for values in payload['rows'])
+        ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0005_gratuityliabilitysnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollSnapshotEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.IntegerField(verbose_name='الشهر')),
+                ('year', models.IntegerField(verbose_name='السنة')),
+                ('emp_code', models.CharField(max_length=20, verbose_name='رمز الموظف')),
+                ('data', models.JSONField(verbose_name='البيانات')),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='payroll.payrollperiodsnapshot', verbose_name='اللقطة')),
+            ],
+            options={
+                'verbose_name': 'سجل لقطة رواتب',
+                'verbose_name_plural': 'سجلات لقطات الرواتب',
+                'db_table': 'Tbl_Payroll_Snapshot_Entries',
+                'ordering': ['year', 'month'],
+                'indexes': [models.Index(fields=['emp_code', 'year', 'month'], name='snapshot_entry_emp_idx')],
+            },
+        ),
+        migrations.RunPython(index_existing_snapshots, migrations.RunPython.noop),
+    ]
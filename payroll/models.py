@@ -348,3 +348,319 @@ class Bonus(BaseModel):
     def __str__(self):
         return f"{self.employee.emp_code} - {self.amount}"
 
+
+
+class DeductionRule(BaseModel):
+    """
+    Configurable deduction rules evaluated during a payroll run
+    قواعد الخصومات القابلة للتهيئة
+
+    ``parameters`` depends on ``rule_type``:
+        percentage: {"percent": 9.75, "cap": 45000}
+        late_brackets: {"brackets": [{"from": 1, "to": 15, "amount": 0},
+                                     {"from": 16, "to": 60, "day_fraction": 0.25},
+                                     {"from": 61, "to": null, "day_fraction": 0.5}]}
+        absence_days: {"multiplier": 1}
+    """
+    RULE_TYPES = [
+        ('percentage', 'نسبة من الراتب'),
+        ('late_brackets', 'شرائح التأخير'),
+        ('absence_days', 'أجر أيام الغياب'),
+    ]
+
+    TARGET_FIELDS = [
+        ('insurance_deduction', 'خصم التأمين'),
+        ('tax_deduction', 'خصم الضريبة'),
+        ('late_deduction', 'خصم التأخير'),
+        ('absence_deduction', 'خصم الغياب'),
+        ('other_deductions', 'خصومات أخرى'),
+    ]
+
+    name = models.CharField(
+        max_length=200,
+        verbose_name='اسم القاعدة'
+    )
+    rule_type = models.CharField(
+        max_length=20,
+        choices=RULE_TYPES,
+        verbose_name='نوع القاعدة'
+    )
+    target_field = models.CharField(
+        max_length=30,
+        choices=TARGET_FIELDS,
+        verbose_name='حقل الخصم'
+    )
+    base_components = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='مكونات الأساس',
+        help_text='مثال: ["basic_salary", "housing_allowance"]'
+    )
+    parameters = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='المعاملات'
+    )
+    day_divisor = models.IntegerField(
+        default=30,
+        verbose_name='عدد أيام الشهر للأجر اليومي'
+    )
+    priority = models.IntegerField(
+        default=0,
+        verbose_name='الأولوية'
+    )
+
+    class Meta:
+        db_table = 'Tbl_Deduction_Rules'
+        verbose_name = 'قاعدة خصم'
+        verbose_name_plural = 'قواعد الخصومات'
+        ordering = ['priority', 'id']
+
+    def __str__(self):
+        return f"{self.name} ({self.get_target_field_display()})"
+
+
+class PayrollAdjustment(BaseModel):
+    """
+    Adjustment lines carried into a later payroll run (e.g. retroactive raises)
+    تسويات الرواتب المرحلة إلى مسير لاحق
+    """
+    STATUS_CHOICES = [
+        ('pending', 'قيد الانتظار'),
+        ('applied', 'مطبقة'),
+    ]
+
+    employee = models.ForeignKey(
+        'employees.Employee',
+        on_delete=models.CASCADE,
+        related_name='payroll_adjustments',
+        verbose_name='الموظف'
+    )
+    payroll = models.ForeignKey(
+        Payroll,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='adjustments',
+        verbose_name='مسير التطبيق'
+    )
+    source_month = models.IntegerField(
+        verbose_name='شهر الاستحقاق'
+    )
+    source_year = models.IntegerField(
+        verbose_name='سنة الاستحقاق'
+    )
+    component = models.CharField(
+        max_length=30,
+        verbose_name='المكون'
+    )
+    amount = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name='المبلغ'
+    )
+    reason = models.CharField(
+        max_length=200,
+        blank=True,
+        null=True,
+        verbose_name='السبب'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name='الحالة'
+    )
+
+    class Meta:
+        db_table = 'Tbl_Payroll_Adjustments'
+        verbose_name = 'تسوية راتب'
+        verbose_name_plural = 'تسويات الرواتب'
+        ordering = ['-source_year', '-source_month']
+        indexes = [
+            models.Index(fields=['employee', 'source_year', 'source_month'], name='payroll_adj_emp_src_idx'),
+            models.Index(fields=['status'], name='payroll_adj_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee.emp_code} - {self.source_month}/{self.source_year} - {self.amount}"
+
+
+class PayrollPeriodSnapshot(models.Model):
+    """
+    Immutable, compressed snapshot of a closed payroll month
+    لقطة مضغوطة غير قابلة للتعديل لشهر رواتب مغلق
+
+    ``data`` holds zlib-compressed JSON rows (employee, department, branch,
+    position and every earning/deduction component) as they were at close
+    time; ``summary`` holds per-department and per-branch totals so
+    multi-year reports do not need to decompress the rows.
+    """
+    month = models.IntegerField(
+        verbose_name='الشهر'
+    )
+    year = models.IntegerField(
+        verbose_name='السنة'
+    )
+    row_count = models.IntegerField(
+        default=0,
+        verbose_name='عدد السجلات'
+    )
+    gross_total = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        default=0,
+        verbose_name='إجمالي الرواتب'
+    )
+    deductions_total = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        default=0,
+        verbose_name='إجمالي الخصومات'
+    )
+    net_total = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        default=0,
+        verbose_name='صافي الرواتب'
+    )
+    summary = models.JSONField(
+        default=dict,
+        verbose_name='الملخص'
+    )
+    data = models.BinaryField(
+        verbose_name='البيانات المضغوطة'
+    )
+    closed_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='تاريخ الإغلاق'
+    )
+    closed_by = models.ForeignKey(
+        'core.User',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name='أغلق بواسطة'
+    )
+
+    class Meta:
+        db_table = 'Tbl_Payroll_Period_Snapshots'
+        verbose_name = 'لقطة شهر رواتب'
+        verbose_name_plural = 'لقطات أشهر الرواتب'
+        unique_together = ['month', 'year']
+        ordering = ['-year', '-month']
+
+    def __str__(self):
+        return f"{self.month}/{self.year}"
+
+    def save(self, *args, **kwargs):
+        # Snapshots are write-once
+        if self.pk:
+            raise ValueError('لا يمكن تعديل لقطة شهر مغلق.')
+        super().save(*args, **kwargs)
+
+
+class PayrollSnapshotEntry(models.Model):
+    """
+    One employee's row of a closed payroll month
+    سجل موظف في لقطة شهر رواتب مغلق
+
+    Written with the snapshot, so one employee's history is read without
+    decompressing every month's ``PayrollPeriodSnapshot.data``.
+    """
+    snapshot = models.ForeignKey(
+        PayrollPeriodSnapshot,
+        on_delete=models.CASCADE,
+        related_name='entries',
+        verbose_name='اللقطة'
+    )
+    month = models.IntegerField(
+        verbose_name='الشهر'
+    )
+    year = models.IntegerField(
+        verbose_name='السنة'
+    )
+    emp_code = models.CharField(
+        max_length=20,
+        verbose_name='رمز الموظف'
+    )
+    data = models.JSONField(
+        verbose_name='البيانات'
+    )
+
+    class Meta:
+        db_table = 'Tbl_Payroll_Snapshot_Entries'
+        verbose_name = 'سجل لقطة رواتب'
+        verbose_name_plural = 'سجلات لقطات الرواتب'
+        ordering = ['year', 'month']
+        indexes = [
+            models.Index(fields=['emp_code', 'year', 'month'], name='snapshot_entry_emp_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.emp_code} - {self.month}/{self.year}"
+
+
+class GratuityLiabilitySnapshot(models.Model):
+    """
+    Monthly end-of-service liability per department
+    لقطة شهرية لالتزامات مكافأة نهاية الخدمة لكل قسم
+    """
+    month = models.IntegerField(
+        verbose_name='الشهر'
+    )
+    year = models.IntegerField(
+        verbose_name='السنة'
+    )
+    department = models.ForeignKey(
+        'organization.Department',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='gratuity_snapshots',
+        verbose_name='القسم'
+    )
+    department_name = models.CharField(
+        max_length=200,
+        blank=True,
+        null=True,
+        verbose_name='اسم القسم'
+    )
+    headcount = models.IntegerField(
+        default=0,
+        verbose_name='عدد الموظفين'
+    )
+    monthly_wage_total = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        default=0,
+        verbose_name='إجمالي الأجر الشهري'
+    )
+    termination_liability = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        default=0,
+        verbose_name='الالتزام عند إنهاء الخدمة'
+    )
+    resignation_liability = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        default=0,
+        verbose_name='الالتزام عند الاستقالة'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='تاريخ الإنشاء'
+    )
+
+    class Meta:
+        db_table = 'Tbl_Gratuity_Liability_Snapshots'
+        verbose_name = 'لقطة التزام نهاية الخدمة'
+        verbose_name_plural = 'لقطات التزامات نهاية الخدمة'
+        ordering = ['-year', '-month', 'department_name']
+        indexes = [
+            models.Index(fields=['year', 'month'], name='gratuity_snap_period_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.department_name or '-'} - {self.month}/{self.year}"
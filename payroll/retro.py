@@ -0,0 +1,234 @@
+"""
+Retroactive payroll engine
+محرك الفروقات بأثر رجعي
+
+Compares already-paid payrolls with the salary that was in effect for each
+month according to ``SalaryHistory`` and emits ``PayrollAdjustment`` lines
+for the differences. Work is done in bulk: one query for the paid payrolls,
+one for the salary history of the affected employees and one for the
+adjustments already emitted, independent of the number of employees.
+
+Entry points: saving a ``SalaryHistory`` row that takes effect in a month
+already paid computes that employee's lines on commit
+(``connect_signals``); creating a draft payroll carries the employee's
+pending lines into it; and the ``retro_payroll`` command and
+``payroll.run_retro_payroll`` task run both steps for many employees.
+"""
+import calendar
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+
+from employees.models import SalaryHistory
+from reports.dashboards import invalidate_on_commit
+from .models import Payroll, PayrollAdjustment
+
+# Ids per UPDATE statement, below SQL Server's 2100 parameter limit
+ID_BATCH_SIZE = 1000
+
+RETRO_COMPONENTS = (
+    'basic_salary',
+    'housing_allowance',
+    'transport_allowance',
+    'other_allowances',
+)
+
+
+def _month_end(year: int, month: int) -> date:
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+
+def compute_retro_adjustments(since: date, employee_ids: Iterable[int] = None,
+                              reason: str = 'فروقات بأثر رجعي') -> List[PayrollAdjustment]:
+    """
+    Compute (unsaved) adjustment lines for paid months since ``since``
+    حساب فروقات الرواتب المدفوعة منذ تاريخ معين
+
+    The salary in effect on the last day of each paid month is compared to
+    the paid components; amounts already covered by earlier adjustments for
+    the same month and component are subtracted, so the engine can be rerun
+    safely. Adjustments carried into a paid payroll by
+    ``apply_pending_adjustments`` are not part of that month's salary and are
+    taken out of its paid components first.
+    """
+    payrolls = Payroll.objects.filter(
+        Q(year__gt=since.year) | Q(year=since.year, month__gte=since.month),
+        status='paid',
+    )
+    if employee_ids is not None:
+        payrolls = payrolls.filter(employee_id__in=list(employee_ids))
+
+    paid_rows = list(payrolls.values_list('id', 'employee_id', 'month', 'year', *RETRO_COMPONENTS))
+    if not paid_rows:
+        return []
+
+    # Subquery rather than an id list keeps large runs under the
+    # backend's parameter limit (2100 on SQL Server)
+    affected = payrolls.values('employee_id')
+
+    # Salary history per employee, ordered by effective date
+    history = defaultdict(lambda: ([], []))
+    for row in SalaryHistory.objects.filter(
+        employee_id__in=affected,
+    ).order_by('employee_id', 'effective_date').values_list(
+        'employee_id', 'effective_date', *RETRO_COMPONENTS
+    ):
+        dates, values = history[row[0]]
+        dates.append(row[1])
+        values.append(row[2:])
+
+    # Adjustments already emitted for the same month/component
+    emitted = {
+        (row['employee_id'], row['source_month'], row['source_year'], row['component']): row['total']
+        for row in PayrollAdjustment.objects.filter(
+            employee_id__in=affected,
+        ).values(
+            'employee_id', 'source_month', 'source_year', 'component'
+        ).annotate(total=Sum('amount')).order_by()
+    }
+
+    # Adjustments carried into the paid payrolls; a positive net total was
+    # added to other_allowances (negative totals went to other_deductions,
+    # which is not compared)
+    carried = {
+        row['payroll_id']: row['total']
+        for row in PayrollAdjustment.objects.filter(
+            status='applied', payroll__in=payrolls,
+        ).values('payroll_id').annotate(total=Sum('amount')).order_by()
+    }
+
+    adjustments = []
+    for payroll_id, employee_id, month, year, *paid in paid_rows:
+        dates, values = history.get(employee_id, ([], []))
+        position = bisect_right(dates, _month_end(year, month))
+        if not position:
+            continue
+        in_effect = values[position - 1]
+        carried_allowance = max(carried.get(payroll_id, Decimal('0')), Decimal('0'))
+        if carried_allowance:
+            index = RETRO_COMPONENTS.index('other_allowances')
+            paid[index] = (paid[index] or Decimal('0')) - carried_allowance
+
+        for component, paid_amount, due_amount in zip(RETRO_COMPONENTS, paid, in_effect):
+            already = emitted.get((employee_id, month, year, component), Decimal('0'))
+            delta = (due_amount or Decimal('0')) - (paid_amount or Decimal('0')) - already
+            if delta:
+                adjustments.append(PayrollAdjustment(
+                    employee_id=employee_id,
+                    source_month=month,
+                    source_year=year,
+                    component=component,
+                    amount=delta,
+                    reason=reason,
+                ))
+
+    return adjustments
+
+
+def create_retro_adjustments(since: date, employee_ids: Iterable[int] = None,
+                             user=None) -> int:
+    """Compute and store retro adjustment lines; returns the number created"""
+    adjustments = compute_retro_adjustments(since, employee_ids)
+    for adjustment in adjustments:
+        adjustment.created_by = user
+    PayrollAdjustment.objects.bulk_create(adjustments, batch_size=500)
+    return len(adjustments)
+
+
+def apply_pending_adjustments(month: int, year: int, employee_ids: Iterable[int] = None) -> Dict[str, int]:
+    """
+    Carry pending adjustments into the draft payrolls of a month
+    ترحيل التسويات المعلقة إلى مسير الشهر
+
+    Positive totals are added to ``other_allowances`` and negative totals to
+    ``other_deductions``. Employees without a draft payroll for the month
+    keep their adjustments pending for a later run. ``employee_ids`` limits
+    the run to some employees.
+
+    Returns:
+        Dictionary with processing statistics
+    """
+    stats = {'payrolls': 0, 'adjustments': 0}
+
+    drafts = Payroll.objects.filter(month=month, year=year, status='draft')
+    if employee_ids is not None:
+        drafts = drafts.filter(employee_id__in=list(employee_ids))
+
+    with transaction.atomic():
+        payrolls = {
+            payroll.employee_id: payroll
+            for payroll in drafts.select_for_update()
+        }
+        pending = list(PayrollAdjustment.objects.filter(
+            status='pending',
+            employee_id__in=drafts.values('employee_id'),
+        ).values_list('id', 'employee_id', 'amount'))
+        if not pending:
+            return stats
+
+        totals = defaultdict(Decimal)
+        for _, employee_id, amount in pending:
+            totals[employee_id] += amount
+
+        # bulk_update skips auto_now; updated_at is the optimistic lock of
+        # payroll transitions, so it is set explicitly
+        now = timezone.now()
+        changed = []
+        for employee_id, amount in totals.items():
+            payroll = payrolls[employee_id]
+            if amount > 0:
+                payroll.other_allowances += amount
+            else:
+                payroll.other_deductions -= amount
+            payroll.calculate_totals()
+            payroll.updated_at = now
+            changed.append(payroll)
+
+        Payroll.objects.bulk_update(
+            changed,
+            ['other_allowances', 'other_deductions', 'gross_salary', 'total_deductions', 'net_salary',
+             'updated_at'],
+            batch_size=500,
+        )
+        invalidate_on_commit('payroll')
+
+        target_payroll = Payroll.objects.filter(
+            employee_id=OuterRef('employee_id'), month=month, year=year,
+        ).values('id')[:1]
+        pending_ids = [row[0] for row in pending]
+        for start in range(0, len(pending_ids), ID_BATCH_SIZE):
+            stats['adjustments'] += PayrollAdjustment.objects.filter(
+                id__in=pending_ids[start:start + ID_BATCH_SIZE],
+            ).update(status='applied', payroll_id=Subquery(target_payroll), updated_at=now)
+        stats['payrolls'] = len(changed)
+
+    return stats
+
+
+def _history_saved(sender, instance, raw=False, **kwargs):
+    """Compute retro lines when a salary change takes effect in a paid month"""
+    if raw:
+        return
+    employee_id, since = instance.employee_id, instance.effective_date
+    if not Payroll.objects.filter(
+        Q(year__gt=since.year) | Q(year=since.year, month__gte=since.month),
+        employee_id=employee_id, status='paid',
+    ).exists():
+        return
+    transaction.on_commit(
+        lambda: create_retro_adjustments(since, [employee_id], user=instance.updated_by or instance.created_by)
+    )
+
+
+def connect_signals() -> None:
+    """Run the engine for backdated salary history (called from AppConfig.ready)"""
+    from django.db.models.signals import post_save
+
+    post_save.connect(_history_saved, sender='employees.SalaryHistory', weak=False,
+                      dispatch_uid='payroll_retro_salary_history')
@@ -0,0 +1,221 @@
+"""
+Period-close snapshots for historical payroll reporting
+لقطات إغلاق الفترات لتقارير الرواتب التاريخية
+
+Closing a paid month writes one ``PayrollPeriodSnapshot`` holding the
+denormalized rows (employee, department, branch, position and every
+component) compressed with zlib, plus per-department/branch totals, and
+one ``PayrollSnapshotEntry`` per employee for history lookups. The read
+functions below only touch the snapshot tables, so historical and year-end
+reports neither join live ``Employee``/``Department`` rows nor change when
+people move departments.
+"""
+import json
+import zlib
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterator, List, Tuple
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Payroll, PayrollPeriodSnapshot, PayrollSnapshotEntry
+from .simulation import DEDUCTION_COMPONENTS, EARNING_COMPONENTS
+
+SNAPSHOT_COLUMNS = (
+    'employee_id',
+    'employee__emp_code',
+    'employee__full_name_ar',
+    'employee__department_id',
+    'employee__department__dept_name_ar',
+    'employee__branch_id',
+    'employee__branch__branch_name_ar',
+    'employee__position_id',
+    'employee__position__position_name_ar',
+) + EARNING_COMPONENTS + DEDUCTION_COMPONENTS + (
+    'gross_salary',
+    'total_deductions',
+    'net_salary',
+    'payment_date',
+)
+
+# Short column names stored in the snapshot rows
+COLUMN_NAMES = tuple(name.replace('employee__', '').replace('__', '_') for name in SNAPSHOT_COLUMNS)
+
+SUMMARY_AMOUNTS = ('gross_salary', 'total_deductions', 'net_salary')
+
+BULK_BATCH_SIZE = 500
+
+
+class PeriodNotClosable(Exception):
+    """Raised when a payroll month cannot be closed"""
+    pass
+
+
+def _json_value(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def _summarize(rows: List[Dict]) -> Dict:
+    """Per-department and per-branch totals for a snapshot"""
+    summary = {}
+    for group, key, name in (
+        ('department', 'department_id', 'department_dept_name_ar'),
+        ('branch', 'branch_id', 'branch_branch_name_ar'),
+    ):
+        totals = defaultdict(lambda: {'name': None, 'headcount': 0, **{a: Decimal('0') for a in SUMMARY_AMOUNTS}})
+        for row in rows:
+            bucket = totals[str(row[key])]
+            bucket['name'] = row[name]
+            bucket['headcount'] += 1
+            for amount in SUMMARY_AMOUNTS:
+                bucket[amount] += Decimal(row[amount])
+        summary[group] = {
+            group_id: {k: _json_value(v) for k, v in bucket.items()}
+            for group_id, bucket in totals.items()
+        }
+    return summary
+
+
+def close_period(month: int, year: int, user=None) -> PayrollPeriodSnapshot:
+    """
+    Close a fully paid payroll month into an immutable snapshot
+    إغلاق شهر رواتب مدفوع في لقطة غير قابلة للتعديل
+
+    Raises:
+        PeriodNotClosable: if the month is already closed, has no payrolls
+            or still has unpaid payrolls
+    """
+    with transaction.atomic():
+        if PayrollPeriodSnapshot.objects.filter(month=month, year=year).exists():
+            raise PeriodNotClosable(f'الشهر {month}/{year} مغلق بالفعل.')
+
+        payrolls = Payroll.objects.filter(month=month, year=year)
+        if payrolls.exclude(status='paid').exists():
+            raise PeriodNotClosable(f'يوجد رواتب غير مدفوعة في الشهر {month}/{year}.')
+
+        rows = [
+            {name: _json_value(value) for name, value in zip(COLUMN_NAMES, values)}
+            for values in payrolls.order_by('employee__emp_code').values_list(*SNAPSHOT_COLUMNS)
+        ]
+        if not rows:
+            raise PeriodNotClosable(f'لا توجد رواتب في الشهر {month}/{year}.')
+
+        payload = json.dumps(
+            {'columns': COLUMN_NAMES, 'rows': [[row[name] for name in COLUMN_NAMES] for row in rows]},
+            ensure_ascii=False,
+            separators=(',', ':'),
+        ).encode('utf-8')
+
+        snapshot = PayrollPeriodSnapshot.objects.create(
+            month=month,
+            year=year,
+            row_count=len(rows),
+            gross_total=sum(Decimal(row['gross_salary']) for row in rows),
+            deductions_total=sum(Decimal(row['total_deductions']) for row in rows),
+            net_total=sum(Decimal(row['net_salary']) for row in rows),
+            summary=_summarize(rows),
+            data=zlib.compress(payload, 6),
+            closed_by=user,
+        )
+        PayrollSnapshotEntry.objects.bulk_create([
+            PayrollSnapshotEntry(snapshot=snapshot, month=month, year=year, emp_code=row['emp_code'], data=row)
+            for row in rows
+        ], batch_size=BULK_BATCH_SIZE)
+        return snapshot
+
+
+def _period_filter(start: Tuple[int, int], end: Tuple[int, int]) -> Q:
+    """Q filter for snapshots between (year, month) start and end inclusive"""
+    (start_year, start_month), (end_year, end_month) = start, end
+    return (
+        (Q(year__gt=start_year) | Q(year=start_year, month__gte=start_month)) &
+        (Q(year__lt=end_year) | Q(year=end_year, month__lte=end_month))
+    )
+
+
+def decode_snapshot(snapshot: PayrollPeriodSnapshot) -> Iterator[Dict]:
+    """Yield the stored rows of a snapshot as dictionaries"""
+    payload = json.loads(zlib.decompress(bytes(snapshot.data)).decode('utf-8'))
+    columns = payload['columns']
+    for values in payload['rows']:
+        row = dict(zip(columns, values))
+        row['month'] = snapshot.month
+        row['year'] = snapshot.year
+        yield row
+
+
+def iter_snapshot_rows(start: Tuple[int, int], end: Tuple[int, int]) -> Iterator[Dict]:
+    """
+    Yield the snapshot rows of every closed month in a period
+    المرور على سجلات اللقطات لفترة معينة
+
+    Snapshots are fetched one at a time so a 36-month audit scan holds a
+    single decompressed month in memory.
+    """
+    snapshots = PayrollPeriodSnapshot.objects.filter(
+        _period_filter(start, end)
+    ).order_by('year', 'month')
+    for snapshot in snapshots.iterator(chunk_size=1):
+        yield from decode_snapshot(snapshot)
+
+
+def period_totals(start: Tuple[int, int], end: Tuple[int, int], group_by: str = None) -> Dict:
+    """
+    Totals for a period from the snapshot summaries (no decompression)
+    مجاميع الفترة من ملخصات اللقطات
+
+    Args:
+        start, end: (year, month) tuples, inclusive
+        group_by: None for monthly company totals, or 'department'/'branch'
+
+    Returns:
+        Dictionary keyed by (year, month) or by group id
+    """
+    snapshots = PayrollPeriodSnapshot.objects.filter(
+        _period_filter(start, end)
+    ).order_by('year', 'month')
+
+    if group_by is None:
+        return {
+            (year, month): {
+                'headcount': row_count,
+                'gross_salary': gross,
+                'total_deductions': deductions,
+                'net_salary': net,
+            }
+            for year, month, row_count, gross, deductions, net in snapshots.values_list(
+                'year', 'month', 'row_count', 'gross_total', 'deductions_total', 'net_total'
+            )
+        }
+
+    if group_by not in ('department', 'branch'):
+        raise ValueError(f"Unsupported grouping: {group_by}")
+
+    totals = {}
+    for summary in snapshots.values_list('summary', flat=True):
+        for group_id, bucket in summary.get(group_by, {}).items():
+            total = totals.setdefault(group_id, {
+                'name': bucket['name'],
+                'employee_months': 0,
+                **{amount: Decimal('0') for amount in SUMMARY_AMOUNTS},
+            })
+            total['employee_months'] += bucket['headcount']
+            for amount in SUMMARY_AMOUNTS:
+                total[amount] += Decimal(bucket[amount])
+    return totals
+
+
+def employee_history(emp_code: str, start: Tuple[int, int], end: Tuple[int, int]) -> List[Dict]:
+    """Snapshot rows of one employee over a period (audit lookups)"""
+    entries = PayrollSnapshotEntry.objects.filter(
+        _period_filter(start, end), emp_code=emp_code
+    ).order_by('year', 'month')
+    return [
+        {**data, 'month': month, 'year': year}
+        for month, year, data in entries.values_list('month', 'year', 'data')
+    ]
@@ -0,0 +1,69 @@
+"""
+Celery tasks for payroll app
+مهام Celery لتطبيق الرواتب
+"""
+from celery import shared_task
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='payroll.snapshot_gratuity_liability')
+def snapshot_gratuity_liability_task(month=None, year=None):
+    """
+    Celery task to store the monthly end-of-service liability
+    مهمة Celery لحفظ التزامات نهاية الخدمة الشهرية
+
+    Args:
+        month: Month to snapshot (default: previous month)
+        year: Year to snapshot (default: year of previous month)
+
+    Returns:
+        Dictionary with processing statistics
+    """
+    from payroll.gratuity import snapshot_gratuity_liability
+
+    try:
+        if month is None or year is None:
+            today = timezone.now().date()
+            month, year = (today.month - 1, today.year) if today.month > 1 else (12, today.year - 1)
+
+        logger.info(f"Snapshotting gratuity liability for {month}/{year}")
+        stats = snapshot_gratuity_liability(month, year)
+        logger.info(f"Gratuity liability stored for {stats['departments']} departments")
+
+        return stats
+
+    except Exception as e:
+        logger.error(f"Error in gratuity liability snapshot: {str(e)}")
+        raise
+
+
+@shared_task(name='payroll.run_retro_payroll')
+def run_retro_payroll_task(since, month=None, year=None):
+    """
+    Celery task to compute retro adjustments and carry them into a month
+    مهمة Celery لحساب الفروقات بأثر رجعي وترحيلها
+
+    Args:
+        since: First paid month to compare (ISO date)
+        month: Draft month to carry pending adjustments into (optional)
+        year: Year of that month
+
+    Returns:
+        Dictionary with processing statistics
+    """
+    from datetime import date
+    from payroll.retro import apply_pending_adjustments, create_retro_adjustments
+
+    try:
+        stats = {'created': create_retro_adjustments(date.fromisoformat(since))}
+        if month and year:
+            stats.update(apply_pending_adjustments(month, year))
+        logger.info(f"Retro payroll run since {since}: {stats}")
+        return stats
+
+    except Exception as e:
+        logger.error(f"Error in retro payroll run: {str(e)}")
+        raise
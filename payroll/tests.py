@@ -0,0 +1,112 @@
+"""
+Tests for payroll app
+اختبارات تطبيق الرواتب
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from employees.models import Employee, SalaryHistory
+from .models import Payroll, PayrollAdjustment
+from .retro import apply_pending_adjustments, compute_retro_adjustments, create_retro_adjustments
+from .snapshots import close_period, employee_history, period_totals
+
+
+class RetroAdjustmentTests(TestCase):
+    """Retroactive payroll engine"""
+
+    def setUp(self):
+        self.employee = Employee.objects.create(
+            emp_code='RETRO1',
+            first_name_ar='موظف',
+            last_name_ar='اختبار',
+            national_id='29001010000001',
+            date_of_birth=date(1990, 1, 1),
+            gender='male',
+        )
+        SalaryHistory.objects.create(
+            employee=self.employee, effective_date=date(2025, 1, 1), basic_salary=Decimal('1000'),
+        )
+        for month in (1, 2):
+            Payroll.objects.create(
+                employee=self.employee, month=month, year=2026,
+                basic_salary=Decimal('1000'), status='paid',
+            )
+
+    def test_rerun_after_carried_adjustment_is_paid(self):
+        # Backdated allowance raise for February
+        SalaryHistory.objects.create(
+            employee=self.employee, effective_date=date(2026, 2, 1),
+            basic_salary=Decimal('1000'), other_allowances=Decimal('200'),
+        )
+        self.assertEqual(create_retro_adjustments(date(2026, 1, 1)), 1)
+
+        # Carried into March, which is then paid
+        Payroll.objects.create(
+            employee=self.employee, month=3, year=2026,
+            basic_salary=Decimal('1000'), other_allowances=Decimal('200'), status='draft',
+        )
+        draft_version = Payroll.objects.get(employee=self.employee, month=3, year=2026).updated_at
+        self.assertEqual(apply_pending_adjustments(3, 2026)['adjustments'], 1)
+        march = Payroll.objects.get(employee=self.employee, month=3, year=2026)
+        self.assertEqual(march.other_allowances, Decimal('400'))
+        # Transitions read before the adjustment must see a new version
+        self.assertGreater(march.updated_at, draft_version)
+        Payroll.objects.filter(pk=march.pk).update(status='paid')
+
+        self.assertEqual(compute_retro_adjustments(date(2026, 1, 1)), [])
+        self.assertEqual(PayrollAdjustment.objects.count(), 1)
+
+    def test_backdated_salary_history_creates_adjustments(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            SalaryHistory.objects.create(
+                employee=self.employee, effective_date=date(2026, 2, 1), basic_salary=Decimal('1100'),
+            )
+        self.assertEqual(
+            list(PayrollAdjustment.objects.values_list('source_month', 'component', 'amount')),
+            [(2, 'basic_salary', Decimal('100.00'))],
+        )
+
+    def test_salary_edit_records_history(self):
+        self.employee.basic_salary = Decimal('1500')
+        self.employee.save()
+        self.employee.save()
+        self.assertEqual(SalaryHistory.objects.filter(employee=self.employee).count(), 2)
+        self.assertEqual(
+            SalaryHistory.objects.filter(employee=self.employee).latest('effective_date').basic_salary,
+            Decimal('1500.00'),
+        )
+
+
+class PeriodSnapshotTests(TestCase):
+    """Period-close snapshots"""
+
+    def setUp(self):
+        for index in (1, 2):
+            employee = Employee.objects.create(
+                emp_code=f'SNAP{index}',
+                first_name_ar='موظف',
+                last_name_ar='اختبار',
+                national_id=f'2900101000000{index}',
+                date_of_birth=date(1990, 1, 1),
+                gender='male',
+            )
+            Payroll.objects.create(
+                employee=employee, month=1, year=2026,
+                basic_salary=Decimal('1000') * index, status='paid',
+            )
+
+    def test_employee_history_reads_entries(self):
+        snapshot = close_period(1, 2026)
+        self.assertEqual(snapshot.entries.count(), 2)
+
+        history = employee_history('SNAP2', (2026, 1), (2026, 12))
+        self.assertEqual(len(history), 1)
+        self.assertEqual((history[0]['year'], history[0]['month']), (2026, 1))
+        self.assertEqual(
+            history[0]['net_salary'],
+            str(Payroll.objects.get(employee__emp_code='SNAP2').net_salary),
+        )
+        self.assertEqual(employee_history('SNAP2', (2026, 2), (2026, 12)), [])
+        self.assertEqual(period_totals((2026, 1), (2026, 1))[(2026, 1)]['headcount'], 2)
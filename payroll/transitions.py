@@ -0,0 +1,148 @@
+"""
+Bulk payroll state transitions
+تغيير حالات الرواتب بشكل جماعي
+
+Moves whole batches of payrolls along draft → processing → approved → paid
+without calling ``Payroll.save()`` per row. A batch is the mapping of payroll
+id to the ``updated_at`` value seen when it was read; inside one transaction
+the rows are locked with ``select_for_update``, the whole batch is validated
+(current status and unchanged ``updated_at``) and then written with one
+``update()`` per chunk of ids. One audit log entry is written per batch.
+"""
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.utils import log_action
+from reports.dashboards import invalidate_on_commit
+from .models import Payroll
+
+# Ids per statement, below SQL Server's 2100 parameter limit
+ID_BATCH_SIZE = 1000
+
+# Target status -> required current status
+TRANSITIONS = {
+    'processing': 'draft',
+    'approved': 'processing',
+    'paid': 'approved',
+}
+
+
+class TransitionError(Exception):
+    """
+    Raised when a batch cannot be moved to the requested status
+
+    Attributes:
+        conflicts: List of (payroll id, reason) tuples
+    """
+
+    def __init__(self, message: str, conflicts: List[Tuple[int, str]] = None):
+        super().__init__(message)
+        self.conflicts = conflicts or []
+
+
+def read_batch(month: int, year: int, to_status: str) -> Dict[int, datetime]:
+    """
+    Read the payrolls of a month that can move to ``to_status``
+    قراءة دفعة الرواتب القابلة للانتقال إلى الحالة المطلوبة
+
+    Returns:
+        Mapping of payroll id to its ``updated_at`` version
+    """
+    if to_status not in TRANSITIONS:
+        raise TransitionError(f'حالة غير مدعومة: {to_status}')
+    return dict(Payroll.objects.filter(
+        month=month, year=year, status=TRANSITIONS[to_status],
+    ).values_list('id', 'updated_at'))
+
+
+def _chunks(ids: List[int]) -> Iterable[List[int]]:
+    for start in range(0, len(ids), ID_BATCH_SIZE):
+        yield ids[start:start + ID_BATCH_SIZE]
+
+
+def transition_payrolls(batch: Dict[int, datetime], to_status: str, user=None,
+                        payment_date: date = None, payment_method: str = None,
+                        ip_address: str = None) -> int:
+    """
+    Move a batch of payrolls to ``to_status`` atomically
+    نقل دفعة من الرواتب إلى حالة جديدة
+
+    Args:
+        batch: Mapping of payroll id to the ``updated_at`` value read
+        to_status: Target status (processing, approved or paid)
+        user: User performing the transition
+        payment_date: Payment date for ``paid`` (default: today)
+        payment_method: Optional payment method for ``paid``
+        ip_address: Client IP for the audit entry
+
+    Returns:
+        Number of payrolls updated
+
+    Raises:
+        TransitionError: if any row is missing, in another status or was
+            changed since the batch was read; nothing is updated then
+    """
+    if to_status not in TRANSITIONS:
+        raise TransitionError(f'حالة غير مدعومة: {to_status}')
+    if not batch:
+        return 0
+
+    from_status = TRANSITIONS[to_status]
+    ids = sorted(batch)
+    now = timezone.now()
+
+    values = {'status': to_status, 'updated_at': now, 'updated_by': user}
+    if to_status == 'paid':
+        values['payment_date'] = payment_date or timezone.localdate()
+        if payment_method:
+            values['payment_method'] = payment_method
+
+    with transaction.atomic():
+        conflicts = []
+        seen = set()
+        for chunk in _chunks(ids):
+            rows = Payroll.objects.select_for_update().filter(
+                id__in=chunk,
+            ).values_list('id', 'status', 'updated_at')
+            for payroll_id, status, updated_at in rows:
+                seen.add(payroll_id)
+                if status != from_status:
+                    conflicts.append((payroll_id, f'الحالة الحالية {status}'))
+                elif updated_at != batch[payroll_id]:
+                    conflicts.append((payroll_id, 'تم تعديل السجل بعد قراءته'))
+        conflicts.extend((payroll_id, 'السجل غير موجود') for payroll_id in ids if payroll_id not in seen)
+
+        if conflicts:
+            raise TransitionError(
+                f'تعذر تغيير حالة {len(conflicts)} من أصل {len(ids)} راتب.',
+                conflicts,
+            )
+
+        updated = 0
+        for chunk in _chunks(ids):
+            updated += Payroll.objects.filter(id__in=chunk, status=from_status).update(**values)
+        invalidate_on_commit('payroll')
+
+        log_action(
+            user,
+            'approve' if to_status == 'approved' else 'update',
+            'Payroll',
+            description=(
+                f'تغيير حالة {updated} راتب من {from_status} إلى {to_status} '
+                f'(المعرفات {ids[0]}-{ids[-1]})'
+            ),
+            ip_address=ip_address,
+        )
+
+    return updated
+
+
+def transition_month(month: int, year: int, to_status: str, user=None, **kwargs) -> int:
+    """
+    Move every eligible payroll of a month to ``to_status``
+    نقل جميع رواتب الشهر المؤهلة إلى حالة جديدة
+    """
+    return transition_payrolls(read_batch(month, year, to_status), to_status, user=user, **kwargs)
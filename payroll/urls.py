@@ -12,6 +12,7 @@ urlpatterns = [
     path('', views.payroll_list, name='payroll_list'),
     path('payroll/<int:pk>/', views.payroll_detail, name='payroll_detail'),
     path('payroll/create/', views.payroll_create, name='payroll_create'),
+    path('payroll/transition/', views.payroll_bulk_transition, name='payroll_bulk_transition'),
 
     # Payslip URLs
     path('payslips/', views.payslip_list, name='payslip_list'),
@@ -28,5 +29,14 @@ urlpatterns = [
     # Bonus URLs
     path('bonuses/', views.bonus_list, name='bonus_list'),
     path('bonus/create/', views.bonus_create, name='bonus_create'),
+
+    # Bank File URLs
+    path('bank-file/', views.bank_file_export, name='bank_file_export'),
+
+    # Simulation URLs
+    path('simulate/', views.salary_simulation, name='salary_simulation'),
+
+    # Gratuity URLs
+    path('gratuity/', views.gratuity_liability_report, name='gratuity_liability_report'),
 ]
 
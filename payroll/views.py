@@ -6,6 +6,8 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
+from django.http import JsonResponse, StreamingHttpResponse
+import json
 from .models import Payroll, Payslip, Loan, Bonus
 from .forms import PayrollForm, PayslipForm, LoanForm, BonusForm
 
@@ -58,6 +60,10 @@ def payroll_create(request):
         form = PayrollForm(request.POST)
         if form.is_valid():
             payroll = form.save()
+            if payroll.status == 'draft':
+                # Carry pending retro adjustments into the new payroll
+                from .retro import apply_pending_adjustments
+                apply_pending_adjustments(payroll.month, payroll.year, [payroll.employee_id])
             messages.success(request, 'تم إنشاء كشف الرواتب بنجاح.')
             return redirect('payroll:payroll_detail', pk=payroll.pk)
     else:
@@ -256,3 +262,157 @@ def bonus_create(request):
     
     return render(request, 'payroll/bonus_form.html', {'form': form})
 
+
+
+# Bank File Views
+@login_required
+def bank_file_export(request):
+    """
+    Stream the monthly bank transfer / WPS file for approved payrolls
+    تصدير ملف تحويل الرواتب للبنك
+    """
+    from .bank_export import get_bank_file_format, generate_bank_file
+
+    if not (request.user.is_superuser or request.user.role in ('admin', 'hr_manager')):
+        messages.error(request, 'ليس لديك صلاحية لتصدير ملف الرواتب.')
+        return redirect('payroll:payroll_list')
+
+    try:
+        month = int(request.GET.get('month'))
+        year = int(request.GET.get('year'))
+        fmt = get_bank_file_format(request.GET.get('format', 'wps'), month, year)
+    except (TypeError, ValueError):
+        messages.error(request, 'يرجى تحديد الشهر والسنة وصيغة ملف صحيحة.')
+        return redirect('payroll:payroll_list')
+
+    response = StreamingHttpResponse(generate_bank_file(fmt), content_type=fmt.content_type)
+    response['Content-Disposition'] = f'attachment; filename="{fmt.filename()}"'
+    return response
+
+
+# Simulation Views
+@login_required
+def salary_simulation(request):
+    """
+    Salary what-if simulation (AJAX)
+    محاكاة تكلفة تعديل الرواتب
+
+    Expects a JSON body such as::
+
+        {"group_by": "department", "insurance_rate": 9.75,
+         "rules": [{"component": "basic_salary", "percent": 7, "level": 3}]}
+    """
+    from .simulation import SalaryScenario, run_simulation
+
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+
+    if not (request.user.is_superuser or request.user.role in ('admin', 'hr_manager')):
+        return JsonResponse({'success': False, 'error': 'ليس لديك صلاحية لتشغيل المحاكاة.'}, status=403)
+
+    try:
+        data = json.loads(request.body) if request.body else {}
+        scenario = SalaryScenario.from_dict(data)
+        result = run_simulation(scenario, group_by=data.get('group_by', 'department'))
+        return JsonResponse({'success': True, **result})
+    except (ValueError, TypeError, ArithmeticError) as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+
+# Status Transition Views
+@login_required
+def payroll_bulk_transition(request):
+    """
+    Move a whole payroll month to the next status (AJAX)
+    تغيير حالة رواتب الشهر بشكل جماعي
+
+    Expects a JSON body such as::
+
+        {"month": 3, "year": 2026, "status": "approved",
+         "payrolls": [{"id": 12, "updated_at": "2026-03-28T10:15:00+00:00"}]}
+
+    ``payrolls`` carries the versions shown to the user; when omitted every
+    eligible payroll of the month is moved.
+    """
+    from django.utils.dateparse import parse_datetime
+    from .transitions import TransitionError, transition_payrolls, read_batch
+
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+
+    if not (request.user.is_superuser or request.user.role in ('admin', 'hr_manager')):
+        return JsonResponse({'success': False, 'error': 'ليس لديك صلاحية لتغيير حالة الرواتب.'}, status=403)
+
+    try:
+        data = json.loads(request.body) if request.body else {}
+        to_status = data.get('status')
+        if data.get('payrolls') is not None:
+            batch = {int(item['id']): parse_datetime(item['updated_at']) for item in data['payrolls']}
+        else:
+            batch = read_batch(int(data['month']), int(data['year']), to_status)
+        updated = transition_payrolls(
+            batch,
+            to_status,
+            user=request.user,
+            payment_method=data.get('payment_method'),
+            ip_address=request.META.get('REMOTE_ADDR'),
+        )
+        return JsonResponse({'success': True, 'updated': updated})
+    except TransitionError as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e),
+            'conflicts': [{'id': pk, 'reason': reason} for pk, reason in e.conflicts],
+        }, status=409)
+    except (KeyError, ValueError, TypeError) as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+
+# Gratuity Views
+@login_required
+def gratuity_liability_report(request):
+    """
+    End-of-service liability report from the monthly snapshots
+    تقرير التزامات مكافأة نهاية الخدمة
+    """
+    from django.db.models import Sum
+    from .models import GratuityLiabilitySnapshot
+
+    if not (request.user.is_superuser or request.user.role in ('admin', 'hr_manager')):
+        messages.error(request, 'ليس لديك صلاحية لعرض تقرير نهاية الخدمة.')
+        return redirect('payroll:payroll_list')
+
+    month = year = None
+    if request.GET.get('month') or request.GET.get('year'):
+        try:
+            month = int(request.GET.get('month'))
+            year = int(request.GET.get('year'))
+            if not (1 <= month <= 12 and 1900 <= year <= 9999):
+                raise ValueError
+        except (TypeError, ValueError):
+            messages.error(request, 'يرجى تحديد شهر وسنة صحيحين.')
+            month = year = None
+    if not (month and year):
+        latest = GratuityLiabilitySnapshot.objects.order_by('-year', '-month').values('month', 'year').first()
+        if latest:
+            month, year = latest['month'], latest['year']
+
+    snapshots = GratuityLiabilitySnapshot.objects.filter(
+        month=month, year=year
+    ).order_by('department_name') if month and year else GratuityLiabilitySnapshot.objects.none()
+
+    totals = snapshots.aggregate(
+        headcount=Sum('headcount'),
+        monthly_wage_total=Sum('monthly_wage_total'),
+        termination_liability=Sum('termination_liability'),
+        resignation_liability=Sum('resignation_liability'),
+    )
+
+    context = {
+        'snapshots': snapshots,
+        'totals': totals,
+        'month': month,
+        'year': year,
+    }
+
+    return render(request, 'payroll/gratuity_report.html', context)
@@ -1,7 +1,57 @@
 from django.contrib import admin
-from .models import ReportTemplate, GeneratedReport, Dashboard
+from django.template.response import TemplateResponse
+from django.urls import path
+from .models import ReportTemplate, GeneratedReport, Dashboard, ReportBudget, ReportExecutionStat
 
 admin.site.register(ReportTemplate)
 admin.site.register(GeneratedReport)
 admin.site.register(Dashboard)
 
+
+@admin.register(ReportBudget)
+class ReportBudgetAdmin(admin.ModelAdmin):
+    """Report Budget Admin"""
+    list_display = ['report_key', 'max_queries', 'max_duration_ms', 'action', 'is_active']
+    list_filter = ['action', 'is_active']
+    search_fields = ['report_key']
+    ordering = ['report_key']
+
+
+@admin.register(ReportExecutionStat)
+class ReportExecutionStatAdmin(admin.ModelAdmin):
+    """Report Execution Statistics Admin"""
+    list_display = ['report_key', 'user', 'started_at', 'duration_ms', 'db_time_ms',
+                    'python_time_ms', 'query_count', 'row_count', 'over_budget']
+    list_filter = ['report_key', 'over_budget', 'started_at']
+    search_fields = ['report_key', 'user__username']
+    ordering = ['-started_at']
+    change_list_template = 'admin/reports/reportexecutionstat/change_list.html'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def get_urls(self):
+        urls = [
+            path('slowest/', self.admin_site.admin_view(self.slowest_view), name='reports_reportexecutionstat_slowest'),
+        ]
+        return urls + super().get_urls()
+    
+    def slowest_view(self, request):
+        """Reports ordered by p95 latency"""
+        from .instrumentation import slowest_reports
+        
+        try:
+            days = max(int(request.GET.get('days', 7)), 1)
+        except ValueError:
+            days = 7
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'التقارير الأبطأ',
+            'days': days,
+            'rows': slowest_reports(days),
+        }
+        return TemplateResponse(request, 'admin/reports/reportexecutionstat/slowest.html', context)
@@ -6,3 +6,7 @@ class ReportsConfig(AppConfig):
     name = 'reports'
     verbose_name = 'التقارير والتحليلات'
 
+
+    def ready(self):
+        from .dashboards import connect_invalidation_signals
+        connect_invalidation_signals()
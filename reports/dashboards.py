@@ -0,0 +1,384 @@
+"""
+Dashboard widget engine
+محرك أدوات لوحات المعلومات
+
+``Dashboard.widgets`` is a list of widget definitions such as::
+
+    {"id": "late_today", "title": "المتأخرون اليوم", "source": "attendance",
+     "metric": "count", "filters": {"status": "late"}, "range": "today",
+     "ttl": 120}
+
+    {"id": "hours_by_dept", "title": "ساعات العمل حسب القسم",
+     "source": "attendance", "metric": "sum", "field": "work_hours",
+     "range": "this_month", "group_by": "department"}
+
+Widgets are evaluated together: cached results are fetched with one
+``get_many``; the remaining widgets over the same source, date range and
+grouping are merged into one aggregate query with a filtered aggregate per
+widget. Each result is cached with the widget's TTL under a key that
+includes the source version, which is bumped whenever a change to a row of
+the source model is committed. For ``REPLICA_STICKY_SECONDS`` after a bump
+the results are computed on the primary, so a lagging replica does not get
+old values cached under the new version.
+"""
+import hashlib
+import json
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min, Q, Sum
+from django.utils import timezone
+
+from core.db_router import primary_reads, sticky_seconds
+
+DEFAULT_TTL = 300
+
+# Source version keys never expire; results expire with their TTL
+VERSION_TIMEOUT = None
+
+METRICS = {
+    'count': Count,
+    'sum': Sum,
+    'avg': Avg,
+    'min': Min,
+    'max': Max,
+}
+
+RANGES = ('all', 'today', 'this_week', 'this_month', 'last_30_days', 'this_year')
+
+
+class WidgetError(ValueError):
+    """Raised for an invalid widget definition"""
+    pass
+
+
+class WidgetSource:
+    """
+    A model widgets can aggregate over
+    مصدر بيانات للأدوات
+
+    Attributes:
+        model_label: 'app_label.ModelName'
+        date_field: Field the date range applies to (None: no ranges)
+        fields: Fields allowed for sum/avg/min/max
+        filters: Mapping of filter name to ORM lookup
+        group_by: Mapping of grouping name to ORM lookup
+    """
+
+    def __init__(self, model_label: str, date_field: str = None, fields=(),
+                 filters: Dict[str, str] = None, group_by: Dict[str, str] = None):
+        self.model_label = model_label
+        self.date_field = date_field
+        self.fields = set(fields)
+        self.filters = filters or {}
+        self.group_by = group_by or {}
+
+    @property
+    def model(self):
+        from django.apps import apps
+        return apps.get_model(self.model_label)
+
+
+SOURCES = {
+    'employee': WidgetSource(
+        'employees.Employee',
+        date_field='hire_date',
+        fields=('basic_salary', 'total_salary'),
+        filters={
+            'is_active': 'is_active',
+            'department': 'department_id',
+            'branch': 'branch_id',
+            'employment_type': 'employment_type',
+            'gender': 'gender',
+        },
+        group_by={
+            'department': 'department__dept_name_ar',
+            'branch': 'branch__branch_name_ar',
+            'employment_type': 'employment_type',
+            'gender': 'gender',
+        },
+    ),
+    'attendance': WidgetSource(
+        'attendance.Attendance',
+        date_field='date',
+        fields=('work_hours', 'late_minutes', 'early_leave_minutes', 'overtime_hours'),
+        filters={
+            'status': 'status',
+            'department': 'employee__department_id',
+            'branch': 'employee__branch_id',
+        },
+        group_by={
+            'status': 'status',
+            'department': 'employee__department__dept_name_ar',
+            'branch': 'employee__branch__branch_name_ar',
+            'date': 'date',
+        },
+    ),
+    'leave': WidgetSource(
+        'attendance.LeaveRequest',
+        date_field='start_date',
+        fields=('days_count',),
+        filters={
+            'status': 'status',
+            'leave_type': 'leave_type',
+            'department': 'employee__department_id',
+        },
+        group_by={
+            'status': 'status',
+            'leave_type': 'leave_type',
+            'department': 'employee__department__dept_name_ar',
+        },
+    ),
+    'payroll': WidgetSource(
+        'payroll.Payroll',
+        fields=('gross_salary', 'total_deductions', 'net_salary'),
+        filters={
+            'status': 'status',
+            'month': 'month',
+            'year': 'year',
+            'department': 'employee__department_id',
+        },
+        group_by={
+            'status': 'status',
+            'department': 'employee__department__dept_name_ar',
+            'month': 'month',
+        },
+    ),
+}
+
+
+class Widget:
+    """A validated widget definition"""
+
+    def __init__(self, spec: Dict, index: int = 0):
+        if not isinstance(spec, dict):
+            raise WidgetError('Widget definition must be an object')
+        self.id = str(spec.get('id') or f'widget_{index}')
+        self.title = spec.get('title', '')
+        self.source_name = spec.get('source')
+        if self.source_name not in SOURCES:
+            raise WidgetError(f"Unknown widget source: {self.source_name}")
+        source = SOURCES[self.source_name]
+
+        self.metric = spec.get('metric', 'count')
+        if self.metric not in METRICS:
+            raise WidgetError(f"Unknown metric: {self.metric}")
+        self.field = spec.get('field')
+        if self.metric != 'count' and self.field not in source.fields:
+            raise WidgetError(f"Field not allowed for {self.source_name}: {self.field}")
+
+        self.filters = spec.get('filters') or {}
+        unknown = set(self.filters) - set(source.filters)
+        if unknown:
+            raise WidgetError(f"Filters not allowed for {self.source_name}: {sorted(unknown)}")
+
+        self.range = spec.get('range') or 'all'
+        if self.range not in RANGES or (self.range != 'all' and not source.date_field):
+            raise WidgetError(f"Invalid range for {self.source_name}: {self.range}")
+
+        self.group_by = spec.get('group_by')
+        if self.group_by and self.group_by not in source.group_by:
+            raise WidgetError(f"Grouping not allowed for {self.source_name}: {self.group_by}")
+
+        try:
+            self.ttl = int(spec.get('ttl') or DEFAULT_TTL)
+        except (TypeError, ValueError):
+            raise WidgetError(f"Invalid ttl: {spec.get('ttl')}")
+        if self.ttl <= 0:
+            raise WidgetError(f"Invalid ttl: {self.ttl}")
+        self.source = source
+
+    @property
+    def batch_key(self) -> Tuple:
+        """Widgets sharing this key are computed by one query"""
+        return (self.source_name, self.range, self.group_by)
+
+    def digest(self) -> str:
+        # The resolved dates, so a cached 'today' is not served tomorrow
+        payload = json.dumps({
+            'source': self.source_name, 'metric': self.metric, 'field': self.field,
+            'filters': self.filters, 'range': self.range, 'dates': _range_dates(self.range),
+            'group_by': self.group_by,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+    def condition(self) -> Q:
+        condition = Q()
+        for name, value in self.filters.items():
+            lookup = self.source.filters[name]
+            if isinstance(value, list):
+                condition &= Q(**{f'{lookup}__in': value})
+            else:
+                condition &= Q(**{lookup: value})
+        return condition
+
+    def aggregate(self):
+        condition = self.condition()
+        field = 'pk' if self.metric == 'count' else self.field
+        return METRICS[self.metric](field, filter=condition if condition else None)
+
+
+def _range_dates(name: str) -> Optional[Tuple[date, date]]:
+    """First and last day of a named range (None for 'all')"""
+    if name == 'all':
+        return None
+    today = timezone.localdate()
+    starts = {
+        'today': today,
+        'this_week': today - timedelta(days=today.weekday()),
+        'this_month': today.replace(day=1),
+        'last_30_days': today - timedelta(days=29),
+        'this_year': today.replace(month=1, day=1),
+    }
+    return starts[name], today
+
+
+def _range_filter(source: WidgetSource, name: str) -> Q:
+    dates = _range_dates(name)
+    if dates is None:
+        return Q()
+    return Q(**{f'{source.date_field}__gte': dates[0], f'{source.date_field}__lte': dates[1]})
+
+
+def source_version_key(source_name: str) -> str:
+    return f'dashboard:source_version:{source_name}'
+
+
+def _source_changed_key(source_name: str) -> str:
+    return f'dashboard:source_changed:{source_name}'
+
+
+def invalidate_source(source_name: str) -> None:
+    """Bump the version of a source so its cached widget results are dropped"""
+    key = source_version_key(source_name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, VERSION_TIMEOUT)
+    # The replica may not have the change yet; results of the new version
+    # are computed on the primary until it has caught up
+    cache.set(_source_changed_key(source_name), 1, sticky_seconds())
+
+
+def invalidate_on_commit(source_name: str) -> None:
+    """
+    Bump a source version once the current transaction commits
+
+    For ``update()``/``bulk_update`` paths, which send no model signals.
+    """
+    transaction.on_commit(lambda: invalidate_source(source_name))
+
+
+def _source_versions(names) -> Tuple[Dict[str, int], set]:
+    """Current version of each source, and the sources changed within the replica lag"""
+    names = list(names)
+    version_keys = {source_version_key(name): name for name in names}
+    changed_keys = {_source_changed_key(name): name for name in names}
+    found = cache.get_many(list(version_keys) + list(changed_keys))
+    versions = {name: found.get(key, 0) for key, name in version_keys.items()}
+    return versions, {name for key, name in changed_keys.items() if key in found}
+
+
+def _compute_batch(widgets: List['Widget']) -> Dict[str, object]:
+    """One aggregate query for widgets sharing source, range and grouping"""
+    first = widgets[0]
+    source = first.source
+    queryset = source.model.objects.filter(_range_filter(source, first.range))
+    aggregates = {f'w{index}': widget.aggregate() for index, widget in enumerate(widgets)}
+
+    if not first.group_by:
+        values = queryset.aggregate(**aggregates)
+        return {widget.id: values[f'w{index}'] for index, widget in enumerate(widgets)}
+
+    lookup = source.group_by[first.group_by]
+    results = {widget.id: [] for widget in widgets}
+    for row in queryset.values(lookup).annotate(**aggregates).order_by(lookup):
+        for index, widget in enumerate(widgets):
+            value = row[f'w{index}']
+            if value:
+                results[widget.id].append({'label': row[lookup], 'value': value})
+    return results
+
+
+def evaluate_widgets(specs: List[Dict]) -> List[Dict]:
+    """
+    Evaluate widget definitions with caching and batched queries
+    حساب قيم الأدوات مع التخزين المؤقت وتجميع الاستعلامات
+
+    Returns:
+        List of dictionaries with id, title, value (or error) and cached
+    """
+    widgets = []
+    output = []
+    seen = set()
+    for index, spec in enumerate(specs or []):
+        try:
+            widget = Widget(spec, index)
+            # Values and errors are matched to widgets by id
+            if widget.id in seen:
+                raise WidgetError(f"Duplicate widget id: {widget.id}")
+            seen.add(widget.id)
+            widgets.append(widget)
+            output.append({'id': widget.id, 'title': widget.title, 'group_by': widget.group_by})
+        except WidgetError as e:
+            spec_id = spec.get('id') if isinstance(spec, dict) else None
+            output.append({'id': str(spec_id or f'widget_{index}'), 'error': str(e)})
+
+    versions, changed = _source_versions({widget.source_name for widget in widgets})
+    keys = {
+        widget.id: f'dashboard:widget:{widget.source_name}:{versions[widget.source_name]}:{widget.digest()}'
+        for widget in widgets
+    }
+    cached = cache.get_many(list(keys.values()))
+
+    values = {}
+    pending = defaultdict(list)
+    for widget in widgets:
+        key = keys[widget.id]
+        if key in cached:
+            values[widget.id] = (cached[key], True)
+        else:
+            pending[widget.batch_key].append(widget)
+
+    to_cache = defaultdict(dict)
+    for batch in pending.values():
+        if batch[0].source_name in changed:
+            with primary_reads():
+                computed = _compute_batch(batch)
+        else:
+            computed = _compute_batch(batch)
+        for widget_id, value in computed.items():
+            values[widget_id] = (value, False)
+        for widget in batch:
+            to_cache[widget.ttl][keys[widget.id]] = values[widget.id][0]
+    for ttl, items in to_cache.items():
+        cache.set_many(items, ttl)
+
+    for item in output:
+        if 'error' not in item and item['id'] in values:
+            item['value'], item['cached'] = values[item['id']]
+    return output
+
+
+def evaluate_dashboard(dashboard) -> List[Dict]:
+    """Evaluate all widgets of a Dashboard"""
+    return evaluate_widgets(dashboard.widgets)
+
+
+def connect_invalidation_signals() -> None:
+    """Bump source versions when source rows change (called from AppConfig.ready)"""
+    from django.db.models.signals import post_delete, post_save
+
+    for name, source in SOURCES.items():
+        def handler(sender, source_name=name, **kwargs):
+            # After commit, so a result computed for the new version
+            # includes the change
+            invalidate_on_commit(source_name)
+
+        post_save.connect(handler, sender=source.model_label, weak=False,
+                          dispatch_uid=f'dashboard_invalidate_save_{name}')
+        post_delete.connect(handler, sender=source.model_label, weak=False,
+                            dispatch_uid=f'dashboard_invalidate_delete_{name}')
@@ -29,6 +29,12 @@ class ReportFilterForm(forms.Form):
         required=False,
         widget=forms.Select(attrs={'class': 'form-control'})
     )
+    branch = forms.ModelChoiceField(
+        label='الفرع',
+        queryset=None,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
     export_format = forms.ChoiceField(
         label='صيغة التصدير',
         choices=[
@@ -42,8 +48,9 @@ class ReportFilterForm(forms.Form):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        from organization.models import Department
+        from organization.models import Branch, Department
         self.fields['department'].queryset = Department.objects.filter(is_active=True)
+        self.fields['branch'].queryset = Branch.objects.filter(is_active=True)
         
         self.helper = FormHelper()
         self.helper.form_method = 'get'
@@ -53,8 +60,9 @@ class ReportFilterForm(forms.Form):
                 Column('end_date', css_class='col-md-6'),
             ),
             Row(
-                Column('department', css_class='col-md-6'),
-                Column('export_format', css_class='col-md-6'),
+                Column('department', css_class='col-md-4'),
+                Column('branch', css_class='col-md-4'),
+                Column('export_format', css_class='col-md-4'),
             ),
             FormActions(
                 Submit('submit', 'عرض التقرير', css_class='btn btn-primary'),
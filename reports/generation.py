@@ -0,0 +1,349 @@
+"""
+Background report generation with a parameter-hash result cache
+إنشاء التقارير في الخلفية مع تخزين النتائج حسب المعاملات
+
+A report request is normalized and hashed together with the report key and
+file format. If a ``GeneratedReport`` with the same hash is still being
+built, or finished within the cache lifetime and its file still exists, the
+requester is subscribed to it instead of starting another run; otherwise a
+new ``GeneratedReport`` is created and a Celery job builds the file. Every
+subscriber gets a notification when the file is ready, and clients can poll
+the report status.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+
+from core.app_settings import get_int
+from core.db_router import replica_reads
+from core.notifications import create_notifications
+from .exports import write_csv, write_excel
+from .models import GeneratedReport
+
+logger = logging.getLogger(__name__)
+
+# Default cache lifetime when the report_cache_minutes setting is missing
+DEFAULT_CACHE_MINUTES = 60
+
+FILE_EXTENSIONS = {
+    'csv': 'csv',
+    'excel': 'xlsx',
+}
+
+
+class ReportDefinition:
+    """
+    A report that can be generated in the background
+    تعريف تقرير قابل للإنشاء في الخلفية
+
+    Attributes:
+        key: Registry key
+        title: Arabic title used for files and notifications
+        params: Mapping of parameter name to (type, required)
+        build: Callable taking the normalized parameters and returning
+            (headers, rows iterable)
+    """
+
+    def __init__(self, key: str, title: str, params: Dict[str, Tuple[type, bool]],
+                 build: Callable[[Dict], Tuple[List[str], Iterable]]):
+        self.key = key
+        self.title = title
+        self.params = params
+        self.build = build
+
+    def normalize(self, params: Dict) -> Dict:
+        """Validate parameters and convert them to JSON-safe canonical values"""
+        unknown = set(params) - set(self.params)
+        if unknown:
+            raise ValueError(f"Unknown parameters for {self.key}: {sorted(unknown)}")
+
+        normalized = {}
+        for name, (kind, required) in self.params.items():
+            value = params.get(name)
+            if value in (None, ''):
+                if required:
+                    raise ValueError(f"Missing parameter: {name}")
+                continue
+            if kind is date:
+                value = value if isinstance(value, date) else date.fromisoformat(str(value))
+                normalized[name] = value.isoformat()
+            else:
+                normalized[name] = kind(value)
+        return normalized
+
+    def parse(self, normalized: Dict) -> Dict:
+        """Convert stored canonical parameters back to Python values"""
+        return {
+            name: date.fromisoformat(value) if self.params[name][0] is date else value
+            for name, value in normalized.items()
+        }
+
+
+REPORTS: Dict[str, ReportDefinition] = {}
+
+
+def register_report(key: str, title: str, params: Dict[str, Tuple[type, bool]]):
+    """Decorator registering a report builder"""
+    def decorator(build):
+        REPORTS[key] = ReportDefinition(key, title, params, build)
+        return build
+    return decorator
+
+
+def _employee_filter(params: Dict):
+    from employees.models import Employee
+
+    if not (params.get('department') or params.get('branch')):
+        return None
+    employees = Employee.objects.all()
+    if params.get('department'):
+        employees = employees.filter(department_id=params['department'])
+    if params.get('branch'):
+        employees = employees.filter(branch_id=params['branch'])
+    return employees
+
+
+@register_report('attendance_summary', 'ملخص الحضور', {
+    'start_date': (date, True),
+    'end_date': (date, True),
+    'department': (int, False),
+    'branch': (int, False),
+})
+def build_attendance_summary(params: Dict):
+    from attendance.summary import employee_totals
+    from employees.models import Employee
+
+    totals = employee_totals(params['start_date'], params['end_date'], _employee_filter(params))
+    employees = dict(
+        (pk, (code, name)) for pk, code, name in
+        Employee.objects.values_list('id', 'emp_code', 'full_name_ar')
+    )
+    headers = ['رقم الموظف', 'الموظف', 'أيام التسجيل', 'حاضر', 'متأخر', 'غائب', 'إجازة',
+               'ساعات العمل', 'دقائق التأخير', 'ساعات العمل الإضافي']
+    rows = (
+        (
+            *employees.get(employee_id, ('', '')),
+            row['total_days'],
+            row['present_days'] + row['late_days'],
+            row['late_days'],
+            row['absent_days'],
+            row['leave_days'],
+            row['work_hours'],
+            row['late_minutes'],
+            row['overtime_hours'],
+        )
+        for employee_id, row in sorted(totals.items(), key=lambda item: employees.get(item[0], ('',))[0])
+    )
+    return headers, rows
+
+
+@register_report('payroll_summary', 'ملخص الرواتب', {
+    'month': (int, True),
+    'year': (int, True),
+    'status': (str, False),
+    'department': (int, False),
+})
+def build_payroll_summary(params: Dict):
+    from payroll.models import Payroll
+
+    payrolls = Payroll.objects.filter(month=params['month'], year=params['year'])
+    if params.get('status'):
+        payrolls = payrolls.filter(status=params['status'])
+    if params.get('department'):
+        payrolls = payrolls.filter(employee__department_id=params['department'])
+
+    headers = ['رقم الموظف', 'الموظف', 'القسم', 'إجمالي الراتب', 'إجمالي الخصومات',
+               'صافي الراتب', 'الحالة']
+    rows = payrolls.order_by('employee__emp_code').values_list(
+        'employee__emp_code', 'employee__full_name_ar', 'employee__department__dept_name_ar',
+        'gross_salary', 'total_deductions', 'net_salary', 'status',
+    ).iterator(chunk_size=2000)
+    return headers, rows
+
+
+def get_cache_minutes() -> int:
+    """Cache lifetime of generated reports from system settings"""
+    return get_int('report_cache_minutes', DEFAULT_CACHE_MINUTES)
+
+
+def parameters_hash(report_key: str, params: Dict, file_format: str) -> str:
+    """Stable SHA-256 of a report request"""
+    payload = json.dumps(
+        {'report': report_key, 'format': file_format, 'params': params},
+        sort_keys=True,
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+IN_FLIGHT_STATUSES = ('pending', 'running')
+
+
+def find_reusable_report(digest: str):
+    """In-flight report or fresh completed report for a parameter hash"""
+    fresh_since = timezone.now() - timedelta(minutes=get_cache_minutes())
+    # Runs older than the cache lifetime are treated as lost
+    candidates = GeneratedReport.objects.filter(parameters_hash=digest).filter(
+        Q(status__in=IN_FLIGHT_STATUSES, generated_at__gte=fresh_since) |
+        Q(status='completed', completed_at__gte=fresh_since)
+    ).order_by('-generated_at')
+    for report in candidates:
+        if report.status != 'completed' or (report.file_path and report.file_path.storage.exists(report.file_path.name)):
+            return report
+    return None
+
+
+def _start_report(report_key: str, normalized: Dict, digest: str, file_format: str,
+                  user) -> Tuple[GeneratedReport, bool]:
+    """
+    Create the pending report, or join the run that a concurrent identical
+    request created first (one in-flight run per hash is enforced by a
+    unique constraint)
+
+    Returns:
+        (GeneratedReport, created) tuple
+    """
+    fresh_since = timezone.now() - timedelta(minutes=get_cache_minutes())
+    for attempt in range(3):
+        try:
+            with transaction.atomic():
+                return GeneratedReport.objects.create(
+                    report_key=report_key,
+                    parameters_used=normalized,
+                    parameters_hash=digest,
+                    file_format=file_format,
+                    generated_by=user,
+                    created_by=user,
+                ), True
+        except IntegrityError:
+            if attempt == 2:
+                raise
+            in_flight = GeneratedReport.objects.filter(
+                report_key=report_key, parameters_hash=digest, status__in=IN_FLIGHT_STATUSES,
+            ).first()
+            if in_flight is None:
+                # Finished in the meantime
+                continue
+            if in_flight.generated_at >= fresh_since:
+                return in_flight, False
+            # A lost run older than the cache lifetime releases its slot
+            GeneratedReport.objects.filter(pk=in_flight.pk, status__in=IN_FLIGHT_STATUSES).update(
+                status='failed', error_message='انتهت مهلة إنشاء التقرير.',
+            )
+
+
+def request_report(report_key: str, params: Dict, file_format: str, user) -> Tuple[GeneratedReport, bool]:
+    """
+    Request a report file, reusing an identical in-flight or fresh report
+    طلب إنشاء تقرير مع إعادة استخدام النتائج المطابقة
+
+    Returns:
+        (GeneratedReport, reused) tuple
+
+    Raises:
+        ValueError: unknown report, unsupported format or invalid parameters
+    """
+    if report_key not in REPORTS:
+        raise ValueError(f"Unknown report: {report_key}")
+    if file_format not in FILE_EXTENSIONS:
+        raise ValueError(f"Unsupported file format: {file_format}")
+
+    normalized = REPORTS[report_key].normalize(params)
+    digest = parameters_hash(report_key, normalized, file_format)
+
+    with transaction.atomic():
+        report = find_reusable_report(digest)
+        if report is not None:
+            # Subscribers are notified when the file is ready and may download it
+            if user is not None:
+                report.subscribers.add(user)
+            return report, True
+
+        report, created = _start_report(report_key, normalized, digest, file_format, user)
+        if user is not None:
+            report.subscribers.add(user)
+        if not created:
+            return report, True
+
+        from .tasks import generate_report_task
+        transaction.on_commit(lambda: generate_report_task.delay(report.id))
+
+    return report, False
+
+
+def _write_csv(path: str, headers: List[str], rows: Iterable) -> int:
+    with open(path, 'w', encoding='utf-8', newline='') as fileobj:
+        return write_csv(fileobj, headers, rows)
+
+
+def _write_excel(path: str, headers: List[str], rows: Iterable) -> int:
+    with open(path, 'wb') as fileobj:
+        return write_excel(fileobj, headers, rows)
+
+
+WRITERS = {
+    'csv': _write_csv,
+    'excel': _write_excel,
+}
+
+
+def generate_report(report_id: int) -> GeneratedReport:
+    """
+    Build the file of a pending report and notify its subscribers
+    إنشاء ملف التقرير وإشعار المستخدمين
+    """
+    updated = GeneratedReport.objects.filter(id=report_id, status='pending').update(status='running')
+    report = GeneratedReport.objects.get(id=report_id)
+    if not updated:
+        return report
+
+    definition = REPORTS[report.report_key]
+    try:
+        extension = FILE_EXTENSIONS[report.file_format]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, f'report.{extension}')
+            # Report rows are read from the replica when one is configured
+            with replica_reads():
+                headers, rows = definition.build(definition.parse(report.parameters_used))
+                report.row_count = WRITERS[report.file_format](path, headers, rows)
+            with open(path, 'rb') as fileobj:
+                report.file_path.save(
+                    f'{report.report_key}_{report.parameters_hash[:12]}.{extension}',
+                    File(fileobj),
+                    save=False,
+                )
+        report.status = 'completed'
+        report.completed_at = timezone.now()
+        report.save(update_fields=['file_path', 'row_count', 'status', 'completed_at', 'updated_at'])
+        title, message, kind = (
+            f'التقرير جاهز: {definition.title}',
+            f'تم إنشاء التقرير ({report.row_count} سجل).',
+            'success',
+        )
+    except Exception as e:
+        logger.error(f"Error generating report {report_id}: {str(e)}")
+        report.status = 'failed'
+        report.error_message = str(e)
+        report.save(update_fields=['status', 'error_message', 'updated_at'])
+        title, message, kind = (
+            f'فشل إنشاء التقرير: {definition.title}',
+            'حدث خطأ أثناء إنشاء التقرير.',
+            'error',
+        )
+
+    link = reverse('reports:report_status', args=[report.id])
+    create_notifications(
+        {'user': user, 'title': title, 'message': message, 'notification_type': kind, 'link': link}
+        for user in report.subscribers.all()
+    )
+    return report
@@ -0,0 +1,291 @@
+"""
+Per-report query budget and timing instrumentation
+قياس أداء التقارير وحدود الاستعلامات
+
+Report views are wrapped with ``@instrument_report()``. Each invocation
+counts the queries run on every database connection and their time, and
+stores query count, database time, Python time and row count in
+``ReportExecutionStat``. Views report their row count with ``note_rows()``.
+
+A ``ReportBudget`` per report key sets a query and duration limit. Exceeding
+it logs a warning. With the ``refuse`` action, a report that has a
+background generator and whose p95 over its latest runs exceeds the budget
+is queued for background generation instead of being run in the request.
+One request every ``REFUSE_PROBE_SECONDS`` is still run directly, so the
+p95 follows the report once it gets faster.
+
+Statistics are pruned after ``REPORT_STATS_RETENTION_DAYS`` by a daily task.
+"""
+import functools
+import logging
+import math
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import JsonResponse
+from django.shortcuts import render
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BUDGET_CACHE_SECONDS = 60
+P95_CACHE_SECONDS = 300
+
+# Window and sample size of the p95 used for refusing synchronous runs
+P95_WINDOW_DAYS = 7
+P95_SAMPLE_SIZE = 20
+
+# A refused report is still run directly once per this many seconds
+REFUSE_PROBE_SECONDS = 600
+
+# Ids per statement, below SQL Server's 2100 parameter limit
+ID_BATCH_SIZE = 1000
+
+# Report keys that can be refused, with their background generator
+REFUSABLE_REPORTS: Dict[str, str] = {}
+
+
+class QueryCounter:
+    """
+    Database execute wrapper counting queries and their time
+    عداد الاستعلامات ووقت تنفيذها
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+def percentile(values: List[float], percent: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(math.ceil(percent / 100.0 * len(ordered))), 1)
+    return ordered[rank - 1]
+
+
+def note_rows(request, count: int) -> None:
+    """Record the number of rows a report view produced"""
+    request._report_row_count = count
+
+
+def get_budget(report_key: str) -> Dict:
+    """Budget of a report as a dictionary (empty when none is configured)"""
+    key = f'report_budget:{report_key}'
+    budget = cache.get(key)
+    if budget is None:
+        from .models import ReportBudget
+
+        budget = ReportBudget.objects.filter(report_key=report_key, is_active=True).values(
+            'max_queries', 'max_duration_ms', 'action'
+        ).first() or {}
+        cache.set(key, budget, BUDGET_CACHE_SECONDS)
+    return budget
+
+
+def _p95_key(report_key: str) -> str:
+    return f'report_p95:{report_key}'
+
+
+def recent_p95(report_key: str) -> Dict:
+    """p95 duration and query count of the latest runs of a report"""
+    key = _p95_key(report_key)
+    result = cache.get(key)
+    if result is None:
+        from .models import ReportExecutionStat
+
+        runs = list(ReportExecutionStat.objects.filter(
+            report_key=report_key,
+            started_at__gte=timezone.now() - timedelta(days=P95_WINDOW_DAYS),
+        ).order_by('-started_at').values_list('duration_ms', 'query_count')[:P95_SAMPLE_SIZE])
+        result = {
+            'duration_ms': percentile([run[0] for run in runs], 95),
+            'query_count': percentile([run[1] for run in runs], 95),
+        }
+        cache.set(key, result, P95_CACHE_SECONDS)
+    return result
+
+
+def _exceeds(budget: Dict, duration_ms, query_count) -> bool:
+    return bool(
+        (budget.get('max_duration_ms') and duration_ms is not None and duration_ms > budget['max_duration_ms']) or
+        (budget.get('max_queries') and query_count is not None and query_count > budget['max_queries'])
+    )
+
+
+def _request_params(request, definition) -> Dict:
+    """Generator parameters taken from the report's query string"""
+    return {name: request.GET.get(name) for name in definition.params if request.GET.get(name)}
+
+
+def _refuse(request, report_key: str, generator: str, get_params):
+    """Queue the report for background generation instead of running it"""
+    from .generation import REPORTS, request_report
+
+    message = 'هذا التقرير يتجاوز الحد المسموح للتشغيل المباشر'
+    report = None
+    try:
+        report, _ = request_report(generator, get_params(request, REPORTS[generator]), 'excel', request.user)
+        message += '، تم طلبه في الخلفية وسيصلك إشعار عند جاهزيته.'
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Could not queue refused report {report_key}: {str(e)}")
+        message += '، يرجى طلبه كتقرير في الخلفية.'
+
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest' or 'application/json' in request.headers.get('accept', ''):
+        data = {'success': False, 'error': message}
+        if report is not None:
+            data['report_id'] = report.id
+        return JsonResponse(data, status=503)
+    # Rendered, not redirected: the target could be another refused report
+    return render(request, 'reports/report_refused.html', {
+        'title': REPORTS[generator].title,
+        'message': message,
+        'report': report,
+    }, status=503)
+
+
+def _record(report_key: str, request, started_at, duration: float, counter: QueryCounter,
+            response, over_budget: bool) -> None:
+    from .models import ReportExecutionStat
+
+    duration_ms = int(duration * 1000)
+    db_time_ms = int(counter.seconds * 1000)
+    try:
+        ReportExecutionStat.objects.create(
+            report_key=report_key,
+            user=request.user if request.user.is_authenticated else None,
+            started_at=started_at,
+            duration_ms=duration_ms,
+            db_time_ms=db_time_ms,
+            python_time_ms=max(duration_ms - db_time_ms, 0),
+            query_count=counter.count,
+            row_count=getattr(request, '_report_row_count', None),
+            status_code=getattr(response, 'status_code', None),
+            over_budget=over_budget,
+        )
+    except Exception as e:
+        logger.error(f"Error recording report statistics for {report_key}: {str(e)}")
+
+
+def instrument_report(report_key: str = None, generator: str = None, generator_params=None):
+    """
+    Decorator recording timing and query statistics of a report view
+    مزخرف لتسجيل إحصائيات تنفيذ التقرير
+
+    Args:
+        report_key: Key for statistics and budgets; defaults to
+            '<app>.<view name>'
+        generator: Key of the background report (``generation.REPORTS``)
+            producing the same data; only such reports can be refused
+        generator_params: ``(request, definition) -> params`` for the
+            background report; defaults to the matching query parameters
+
+    Streamed responses are measured until the view returns, not until the
+    last chunk is sent.
+    """
+    def decorator(view):
+        key = report_key or f"{view.__module__.split('.')[0]}.{view.__name__}"
+        if generator:
+            REFUSABLE_REPORTS[key] = generator
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            budget = get_budget(key)
+            probing = False
+            if generator and budget.get('action') == 'refuse':
+                history = recent_p95(key)
+                if _exceeds(budget, history['duration_ms'], history['query_count']):
+                    if not cache.add(f'report_refuse_probe:{key}', 1, REFUSE_PROBE_SECONDS):
+                        logger.warning(f"Report {key} refused: recent p95 exceeds its budget")
+                        return _refuse(request, key, generator, generator_params or _request_params)
+                    probing = True
+
+            counter = QueryCounter()
+            started_at = timezone.now()
+            started = time.perf_counter()
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                response = view(request, *args, **kwargs)
+            duration = time.perf_counter() - started
+
+            over_budget = _exceeds(budget, int(duration * 1000), counter.count)
+            if over_budget:
+                logger.warning(
+                    f"Report {key} exceeded its budget: {counter.count} queries, "
+                    f"{int(duration * 1000)} ms"
+                )
+            _record(key, request, started_at, duration, counter, response, over_budget)
+            if probing:
+                # The next request sees the p95 including this run
+                cache.delete(_p95_key(key))
+            return response
+
+        wrapper.report_key = key
+        return wrapper
+    return decorator
+
+
+def slowest_reports(days: int = 7) -> List[Dict]:
+    """
+    Per-report latency and query statistics, slowest p95 first
+    التقارير الأبطأ حسب المئين 95
+    """
+    from .models import ReportExecutionStat
+
+    runs = {}
+    for report_key, duration_ms, query_count, over_budget in ReportExecutionStat.objects.filter(
+        started_at__gte=timezone.now() - timedelta(days=days),
+    ).values_list('report_key', 'duration_ms', 'query_count', 'over_budget').iterator(chunk_size=2000):
+        item = runs.setdefault(report_key, {'durations': [], 'queries': [], 'over_budget': 0})
+        item['durations'].append(duration_ms)
+        item['queries'].append(query_count)
+        item['over_budget'] += over_budget
+
+    rows = [
+        {
+            'report_key': report_key,
+            'runs': len(item['durations']),
+            'p50_ms': percentile(item['durations'], 50),
+            'p95_ms': percentile(item['durations'], 95),
+            'max_ms': max(item['durations']),
+            'p95_queries': percentile(item['queries'], 95),
+            'over_budget': item['over_budget'],
+        }
+        for report_key, item in runs.items()
+    ]
+    return sorted(rows, key=lambda row: -row['p95_ms'])
+
+
+def prune(days: int = None) -> int:
+    """
+    Delete execution statistics older than the retention period, in batches
+    حذف إحصائيات التنفيذ القديمة
+
+    Returns:
+        Number of rows deleted
+    """
+    from .models import ReportExecutionStat
+
+    days = days if days is not None else getattr(settings, 'REPORT_STATS_RETENTION_DAYS', 30)
+    old = ReportExecutionStat.objects.filter(started_at__lt=timezone.now() - timedelta(days=days))
+    deleted = 0
+    while True:
+        ids = list(old.values_list('id', flat=True)[:ID_BATCH_SIZE])
+        if not ids:
+            return deleted
+        deleted += ReportExecutionStat.objects.filter(id__in=ids).delete()[0]
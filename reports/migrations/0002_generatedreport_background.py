@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedreport',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='تاريخ الاكتمال'),
+        ),
+        migrations.AddField(
+            model_name='generatedreport',
+            name='error_message',
+            field=models.TextField(blank=True, null=True, verbose_name='رسالة الخطأ'),
+        ),
+        migrations.AddField(
+            model_name='generatedreport',
+            name='parameters_hash',
+            field=models.CharField(blank=True, max_length=64, null=True, verbose_name='بصمة المعاملات'),
+        ),
+        migrations.AddField(
+            model_name='generatedreport',
+            name='report_key',
+            field=models.CharField(blank=True, max_length=50, null=True, verbose_name='مفتاح التقرير'),
+        ),
+        migrations.AddField(
+            model_name='generatedreport',
+            name='row_count',
+            field=models.IntegerField(blank=True, null=True, verbose_name='عدد السجلات'),
+        ),
+        migrations.AddField(
+            model_name='generatedreport',
+            name='status',
+            field=models.CharField(choices=[('pending', 'قيد الانتظار'), ('running', 'قيد التنفيذ'), ('completed', 'مكتمل'), ('failed', 'فشل')], default='pending', max_length=20, verbose_name='الحالة'),
+        ),
+        migrations.AddField(
+            model_name='generatedreport',
+            name='subscribers',
+            field=models.ManyToManyField(blank=True, related_name='awaited_reports', to=settings.AUTH_USER_MODEL, verbose_name='المستخدمون المنتظرون'),
+        ),
+        migrations.AddIndex(
+            model_name='generatedreport',
+            index=models.Index(fields=['parameters_hash', 'status'], name='gen_report_hash_idx'),
+        ),
+    ]
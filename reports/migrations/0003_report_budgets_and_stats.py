@@ -0,0 +1,61 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_generatedreport_background'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportBudget',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الإنشاء')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')),
+                ('is_active', models.BooleanField(default=True, verbose_name='نشط')),
+                ('notes', models.TextField(blank=True, null=True, verbose_name='ملاحظات')),
+                ('report_key', models.CharField(max_length=100, unique=True, verbose_name='مفتاح التقرير')),
+                ('max_queries', models.PositiveIntegerField(blank=True, null=True, verbose_name='الحد الأقصى للاستعلامات')),
+                ('max_duration_ms', models.PositiveIntegerField(blank=True, null=True, verbose_name='الحد الأقصى للمدة (ملي ثانية)')),
+                ('action', models.CharField(choices=[('warn', 'تسجيل تحذير'), ('refuse', 'رفض التشغيل المباشر')], default='warn', max_length=10, verbose_name='الإجراء عند التجاوز')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='أنشئ بواسطة')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='حُدث بواسطة')),
+            ],
+            options={
+                'verbose_name': 'حدود تقرير',
+                'verbose_name_plural': 'حدود التقارير',
+                'db_table': 'Tbl_Report_Budgets',
+                'ordering': ['report_key'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReportExecutionStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_key', models.CharField(db_index=True, max_length=100, verbose_name='مفتاح التقرير')),
+                ('started_at', models.DateTimeField(verbose_name='وقت البدء')),
+                ('duration_ms', models.PositiveIntegerField(verbose_name='المدة (ملي ثانية)')),
+                ('db_time_ms', models.PositiveIntegerField(verbose_name='وقت قاعدة البيانات (ملي ثانية)')),
+                ('python_time_ms', models.PositiveIntegerField(verbose_name='وقت المعالجة (ملي ثانية)')),
+                ('query_count', models.PositiveIntegerField(verbose_name='عدد الاستعلامات')),
+                ('row_count', models.PositiveIntegerField(blank=True, null=True, verbose_name='عدد السجلات')),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='رمز الاستجابة')),
+                ('over_budget', models.BooleanField(default=False, verbose_name='تجاوز الحدود')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_executions', to=settings.AUTH_USER_MODEL, verbose_name='المستخدم')),
+            ],
+            options={
+                'verbose_name': 'إحصائية تنفيذ تقرير',
+                'verbose_name_plural': 'إحصائيات تنفيذ التقارير',
+                'db_table': 'Tbl_Report_Execution_Stats',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['report_key', 'started_at'], name='report_stat_key_time_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fail_duplicate_in_flight(apps, schema_editor):
+    # Keep the newest in-flight run per report and parameters
+    GeneratedReport = apps.get_model('reports', 'GeneratedReport')
+    seen = set()
+    duplicates = []
+    for pk, *key in GeneratedReport.objects.filter(
+        status__in=['pending', 'running'], parameters_hash__isnull=False,
+    ).order_by('-generated_at', '-pk').values_list('pk', 'report_key', 'parameters_hash'):
+        key = tuple(key)
+        if key in seen:
+            duplicates.append(pk)
+        seen.add(key)
+    for start in range(0, len(duplicates), 1000):
+        GeneratedReport.objects.filter(pk__in=duplicates[start:start + 1000]).update(status='failed')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_report_budgets_and_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_in_flight, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='generatedreport',
+            constraint=models.UniqueConstraint(condition=models.Q(('parameters_hash__isnull', False), ('status__in', ['pending', 'running'])), fields=('report_key', 'parameters_hash'), name='gen_report_one_in_flight'),
+        ),
+    ]
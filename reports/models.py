@@ -51,6 +51,19 @@ class ReportTemplate(BaseModel):
     
     def __str__(self):
         return self.name
+    
+    def clean(self):
+        """Validate the query with the report query engine"""
+        from django.core.exceptions import ValidationError
+        from .query_engine import QueryValidationError, compile_query, validate_query
+        
+        try:
+            _, names = compile_query(validate_query(self.query or ''))
+        except QueryValidationError as e:
+            raise ValidationError({'query': str(e)})
+        undeclared = sorted(set(names) - set(self.parameters or {}))
+        if undeclared:
+            raise ValidationError({'parameters': f"معاملات غير معرفة: {', '.join(undeclared)}"})
 
 
 class GeneratedReport(BaseModel):
@@ -95,11 +108,72 @@ class GeneratedReport(BaseModel):
         verbose_name='صيغة الملف'
     )
     
+    # Background generation
+    STATUS_CHOICES = [
+        ('pending', 'قيد الانتظار'),
+        ('running', 'قيد التنفيذ'),
+        ('completed', 'مكتمل'),
+        ('failed', 'فشل'),
+    ]
+    
+    report_key = models.CharField(
+        max_length=50,
+        blank=True,
+        null=True,
+        verbose_name='مفتاح التقرير'
+    )
+    parameters_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        null=True,
+        verbose_name='بصمة المعاملات'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name='الحالة'
+    )
+    completed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='تاريخ الاكتمال'
+    )
+    row_count = models.IntegerField(
+        null=True,
+        blank=True,
+        verbose_name='عدد السجلات'
+    )
+    error_message = models.TextField(
+        blank=True,
+        null=True,
+        verbose_name='رسالة الخطأ'
+    )
+    subscribers = models.ManyToManyField(
+        'core.User',
+        blank=True,
+        related_name='awaited_reports',
+        verbose_name='المستخدمون المنتظرون'
+    )
+    
     class Meta:
         db_table = 'Tbl_Generated_Reports'
         verbose_name = 'تقرير منشأ'
         verbose_name_plural = 'التقارير المنشأة'
         ordering = ['-generated_at']
+        indexes = [
+            models.Index(fields=['parameters_hash', 'status'], name='gen_report_hash_idx'),
+        ]
+        constraints = [
+            # At most one in-flight run per report and parameters
+            models.UniqueConstraint(
+                fields=['report_key', 'parameters_hash'],
+                # Legacy rows without a hash are left out (SQL Server
+                # unique indexes treat NULLs as equal)
+                condition=models.Q(status__in=['pending', 'running'], parameters_hash__isnull=False),
+                name='gen_report_one_in_flight',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.template.name if self.template else 'Unknown'} - {self.generated_at}"
@@ -142,3 +216,118 @@ class Dashboard(BaseModel):
     def __str__(self):
         return self.name
 
+
+
+class ReportBudget(BaseModel):
+    """
+    Query and time budget of a report endpoint
+    حدود الاستعلامات والوقت للتقارير
+    """
+    ACTION_CHOICES = [
+        ('warn', 'تسجيل تحذير'),
+        ('refuse', 'رفض التشغيل المباشر'),
+    ]
+    
+    report_key = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name='مفتاح التقرير'
+    )
+    max_queries = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='الحد الأقصى للاستعلامات'
+    )
+    max_duration_ms = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='الحد الأقصى للمدة (ملي ثانية)'
+    )
+    action = models.CharField(
+        max_length=10,
+        choices=ACTION_CHOICES,
+        default='warn',
+        verbose_name='الإجراء عند التجاوز'
+    )
+    
+    class Meta:
+        db_table = 'Tbl_Report_Budgets'
+        verbose_name = 'حدود تقرير'
+        verbose_name_plural = 'حدود التقارير'
+        ordering = ['report_key']
+    
+    def __str__(self):
+        return self.report_key
+
+    def clean(self):
+        """Only reports with a background generator can be refused"""
+        from django.core.exceptions import ValidationError
+        from . import views  # noqa: F401 (registers the instrumented report views)
+        from .instrumentation import REFUSABLE_REPORTS
+
+        if self.action == 'refuse' and self.report_key not in REFUSABLE_REPORTS:
+            raise ValidationError({
+                'action': f"لا يوجد تقرير في الخلفية للتقرير {self.report_key}، "
+                          f"التقارير التي يمكن رفضها: {', '.join(sorted(REFUSABLE_REPORTS))}"
+            })
+
+
+class ReportExecutionStat(models.Model):
+    """
+    Timing and query statistics of one report execution
+    إحصائيات تنفيذ التقارير
+    """
+    report_key = models.CharField(
+        max_length=100,
+        db_index=True,
+        verbose_name='مفتاح التقرير'
+    )
+    user = models.ForeignKey(
+        'core.User',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='report_executions',
+        verbose_name='المستخدم'
+    )
+    started_at = models.DateTimeField(
+        verbose_name='وقت البدء'
+    )
+    duration_ms = models.PositiveIntegerField(
+        verbose_name='المدة (ملي ثانية)'
+    )
+    db_time_ms = models.PositiveIntegerField(
+        verbose_name='وقت قاعدة البيانات (ملي ثانية)'
+    )
+    python_time_ms = models.PositiveIntegerField(
+        verbose_name='وقت المعالجة (ملي ثانية)'
+    )
+    query_count = models.PositiveIntegerField(
+        verbose_name='عدد الاستعلامات'
+    )
+    row_count = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='عدد السجلات'
+    )
+    status_code = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='رمز الاستجابة'
+    )
+    over_budget = models.BooleanField(
+        default=False,
+        verbose_name='تجاوز الحدود'
+    )
+    
+    class Meta:
+        db_table = 'Tbl_Report_Execution_Stats'
+        verbose_name = 'إحصائية تنفيذ تقرير'
+        verbose_name_plural = 'إحصائيات تنفيذ التقارير'
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['report_key', 'started_at'], name='report_stat_key_time_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.report_key} ({self.duration_ms} ms)"
@@ -0,0 +1,331 @@
+"""
+Safe execution engine for report template queries
+محرك تنفيذ استعلامات قوالب التقارير بشكل آمن
+
+``ReportTemplate.query`` holds a single read-only ``SELECT`` (or ``WITH``)
+statement with named placeholders such as ``:start_date``. The parameters a
+template accepts are declared in ``ReportTemplate.parameters``::
+
+    {"start_date": {"type": "date", "required": true},
+     "department": {"type": "int"}}
+
+Before running, the statement is validated (single statement, read-only
+keywords only, no sensitive tables), placeholders are bound as driver
+parameters (never interpolated), and execution runs inside a transaction
+that is always rolled back, under a per-backend statement timeout and a row
+limit. Results are fetched in chunks from ``chunked_cursor()`` (a server-side
+cursor where supported) and small results are cached per template version
+and parameter set.
+"""
+import hashlib
+import json
+import re
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterator, List, Tuple
+
+from django.core.cache import cache
+from django.db import DatabaseError, connections, router, transaction
+
+DEFAULT_MAX_ROWS = 10000
+DEFAULT_TIMEOUT_SECONDS = 30
+DEFAULT_CACHE_SECONDS = 300
+FETCH_SIZE = 2000
+
+FORBIDDEN_KEYWORDS = {
+    'alter', 'attach', 'backup', 'bulk', 'call', 'create', 'dbcc', 'declare',
+    'delete', 'deny', 'detach', 'drop', 'exec', 'execute', 'grant', 'insert',
+    'into', 'kill', 'load', 'lock', 'merge', 'opendatasource', 'openquery',
+    'openrowset', 'pragma', 'reindex', 'restore', 'revoke', 'set',
+    'shutdown', 'truncate', 'update', 'use', 'vacuum', 'waitfor',
+}
+
+# Tables and columns never exposed to report templates
+SENSITIVE_IDENTIFIERS = {
+    'password', 'django_session', 'session_data', 'tbl_users', 'authtoken_token',
+}
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_COMMENT = re.compile(r'--[^\n]*|/\*.*?\*/', re.S)
+_WORD = re.compile(r'[A-Za-z_][A-Za-z0-9_$#]*')
+_PLACEHOLDER = re.compile(r"'(?:[^']|'')*'|(?<![:\w]):([A-Za-z_]\w*)")
+
+
+class QueryValidationError(ValueError):
+    """Raised when a template query or its parameters are not acceptable"""
+    pass
+
+
+class QueryExecutionError(Exception):
+    """Raised when a template query fails or exceeds its time budget"""
+    pass
+
+
+def validate_query(sql: str) -> str:
+    """
+    Validate a template query and return it without trailing semicolon
+    التحقق من أن الاستعلام للقراءة فقط
+
+    Raises:
+        QueryValidationError: if the statement is not a single read-only
+            SELECT or references sensitive identifiers
+    """
+    if '--' in sql or '/*' in sql:
+        sql = _COMMENT.sub(' ', sql)
+    sql = sql.strip().rstrip(';').strip()
+    if not sql:
+        raise QueryValidationError('الاستعلام فارغ.')
+
+    code = _STRING_LITERAL.sub("''", sql)
+    if ';' in code:
+        raise QueryValidationError('يسمح بعبارة استعلام واحدة فقط.')
+
+    words = [word.lower() for word in _WORD.findall(code)]
+    if not words or words[0] not in ('select', 'with'):
+        raise QueryValidationError('يجب أن يبدأ الاستعلام بـ SELECT أو WITH.')
+
+    forbidden = sorted(set(words) & FORBIDDEN_KEYWORDS)
+    if forbidden:
+        raise QueryValidationError(f"كلمات غير مسموح بها في الاستعلام: {', '.join(forbidden)}")
+
+    sensitive = sorted(
+        word for word in set(words)
+        if word in SENSITIVE_IDENTIFIERS or word.startswith(('xp_', 'sp_'))
+    )
+    if sensitive:
+        raise QueryValidationError(f"لا يسمح بالوصول إلى: {', '.join(sensitive)}")
+    return sql
+
+
+def compile_query(sql: str) -> Tuple[str, List[str]]:
+    """
+    Replace ``:name`` placeholders with driver placeholders
+    تحويل المعاملات المسماة إلى معاملات قاعدة البيانات
+
+    Literal percent signs are escaped for the driver; placeholders inside
+    string literals are left alone.
+
+    Returns:
+        (sql with %s placeholders, ordered parameter names)
+    """
+    names = []
+    parts = []
+    position = 0
+    for match in _PLACEHOLDER.finditer(sql):
+        parts.append(sql[position:match.start()].replace('%', '%%'))
+        if match.group(1) is None:
+            parts.append(match.group(0).replace('%', '%%'))
+        else:
+            names.append(match.group(1))
+            parts.append('%s')
+        position = match.end()
+    parts.append(sql[position:].replace('%', '%%'))
+    return ''.join(parts), names
+
+
+_COERCERS = {
+    'str': str,
+    'int': int,
+    'decimal': lambda value: Decimal(str(value)),
+    'bool': lambda value: value if isinstance(value, bool) else str(value).lower() in ('1', 'true', 'yes'),
+    'date': lambda value: value if isinstance(value, date) else date.fromisoformat(str(value)),
+}
+
+
+def bind_parameters(schema: Dict, values: Dict) -> Dict:
+    """
+    Validate and convert user supplied values against the template schema
+    التحقق من قيم المعاملات وتحويلها
+    """
+    unknown = set(values) - set(schema)
+    if unknown:
+        raise QueryValidationError(f"معاملات غير معروفة: {', '.join(sorted(unknown))}")
+
+    bound = {}
+    for name, spec in schema.items():
+        spec = spec or {}
+        value = values.get(name, spec.get('default'))
+        if value in (None, ''):
+            if spec.get('required'):
+                raise QueryValidationError(f'المعامل مطلوب: {name}')
+            bound[name] = None
+            continue
+        kind = spec.get('type', 'str')
+        if kind not in _COERCERS:
+            raise QueryValidationError(f'نوع معامل غير مدعوم: {kind}')
+        try:
+            bound[name] = _COERCERS[kind](value)
+        except (TypeError, ValueError, ArithmeticError):
+            raise QueryValidationError(f'قيمة غير صالحة للمعامل: {name}')
+    return bound
+
+
+@contextmanager
+def _statement_timeout(connection, cursor, seconds: int):
+    """Abort the running statement after ``seconds`` (per backend)"""
+    vendor = connection.vendor
+    if vendor == 'postgresql':
+        cursor.execute('SET LOCAL statement_timeout = %s', [int(seconds * 1000)])
+        yield
+    elif vendor == 'mysql':
+        cursor.execute('SET SESSION max_execution_time = %s', [int(seconds * 1000)])
+        try:
+            yield
+        finally:
+            cursor.execute('SET SESSION max_execution_time = 0')
+    elif vendor == 'sqlite':
+        deadline = time.monotonic() + seconds
+        raw = connection.connection
+        raw.set_progress_handler(lambda: int(time.monotonic() > deadline), 10000)
+        try:
+            yield
+        finally:
+            raw.set_progress_handler(None, 0)
+    elif vendor == 'microsoft':
+        # pyodbc query timeout, in seconds
+        raw = connection.connection
+        previous = raw.timeout
+        raw.timeout = int(seconds)
+        try:
+            yield
+        finally:
+            raw.timeout = previous
+    else:
+        yield
+
+
+@contextmanager
+def _read_only(connection, cursor):
+    """Best-effort database level read-only mode on top of validation"""
+    if connection.vendor == 'postgresql':
+        cursor.execute('SET TRANSACTION READ ONLY')
+        yield
+    elif connection.vendor == 'sqlite':
+        cursor.execute('PRAGMA query_only = ON')
+        try:
+            yield
+        finally:
+            cursor.execute('PRAGMA query_only = OFF')
+    else:
+        yield
+
+
+def iter_template_rows(template, values: Dict = None, max_rows: int = DEFAULT_MAX_ROWS,
+                       timeout: int = DEFAULT_TIMEOUT_SECONDS,
+                       using: str = None) -> Tuple[List[str], Iterator[tuple]]:
+    """
+    Execute a template and stream its rows
+    تنفيذ قالب التقرير وإرجاع السجلات تدريجياً
+
+    The generator holds a read-only transaction open until exhausted or
+    closed (the transaction is always rolled back), so consume it before
+    running other queries on the same connection. Without ``using`` the
+    query runs where the router sends reads, i.e. on the replica inside
+    ``replica_reads()``.
+
+    Returns:
+        (column names, rows iterator limited to ``max_rows``)
+
+    Raises:
+        QueryValidationError: invalid query or parameters
+        QueryExecutionError: database error or timeout
+    """
+    sql, names = compile_query(validate_query(template.query))
+    bound = bind_parameters(template.parameters or {}, values or {})
+    missing = sorted(set(names) - set(bound))
+    if missing:
+        raise QueryValidationError(f"معاملات غير معرفة في القالب: {', '.join(missing)}")
+    params = [bound[name] for name in names]
+    if using is None:
+        using = router.db_for_read(type(template))
+
+    # Cleanup runs in reverse: guards, cursor, rollback flag, transaction
+    connection = connections[using]
+    stack = ExitStack()
+    try:
+        stack.enter_context(transaction.atomic(using=using))
+        stack.callback(transaction.set_rollback, True, using=using)
+        cursor = connection.chunked_cursor()
+        stack.callback(cursor.close)
+        stack.enter_context(_read_only(connection, cursor))
+        stack.enter_context(_statement_timeout(connection, cursor, timeout))
+        cursor.execute(sql, params)
+    except DatabaseError as e:
+        stack.close()
+        raise QueryExecutionError(str(e))
+    except BaseException:
+        stack.close()
+        raise
+
+    columns = [column[0] for column in cursor.description or []]
+
+    def rows():
+        produced = 0
+        try:
+            while produced < max_rows:
+                chunk = cursor.fetchmany(min(FETCH_SIZE, max_rows - produced))
+                if not chunk:
+                    break
+                for row in chunk:
+                    yield tuple(row)
+                produced += len(chunk)
+        except DatabaseError as e:
+            raise QueryExecutionError(str(e))
+        finally:
+            stack.close()
+
+    return columns, rows()
+
+
+def _json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (bytes, memoryview)):
+        return None
+    return value
+
+
+def result_cache_key(template, values: Dict, max_rows: int) -> str:
+    """Cache key from template version and parameters"""
+    payload = json.dumps(
+        {'params': values or {}, 'max_rows': max_rows},
+        sort_keys=True, default=str, separators=(',', ':'),
+    )
+    version = template.updated_at.isoformat() if template.updated_at else ''
+    digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    return f'report_template:{template.pk}:{version}:{digest}'
+
+
+def run_template(template, values: Dict = None, max_rows: int = DEFAULT_MAX_ROWS,
+                 timeout: int = DEFAULT_TIMEOUT_SECONDS,
+                 cache_seconds: int = DEFAULT_CACHE_SECONDS) -> Dict:
+    """
+    Execute a template and return a JSON-safe result, using the cache
+    تنفيذ قالب التقرير مع التخزين المؤقت للنتائج
+
+    Returns:
+        Dictionary with columns, rows, row_count, truncated and cached
+    """
+    key = result_cache_key(template, values, max_rows)
+    if cache_seconds:
+        cached = cache.get(key)
+        if cached is not None:
+            return {**cached, 'cached': True}
+
+    # Fetch one extra row to detect truncation
+    columns, rows = iter_template_rows(template, values, max_rows + 1, timeout)
+    data = [[_json_value(value) for value in row] for row in rows]
+    truncated = len(data) > max_rows
+    result = {
+        'columns': columns,
+        'rows': data[:max_rows],
+        'row_count': min(len(data), max_rows),
+        'truncated': truncated,
+    }
+    if cache_seconds:
+        cache.set(key, result, cache_seconds)
+    return {**result, 'cached': False}
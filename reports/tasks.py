@@ -0,0 +1,52 @@
+"""
+Celery tasks for reports app
+مهام Celery لتطبيق التقارير
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='reports.generate_report')
+def generate_report_task(report_id):
+    """
+    Celery task to build a requested report file
+    مهمة Celery لإنشاء ملف تقرير مطلوب
+
+    Args:
+        report_id: GeneratedReport ID
+
+    Returns:
+        Final report status
+    """
+    from reports.generation import generate_report
+
+    logger.info(f"Generating report {report_id}")
+    report = generate_report(report_id)
+    logger.info(f"Report {report_id} finished with status {report.status}")
+
+    return report.status
+
+
+@shared_task(name='reports.prune_execution_stats')
+def prune_execution_stats_task(days=None):
+    """
+    Celery task to delete report execution statistics past their retention
+    مهمة Celery لحذف إحصائيات تنفيذ التقارير القديمة
+
+    Args:
+        days: Days to keep (default: REPORT_STATS_RETENTION_DAYS)
+
+    Returns:
+        Number of rows deleted
+    """
+    from reports.instrumentation import prune
+
+    try:
+        deleted = prune(days)
+        logger.info(f"Pruned {deleted} report execution statistics")
+        return deleted
+    except Exception as e:
+        logger.error(f"Error pruning report execution statistics: {str(e)}")
+        raise
@@ -23,5 +23,17 @@ urlpatterns = [
 
     # Payroll Reports
     path('payroll-summary/', views.payroll_summary_report, name='payroll_summary_report'),
+
+    # Background Reports
+    path('generate/', views.report_request, name='report_request'),
+    path('generated/<int:pk>/', views.report_status, name='report_status'),
+    path('generated/<int:pk>/download/', views.report_download, name='report_download'),
+
+    # Custom Dashboards
+    path('dashboards/<int:pk>/', views.dashboard_detail, name='dashboard_detail'),
+    path('dashboards/<int:pk>/data/', views.dashboard_data, name='dashboard_data'),
+
+    # Report Templates
+    path('templates/<int:pk>/run/', views.report_template_run, name='report_template_run'),
 ]
 
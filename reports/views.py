@@ -2,20 +2,51 @@
 Views for reports app
 عرض تطبيق التقارير
 """
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Count, Sum, Avg, Q
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import FileResponse, JsonResponse
+from django.urls import reverse
+from django.db.models import Count, Sum, Avg, Q, F, Exists, FilteredRelation, OuterRef
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from datetime import timedelta
+import json
+import os
 from employees.models import Employee
 from attendance.models import Attendance, LeaveRequest
-from payroll.models import Payroll, Payslip
+from attendance.summary import employee_totals
+from payroll.models import Payroll
 from organization.models import Department
+from core.db_router import use_replica
+from .exports import EXPORT_FORMATS, choice_label, export_response, queryset_rows
+from .instrumentation import instrument_report, note_rows
+from .models import GeneratedReport
 from .forms import ReportFilterForm, EmployeeReportFilterForm
 
+# Row limit for streamed report template exports
+TEMPLATE_EXPORT_MAX_ROWS = 1000000
+
+
+def _requested_export(request, form):
+    """
+    Export format requested through the report filter form, if any
+    صيغة التصدير المطلوبة من نموذج التصفية
+    """
+    if not request.GET.get('export') or not form.is_valid():
+        return None
+    export_format = form.cleaned_data.get('export_format') or 'excel'
+    if export_format not in EXPORT_FORMATS:
+        messages.error(request, 'صيغة التصدير غير مدعومة، يرجى اختيار Excel أو CSV.')
+        return None
+    return export_format
+
 
 @login_required
+@instrument_report()
+@use_replica
 def reports_dashboard(request):
     """
     Reports dashboard view
@@ -29,6 +60,8 @@ def reports_dashboard(request):
 
 
 @login_required
+@instrument_report()
+@use_replica
 def employee_summary_report(request):
     """
     Employee summary report view
@@ -61,6 +94,8 @@ def employee_summary_report(request):
     by_department = employees.values('department__name_ar').annotate(count=Count('id'))
     by_employment_type = employees.values('employment_type').annotate(count=Count('id'))
     
+    note_rows(request, total_employees)
+    
     context = {
         'form': form,
         'employees': employees,
@@ -72,7 +107,18 @@ def employee_summary_report(request):
     return render(request, 'reports/employee_summary_report.html', context)
 
 
+def _attendance_summary_params(request, definition):
+    """Background report parameters, with the view's current-month default"""
+    today = timezone.now().date()
+    params = {name: request.GET.get(name) for name in definition.params if request.GET.get(name)}
+    params.setdefault('start_date', today.replace(day=1))
+    params.setdefault('end_date', today)
+    return params
+
+
 @login_required
+@instrument_report(generator='attendance_summary', generator_params=_attendance_summary_params)
+@use_replica
 def attendance_summary_report(request):
     """
     Attendance summary report view
@@ -91,27 +137,72 @@ def attendance_summary_report(request):
     else:
         form = ReportFilterForm(initial={'start_date': start_date, 'end_date': end_date})
     
-    # Get attendance data
-    attendances = Attendance.objects.filter(
-        date__gte=start_date,
-        date__lte=end_date
-    )
+    employees = None
+    if form.is_valid():
+        department = form.cleaned_data.get('department')
+        branch = form.cleaned_data.get('branch')
+        if department or branch:
+            employees = Employee.objects.all()
+            if department:
+                employees = employees.filter(department=department)
+            if branch:
+                employees = employees.filter(branch=branch)
+    
+    # Export the detailed attendance records of the range
+    export_format = _requested_export(request, form)
+    if export_format:
+        attendances = Attendance.objects.filter(date__gte=start_date, date__lte=end_date)
+        if employees is not None:
+            attendances = attendances.filter(employee__in=employees)
+        headers, rows = queryset_rows(attendances.order_by('employee__emp_code', 'date'), [
+            ('employee__emp_code', 'رقم الموظف'),
+            ('employee__full_name_ar', 'الموظف'),
+            ('employee__department__dept_name_ar', 'القسم'),
+            ('date', 'التاريخ'),
+            ('status', 'الحالة', choice_label(Attendance.STATUS_CHOICES)),
+            ('check_in', 'وقت الحضور'),
+            ('check_out', 'وقت الانصراف'),
+            ('work_hours', 'ساعات العمل'),
+            ('late_minutes', 'دقائق التأخير'),
+            ('overtime_hours', 'ساعات العمل الإضافي'),
+        ])
+        return export_response(export_format, f'attendance_{start_date}_{end_date}', headers, rows)
+    
+    # Whole months come from the monthly summary table
+    totals = employee_totals(start_date, end_date, employees)
     
     # Statistics
-    total_records = attendances.count()
-    present_count = attendances.filter(status__in=['present', 'late']).count()
-    late_count = attendances.filter(status='late').count()
-    absent_count = attendances.filter(status='absent').count()
-    
-    # By employee
-    by_employee = attendances.values(
-        'employee__full_name_ar'
-    ).annotate(
-        total=Count('id'),
-        present=Count('id', filter=Q(status__in=['present', 'late'])),
-        late=Count('id', filter=Q(status='late')),
-        absent=Count('id', filter=Q(status='absent'))
-    )
+    total_records = sum(row['total_days'] for row in totals.values())
+    late_count = sum(row['late_days'] for row in totals.values())
+    present_count = sum(row['present_days'] for row in totals.values()) + late_count
+    absent_count = sum(row['absent_days'] for row in totals.values())
+    
+    # By employee, one page at a time; names are loaded for that page only
+    paginator = Paginator(sorted(totals), 50)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    names = {
+        employee_id: (emp_code, full_name_ar)
+        for employee_id, emp_code, full_name_ar in Employee.objects.filter(
+            id__in=list(page_obj.object_list)
+        ).values_list('id', 'emp_code', 'full_name_ar')
+    }
+    by_employee = [
+        {
+            'employee__emp_code': names.get(employee_id, ('', ''))[0],
+            'employee__full_name_ar': names.get(employee_id, ('', ''))[1],
+            'total': totals[employee_id]['total_days'],
+            'present': totals[employee_id]['present_days'] + totals[employee_id]['late_days'],
+            'late': totals[employee_id]['late_days'],
+            'absent': totals[employee_id]['absent_days'],
+        }
+        for employee_id in page_obj.object_list
+    ]
+    
+    # Keep the filters on pagination links
+    params = request.GET.copy()
+    params.pop('page', None)
+    
+    note_rows(request, paginator.count)
     
     context = {
         'form': form,
@@ -122,12 +213,16 @@ def attendance_summary_report(request):
         'late_count': late_count,
         'absent_count': absent_count,
         'by_employee': by_employee,
+        'page_obj': page_obj,
+        'filter_query': params.urlencode(),
     }
     
     return render(request, 'reports/attendance_summary_report.html', context)
 
 
 @login_required
+@instrument_report()
+@use_replica
 def attendance_monthly_report(request):
     """
     Monthly attendance report view
@@ -136,13 +231,15 @@ def attendance_monthly_report(request):
     # Default to current month
     today = timezone.now().date()
     start_date = today.replace(day=1)
+    department = None
+    branch = None
     
-    if request.method == 'GET':
-        form = ReportFilterForm(request.GET)
-        if form.is_valid():
-            start_date = form.cleaned_data.get('start_date', start_date)
-    else:
-        form = ReportFilterForm(initial={'start_date': start_date})
+    form = ReportFilterForm(request.GET or None, initial={'start_date': start_date})
+    form.fields['end_date'].required = False
+    if form.is_valid():
+        start_date = form.cleaned_data.get('start_date', start_date).replace(day=1)
+        department = form.cleaned_data.get('department')
+        branch = form.cleaned_data.get('branch')
     
     # Calculate end date (last day of month)
     if start_date.month == 12:
@@ -150,41 +247,73 @@ def attendance_monthly_report(request):
     else:
         end_date = start_date.replace(month=start_date.month + 1, day=1) - timedelta(days=1)
     
-    # Get attendance data
-    attendances = Attendance.objects.filter(
-        date__gte=start_date,
-        date__lte=end_date
-    ).select_related('employee')
-    
-    # Group by employee
+    # Counts come from the monthly summary row of each employee
     employees = Employee.objects.filter(is_active=True)
-    employee_data = []
-    
-    for employee in employees:
-        emp_attendances = attendances.filter(employee=employee)
-        employee_data.append({
-            'employee': employee,
-            'total_days': emp_attendances.count(),
-            'present': emp_attendances.filter(status__in=['present', 'late']).count(),
-            'late': emp_attendances.filter(status='late').count(),
-            'absent': emp_attendances.filter(status='absent').count(),
-        })
+    if department:
+        employees = employees.filter(department=department)
+    if branch:
+        employees = employees.filter(branch=branch)
+    
+    employee_data = employees.select_related('department', 'branch').annotate(
+        month_summary=FilteredRelation(
+            'attendance_summaries',
+            condition=Q(attendance_summaries__year=start_date.year, attendance_summaries__month=start_date.month),
+        ),
+    ).annotate(
+        total_days=Coalesce('month_summary__total_days', 0),
+        present=Coalesce(F('month_summary__present_days') + F('month_summary__late_days'), 0),
+        late=Coalesce('month_summary__late_days', 0),
+        absent=Coalesce('month_summary__absent_days', 0),
+    ).order_by('emp_code')
+    
+    export_format = _requested_export(request, form)
+    if export_format:
+        headers, rows = queryset_rows(employee_data, [
+            ('emp_code', 'رقم الموظف'),
+            ('full_name_ar', 'الموظف'),
+            ('department__dept_name_ar', 'القسم'),
+            ('branch__branch_name_ar', 'الفرع'),
+            ('total_days', 'أيام التسجيل'),
+            ('present', 'حاضر'),
+            ('late', 'متأخر'),
+            ('absent', 'غائب'),
+        ])
+        return export_response(export_format, f'attendance_{start_date:%Y_%m}', headers, rows)
+    
+    # Pagination
+    paginator = Paginator(employee_data, 50)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    
+    # Keep the filters on pagination links
+    params = request.GET.copy()
+    params.pop('page', None)
+    
+    note_rows(request, paginator.count)
     
     context = {
         'form': form,
         'start_date': start_date,
         'end_date': end_date,
-        'employee_data': employee_data,
+        'page_obj': page_obj,
+        'employee_data': page_obj,
+        'filter_query': params.urlencode(),
     }
     
     return render(request, 'reports/attendance_monthly_report.html', context)
 
 
 @login_required
+@instrument_report()
+@use_replica
 def leave_summary_report(request):
     """
     Leave summary report view
     عرض تقرير ملخص الإجازات
+
+    Counts and days per employee and leave type come from one grouped query
+    with conditional aggregates; the totals and per-type figures are summed
+    from its rows.
     """
     # Default to current year
     today = timezone.now().date()
@@ -199,28 +328,66 @@ def leave_summary_report(request):
     else:
         form = ReportFilterForm(initial={'start_date': start_date, 'end_date': end_date})
     
-    # Get leave data
+    # Leaves overlapping the period
     leaves = LeaveRequest.objects.filter(
-        start_date__gte=start_date,
-        end_date__lte=end_date
+        start_date__lte=end_date,
+        end_date__gte=start_date
     )
+    if form.is_valid():
+        if form.cleaned_data.get('department'):
+            leaves = leaves.filter(employee__department=form.cleaned_data['department'])
+        if form.cleaned_data.get('branch'):
+            leaves = leaves.filter(employee__branch=form.cleaned_data['branch'])
+    
+    rows = list(leaves.values(
+        'employee_id', 'employee__emp_code', 'employee__full_name_ar',
+        'employee__department__dept_name_ar', 'leave_type',
+    ).annotate(
+        total=Count('id'),
+        approved=Count('id', filter=Q(status='approved')),
+        pending=Count('id', filter=Q(status='pending')),
+        rejected=Count('id', filter=Q(status='rejected')),
+        approved_days=Coalesce(Sum('days_count', filter=Q(status='approved')), 0),
+    ).order_by('employee__emp_code', 'leave_type'))
+    
+    leave_types = dict(LeaveRequest.LEAVE_TYPES)
+    for row in rows:
+        row['leave_type_display'] = leave_types.get(row['leave_type'], row['leave_type'])
+    
+    export_format = _requested_export(request, form)
+    if export_format:
+        headers = ['رقم الموظف', 'الموظف', 'القسم', 'نوع الإجازة', 'عدد الطلبات',
+                   'موافق عليها', 'قيد الانتظار', 'مرفوضة', 'أيام الإجازة المعتمدة']
+        export_rows = (
+            (
+                row['employee__emp_code'], row['employee__full_name_ar'],
+                row['employee__department__dept_name_ar'], row['leave_type_display'],
+                row['total'], row['approved'], row['pending'], row['rejected'],
+                row['approved_days'],
+            )
+            for row in rows
+        )
+        return export_response(export_format, f'leaves_{start_date}_{end_date}', headers, export_rows)
     
     # Statistics
-    total_requests = leaves.count()
-    approved = leaves.filter(status='approved').count()
-    pending = leaves.filter(status='pending').count()
-    rejected = leaves.filter(status='rejected').count()
+    total_requests = sum(row['total'] for row in rows)
+    approved = sum(row['approved'] for row in rows)
+    pending = sum(row['pending'] for row in rows)
+    rejected = sum(row['rejected'] for row in rows)
     
     # By leave type
-    by_type = leaves.values('leave_type').annotate(count=Count('id'))
+    by_type = {}
+    for row in rows:
+        item = by_type.setdefault(row['leave_type'], {
+            'leave_type': row['leave_type'],
+            'leave_type_display': row['leave_type_display'],
+            'count': 0,
+            'approved_days': 0,
+        })
+        item['count'] += row['total']
+        item['approved_days'] += row['approved_days']
     
-    # By employee
-    by_employee = leaves.values(
-        'employee__full_name_ar'
-    ).annotate(
-        total=Count('id'),
-        total_days=Sum('days')
-    )
+    note_rows(request, len(rows))
     
     context = {
         'form': form,
@@ -230,40 +397,259 @@ def leave_summary_report(request):
         'approved': approved,
         'pending': pending,
         'rejected': rejected,
-        'by_type': by_type,
-        'by_employee': by_employee,
+        'by_type': sorted(by_type.values(), key=lambda item: -item['count']),
+        'by_employee': rows,
     }
     
     return render(request, 'reports/leave_summary_report.html', context)
 
 
+def _payroll_summary_params(request, definition):
+    """Background report parameters, defaulting to the current month"""
+    today = timezone.now().date()
+    params = {name: request.GET.get(name) for name in definition.params if request.GET.get(name)}
+    params.setdefault('month', today.month)
+    params.setdefault('year', today.year)
+    return params
+
+
 @login_required
+@instrument_report(generator='payroll_summary', generator_params=_payroll_summary_params)
+@use_replica
 def payroll_summary_report(request):
     """
     Payroll summary report view
     عرض تقرير ملخص الرواتب
+
+    Closed months come from their period-close snapshots; only months not
+    closed yet are aggregated from live payrolls, in one grouped query.
     """
-    payrolls = Payroll.objects.all().order_by('-year', '-month')
-    
-    # Filter by year
+    from payroll.models import PayrollPeriodSnapshot
+    from payroll.snapshots import period_totals
+
+    start, end = (1, 1), (9999, 12)
     year = request.GET.get('year')
     if year:
-        payrolls = payrolls.filter(year=year)
-    
-    # Get payslip statistics
-    payroll_data = []
-    for payroll in payrolls:
-        payslips = Payslip.objects.filter(payroll=payroll)
-        payroll_data.append({
-            'payroll': payroll,
-            'total_employees': payslips.count(),
-            'total_basic_salary': payslips.aggregate(Sum('basic_salary'))['basic_salary__sum'] or 0,
-            'total_net_salary': payslips.aggregate(Sum('net_salary'))['net_salary__sum'] or 0,
-        })
-    
+        try:
+            year = int(year)
+            start, end = (year, 1), (year, 12)
+        except ValueError:
+            messages.error(request, 'السنة غير صالحة.')
+            year = None
+
+    totals = {
+        period: dict(values, closed=True)
+        for period, values in period_totals(start, end).items()
+    }
+
+    live = Payroll.objects.annotate(
+        closed=Exists(PayrollPeriodSnapshot.objects.filter(year=OuterRef('year'), month=OuterRef('month')))
+    ).filter(closed=False)
+    if year:
+        live = live.filter(year=year)
+    for row in live.values('year', 'month').annotate(
+        headcount=Count('id'),
+        gross=Sum('gross_salary'),
+        deductions=Sum('total_deductions'),
+        net=Sum('net_salary'),
+    ).order_by():
+        totals[(row['year'], row['month'])] = {
+            'headcount': row['headcount'],
+            'gross_salary': row['gross'] or 0,
+            'total_deductions': row['deductions'] or 0,
+            'net_salary': row['net'] or 0,
+            'closed': False,
+        }
+
+    payroll_data = [
+        dict(values, year=period[0], month=period[1])
+        for period, values in sorted(totals.items(), reverse=True)
+    ]
+    note_rows(request, len(payroll_data))
+
     context = {
         'payroll_data': payroll_data,
+        'year': year,
+        'total_net_salary': sum(item['net_salary'] for item in payroll_data),
     }
-    
+
     return render(request, 'reports/payroll_summary_report.html', context)
 
+
+
+# Background Report Views
+@login_required
+@instrument_report()
+def report_request(request):
+    """
+    Request a report file generated in the background (AJAX)
+    طلب إنشاء تقرير في الخلفية
+
+    Expects a JSON body such as::
+
+        {"report": "attendance_summary", "format": "excel",
+         "params": {"start_date": "2026-01-01", "end_date": "2026-03-31"}}
+    """
+    from .generation import request_report
+
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+
+    try:
+        data = json.loads(request.body) if request.body else {}
+        report, reused = request_report(
+            data.get('report'),
+            data.get('params') or {},
+            data.get('format', 'excel'),
+            request.user,
+        )
+    except (ValueError, TypeError) as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'report_id': report.id,
+        'status': report.status,
+        'reused': reused,
+        'status_url': reverse('reports:report_status', args=[report.id]),
+    })
+
+
+def _can_access_report(user, report):
+    return (
+        user.is_superuser or user.role in ('admin', 'hr_manager') or
+        report.generated_by_id == user.id or
+        report.subscribers.filter(id=user.id).exists()
+    )
+
+
+@login_required
+@instrument_report()
+def report_status(request, pk):
+    """
+    Status of a background report
+    حالة التقرير المطلوب
+    """
+    report = get_object_or_404(GeneratedReport, pk=pk)
+    if not _can_access_report(request.user, report):
+        return JsonResponse({'success': False, 'error': 'ليس لديك صلاحية لعرض هذا التقرير.'}, status=403)
+
+    data = {
+        'success': True,
+        'report_id': report.id,
+        'status': report.status,
+        'row_count': report.row_count,
+        'completed_at': report.completed_at.isoformat() if report.completed_at else None,
+    }
+    if report.status == 'completed':
+        data['download_url'] = reverse('reports:report_download', args=[report.id])
+    elif report.status == 'failed':
+        data['error'] = report.error_message
+    return JsonResponse(data)
+
+
+@login_required
+@instrument_report()
+def report_download(request, pk):
+    """
+    Download a generated report file
+    تحميل ملف التقرير
+    """
+    report = get_object_or_404(GeneratedReport, pk=pk, status='completed')
+    if not _can_access_report(request.user, report):
+        messages.error(request, 'ليس لديك صلاحية لتحميل هذا التقرير.')
+        return redirect('reports:reports_dashboard')
+
+    return FileResponse(
+        report.file_path.open('rb'),
+        as_attachment=True,
+        filename=os.path.basename(report.file_path.name),
+    )
+
+
+# Report Template Views
+@login_required
+@instrument_report()
+@use_replica
+def report_template_run(request, pk):
+    """
+    Run a report template with the query string as parameters
+    تنفيذ قالب تقرير
+
+    Returns JSON (limited rows, cached) or, with ``export=csv|excel``, a
+    streamed file.
+    """
+    from .models import ReportTemplate
+    from .query_engine import (
+        QueryExecutionError, QueryValidationError, iter_template_rows, run_template,
+    )
+
+    if not (request.user.is_superuser or request.user.role in ('admin', 'hr_manager')):
+        return JsonResponse({'success': False, 'error': 'ليس لديك صلاحية لتشغيل قوالب التقارير.'}, status=403)
+
+    template = get_object_or_404(ReportTemplate, pk=pk, is_active=True)
+    values = {key: value for key, value in request.GET.items() if key not in ('export', 'page')}
+    export_format = request.GET.get('export')
+
+    try:
+        if export_format:
+            if export_format not in EXPORT_FORMATS:
+                raise QueryValidationError('صيغة التصدير غير مدعومة.')
+            # Rows hold a read-only transaction; write the file before returning
+            headers, rows = iter_template_rows(template, values, max_rows=TEMPLATE_EXPORT_MAX_ROWS)
+            return export_response(export_format, f'report_{template.pk}', headers, rows, stream=False)
+        result = run_template(template, values)
+    except QueryValidationError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    except QueryExecutionError as e:
+        return JsonResponse({'success': False, 'error': f'فشل تنفيذ الاستعلام: {e}'}, status=422)
+
+    note_rows(request, result['row_count'])
+    return JsonResponse({'success': True, **result})
+
+
+# Dashboard Views
+def _can_view_dashboard(user, dashboard):
+    return user.is_superuser or dashboard.user_id == user.id
+
+
+@login_required
+@instrument_report()
+@use_replica
+def dashboard_detail(request, pk):
+    """
+    Render a custom dashboard with its widget values
+    عرض لوحة معلومات مخصصة
+    """
+    from .dashboards import evaluate_dashboard
+    from .models import Dashboard
+
+    dashboard = get_object_or_404(Dashboard, pk=pk, is_active=True)
+    if not _can_view_dashboard(request.user, dashboard):
+        messages.error(request, 'ليس لديك صلاحية لعرض لوحة المعلومات هذه.')
+        return redirect('reports:reports_dashboard')
+
+    context = {
+        'dashboard': dashboard,
+        'widgets': evaluate_dashboard(dashboard),
+    }
+    return render(request, 'reports/dashboard_detail.html', context)
+
+
+@login_required
+@instrument_report()
+@use_replica
+def dashboard_data(request, pk):
+    """
+    Widget values of a dashboard as JSON (for refreshing)
+    بيانات أدوات لوحة المعلومات
+    """
+    from .dashboards import evaluate_dashboard
+    from .models import Dashboard
+
+    dashboard = get_object_or_404(Dashboard, pk=pk, is_active=True)
+    if not _can_view_dashboard(request.user, dashboard):
+        return JsonResponse({'success': False, 'error': 'ليس لديك صلاحية لعرض لوحة المعلومات هذه.'}, status=403)
+
+    widgets = json.loads(json.dumps(evaluate_dashboard(dashboard), cls=DjangoJSONEncoder))
+    return JsonResponse({'success': True, 'widgets': widgets})